@@ -3,7 +3,7 @@ Database Backup Service
 Handles automatic daily backups and manual backups
 """
 import os
-import shutil
+import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,8 +15,7 @@ from config import settings
 
 
 # Backup directory
-BACKUP_DIR = Path("./backups")
-BACKUP_DIR.mkdir(exist_ok=True)
+BACKUP_DIR = Path("./backups")  # Created on first backup
 
 
 def get_db_file_path() -> Path:
@@ -33,6 +32,30 @@ def get_db_file_path() -> Path:
     return Path("./dev.db")
 
 
+def _copy_sqlite_database(source: Path, target: Path) -> None:
+    """
+    Copy a live SQLite database with the online backup API
+
+    A plain file copy misses pages still in the -wal file (WAL mode) and can
+    catch a write half-way; the backup API copies a consistent snapshot and
+    takes the proper locks when writing into a database that is in use.
+    """
+    timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    src = sqlite3.connect(str(source), timeout=timeout)
+    dst = sqlite3.connect(str(target), timeout=timeout)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+async def copy_sqlite_database(source: Path, target: Path) -> None:
+    """Run _copy_sqlite_database in a thread to avoid blocking the event loop"""
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, _copy_sqlite_database, source, target)
+
+
 async def create_backup(
     db: AsyncSession,
     backup_type: str = "daily",
@@ -58,10 +81,11 @@ async def create_backup(
     # Generate backup filename
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     backup_filename = f"act_backup_{backup_type}_{timestamp}.db"
+    BACKUP_DIR.mkdir(exist_ok=True)
     backup_path = BACKUP_DIR / backup_filename
     
-    # Copy database file
-    shutil.copy2(source_db, backup_path)
+    # Copy database file (consistent snapshot, includes WAL content)
+    await copy_sqlite_database(source_db, backup_path)
     
     # Get file size
     file_size = backup_path.stat().st_size
@@ -154,11 +178,12 @@ async def restore_backup(backup_id: int, db: AsyncSession):
     current_db = get_db_file_path()
     
     # Create a backup of current database before restoring
+    BACKUP_DIR.mkdir(exist_ok=True)
     pre_restore_backup = BACKUP_DIR / f"pre_restore_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.db"
-    shutil.copy2(current_db, pre_restore_backup)
+    await copy_sqlite_database(current_db, pre_restore_backup)
     
-    # Restore backup
-    shutil.copy2(backup_path, current_db)
+    # Restore backup (written through SQLite so open connections and the WAL stay consistent)
+    await copy_sqlite_database(backup_path, current_db)
     
     print(f"✓ Database restored from backup: {backup.filename}")
     print(f"✓ Pre-restore backup saved: {pre_restore_backup}")
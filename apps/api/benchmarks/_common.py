@@ -0,0 +1,127 @@
+"""
+Shared helpers for the API benchmarks
+
+Benchmarks run against a throwaway SQLite file, or against BENCH_DATABASE_URL
+which must point at an empty scratch database. Start them from apps/api, e.g.:
+
+    python -m benchmarks.bench_report_summary
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from db import Base
+from models import User, Category, Entry, EntryType, ExpenseType
+from services.rollup_service import rebuild_rollups
+
+
+def make_engine(url: str = None, **engine_kwargs) -> AsyncEngine:
+    """Create an engine for BENCH_DATABASE_URL or a fresh temporary SQLite file"""
+    if url is None:
+        url = os.environ.get("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="act_bench_"), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+    if "pool_size" not in engine_kwargs:
+        engine_kwargs.setdefault("poolclass", NullPool)
+    return create_async_engine(url, future=True, **engine_kwargs)
+
+
+def make_session_factory(engine: AsyncEngine):
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_entries(session_factory, n_entries: int, days: int = 120, seed: int = 42) -> int:
+    """Create one user with a spread of categories and n_entries entries; return the user id"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    async with session_factory() as db:
+        user = User(email="bench@example.com", password_hash="x", recovery_keyword="x")
+        db.add(user)
+        await db.flush()
+
+        categories = [
+            Category(name="Rent", type=EntryType.expense, expense_type=ExpenseType.mandatory, is_default=True),
+            Category(name="Food", type=EntryType.expense, expense_type=ExpenseType.neutral, is_default=True),
+            Category(name="Study", type=EntryType.expense, expense_type=ExpenseType.neutral, is_default=True),
+            Category(name="Games", type=EntryType.expense, expense_type=ExpenseType.excess, is_default=True),
+            Category(name="Dining", type=EntryType.expense, expense_type=ExpenseType.excess, is_default=True),
+            Category(name="Travel", type=EntryType.expense, expense_type=ExpenseType.excess, is_default=True),
+            Category(name="Salary", type=EntryType.income, is_default=True),
+        ]
+        db.add_all(categories)
+        await db.flush()
+
+        rows = []
+        for _ in range(n_entries):
+            category = rng.choice(categories)
+            booked_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            rows.append({
+                "user_id": user.id,
+                "category_id": category.id,
+                "type": category.type,
+                "amount": round(rng.uniform(1, 500), 2),
+                "currency": "USD",
+                "booked_at": booked_at,
+                "created_at": booked_at,
+                "updated_at": booked_at,
+            })
+        for start in range(0, len(rows), 5000):
+            await db.execute(insert(Entry), rows[start:start + 5000])
+        await db.commit()
+
+        user_id = user.id
+        await rebuild_rollups(db, user_id)
+        return user_id
+
+
+class QueryCounter:
+    """Count statements sent to the database while the block is active"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+async def time_async(fn: Callable[[], Awaitable], repeat: int) -> List[float]:
+    """Run fn repeat times and return the durations in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def report(label: str, durations_ms: List[float], queries: int = None) -> None:
+    ordered = sorted(durations_ms)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    line = f"{label:<28} median {statistics.median(ordered):8.2f} ms   p95 {p95:8.2f} ms"
+    if queries is not None:
+        line += f"   round trips {queries}"
+    print(line)
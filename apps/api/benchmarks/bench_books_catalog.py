@@ -0,0 +1,119 @@
+"""
+Benchmark: GET /books/ before and after the catalog cache
+
+"legacy" replays the previous route body (books of the language, the
+user's progress, one BookOut built per book); "cached" reads the prebuilt
+payloads from BookCatalogCache and only queries the user's progress.
+
+    python -m benchmarks.bench_books_catalog [books_per_language]
+"""
+import asyncio
+import random
+import sys
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from models import User, Book, UserBookProgress, BookStatus
+from schemas import BookOut, UserBookProgressOut
+from services.book_catalog import BookCatalogCache, with_progress, progress_by_book
+from benchmarks._common import (
+    make_engine, make_session_factory, create_schema, QueryCounter, time_async, report
+)
+
+LANGUAGES = ("en", "ru", "uz")
+
+
+async def seed(session_factory, books_per_language: int) -> int:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    async with session_factory() as db:
+        user = User(email="bench@example.com", password_hash="x", recovery_keyword="x")
+        db.add(user)
+        await db.flush()
+
+        await db.execute(insert(Book), [
+            {
+                "title": f"Book {language} {i}",
+                "author": "Author",
+                "summary": "Summary " * 40,
+                "key_takeaways": "Takeaway " * 20,
+                "total_pages": 200,
+                "is_user_created": False,
+                "language_code": language,
+                "order_index": i,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for language in LANGUAGES for i in range(books_per_language)
+        ])
+        book_ids = (await db.execute(
+            select(Book.id).where(Book.language_code == "en")
+        )).scalars().all()
+        await db.execute(insert(UserBookProgress), [
+            {
+                "user_id": user.id,
+                "book_id": book_id,
+                "status": BookStatus.in_progress,
+                "progress_percent": rng.randint(1, 99),
+                "updated_at": now,
+            }
+            for book_id in rng.sample(book_ids, len(book_ids) // 5)
+        ])
+        await db.commit()
+        return user.id
+
+
+async def legacy_list(db, user_id, language):
+    result = await db.execute(
+        select(Book).where(Book.language_code == language).order_by(Book.order_index, Book.created_at)
+    )
+    books = result.scalars().all()
+    progress_map = await progress_by_book(db, user_id)
+
+    books_out = []
+    for book in books:
+        progress = progress_map.get(book.id)
+        books_out.append(BookOut(
+            id=book.id, title=book.title, author=book.author, cover_url=book.cover_url,
+            summary=book.summary, key_takeaways=book.key_takeaways, genre=book.genre,
+            isbn=book.isbn, total_pages=book.total_pages, total_chapters=book.total_chapters,
+            is_user_created=book.is_user_created, language_code=book.language_code,
+            file_path=book.file_path, file_size=book.file_size, order_index=book.order_index,
+            created_at=book.created_at,
+            user_progress=UserBookProgressOut.model_validate(progress) if progress else None
+        ))
+    return books_out
+
+
+async def cached_list(db, catalog, user_id, language):
+    books = await catalog.books(db, language)
+    progress_map = await progress_by_book(db, user_id)
+    return [with_progress(book, progress_map.get(book.id)) for book in books]
+
+
+async def main(books_per_language: int, repeat: int = 50):
+    engine = make_engine()
+    session_factory = make_session_factory(engine)
+    await create_schema(engine)
+    user_id = await seed(session_factory, books_per_language)
+    catalog = BookCatalogCache(check_seconds=30.0)
+
+    print(f"/books/ with {books_per_language} books per language, {repeat} runs")
+
+    async with session_factory() as db:
+        assert await legacy_list(db, user_id, "en") == await cached_list(db, catalog, user_id, "en")
+
+        for label, fn in (
+            ("legacy (rebuild per call)", lambda: legacy_list(db, user_id, "en")),
+            ("cached catalog", lambda: cached_list(db, catalog, user_id, "en")),
+        ):
+            with QueryCounter(engine) as counter:
+                await fn()
+            report(label, await time_async(fn, repeat), counter.count)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,75 @@
+"""
+Benchmark: export formats - time to produce and size of the file
+
+Every format reads the same rows through iter_export_batches (server-side
+cursor, EXPORT_BATCH_SIZE rows per batch); only the encoding differs.
+Parquet and Arrow need pyarrow.
+
+    python -m benchmarks.bench_export [n_entries] [repeat]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from services.export_service import (
+    iter_export_batches, csv_chunks, ndjson_chunks, gzip_chunks, columnar_chunks, PYARROW_AVAILABLE
+)
+from benchmarks._common import make_engine, make_session_factory, create_schema, seed_entries
+
+
+def _formats(user_id: int, session_factory):
+    def batches():
+        return iter_export_batches(user_id, session_factory=session_factory)
+
+    formats = {
+        "csv": lambda: csv_chunks(batches()),
+        "csv.gz": lambda: gzip_chunks(csv_chunks(batches())),
+        "ndjson": lambda: ndjson_chunks(batches()),
+        "ndjson.gz": lambda: gzip_chunks(ndjson_chunks(batches())),
+    }
+    if PYARROW_AVAILABLE:
+        formats["parquet (zstd)"] = lambda: columnar_chunks(batches(), "parquet")
+        formats["arrow ipc (zstd)"] = lambda: columnar_chunks(batches(), "arrow")
+    return formats
+
+
+async def _drain(chunks) -> int:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+async def main(n_entries: int, repeat: int) -> None:
+    engine = make_engine()
+    try:
+        await create_schema(engine)
+        session_factory = make_session_factory(engine)
+        user_id = await seed_entries(session_factory, n_entries)
+
+        print(f"{n_entries} entries, {repeat} runs per format\n")
+        baseline = None
+        for label, make_chunks in _formats(user_id, session_factory).items():
+            durations = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                size = await _drain(make_chunks())
+                durations.append((time.perf_counter() - started) * 1000)
+
+            baseline = baseline or size
+            print(
+                f"{label:<18} median {statistics.median(durations):8.1f} ms   "
+                f"size {size / 1024:9.1f} KiB   ({size / baseline:5.1%} of csv)"
+            )
+
+        if not PYARROW_AVAILABLE:
+            print("\npyarrow is not installed - Parquet/Arrow skipped")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    asyncio.run(main(n_entries, repeat))
@@ -0,0 +1,63 @@
+"""
+Benchmark: PostgreSQL NullPool vs the async queue pool under concurrent load
+
+Each simulated request opens a session, runs one small query and closes the
+session - the shape of a cheap API call. With NullPool every request pays
+the TCP + auth handshake; the pool reuses warm connections.
+
+Needs a PostgreSQL BENCH_DATABASE_URL (postgresql+asyncpg://...):
+
+    python -m benchmarks.bench_pool [concurrency] [requests_per_worker]
+"""
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+from db import pool_options
+from benchmarks._common import make_engine, make_session_factory, report
+
+
+async def run_load(engine, concurrency: int, per_worker: int):
+    session_factory = make_session_factory(engine)
+    durations = []
+
+    async def worker():
+        for _ in range(per_worker):
+            started = time.perf_counter()
+            async with session_factory() as db:
+                await db.execute(text("SELECT 1"))
+            durations.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return durations, elapsed
+
+
+async def main(concurrency: int, per_worker: int) -> None:
+    url = os.environ.get("BENCH_DATABASE_URL", "")
+    if "postgresql" not in url:
+        print("Set BENCH_DATABASE_URL to a postgresql+asyncpg:// URL to run this benchmark")
+        return
+
+    print(f"{concurrency} concurrent workers x {per_worker} requests\n")
+    for mode in ("null", "queue"):
+        engine = make_engine(url, **pool_options(url, mode))
+        try:
+            # Warm-up (the pool fills up, DNS/SSL are resolved)
+            await run_load(engine, concurrency, 1)
+            durations, elapsed = await run_load(engine, concurrency, per_worker)
+        finally:
+            await engine.dispose()
+
+        report(f"pool mode={mode}", durations)
+        print(f"{'':<28} throughput {len(durations) / elapsed:8.1f} req/s\n")
+
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    per_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(concurrency, per_worker))
@@ -0,0 +1,70 @@
+"""
+Benchmark: FCM fan-out inline on the event loop vs the push delivery pool
+
+Uses FakeFCMTransport with a blocking `latency` per multicast call (an HTTP
+round trip to FCM). "inline" calls the transport directly from the event
+loop, one chunk after another - what FCMService used to do. "pool" is
+PushDeliveryService: chunks run in its thread pool, several at a time.
+A ticker task measures how late the event loop wakes it up meanwhile
+(i.e. how long every other request would stall).
+
+    python -m benchmarks.bench_push [n_tokens] [latency_ms]
+"""
+import asyncio
+import sys
+import time
+
+from services.push_delivery import FakeFCMTransport, PushDeliveryService, PushMessage, FCM_MULTICAST_LIMIT
+
+
+async def measure(label: str, fan_out) -> None:
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls.append((time.perf_counter() - started - 0.005) * 1000)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    result = await fan_out()
+    elapsed = (time.perf_counter() - started) * 1000
+    done.set()
+    await tick
+
+    print(
+        f"{label:<8} fan-out {elapsed:8.1f} ms   delivered {result:6d}   "
+        f"max loop stall {max(stalls):8.1f} ms"
+    )
+
+
+async def main(n_tokens: int, latency_ms: float) -> None:
+    tokens = [f"token-{i}" for i in range(n_tokens)]
+    message = PushMessage(title="Bench", body="Fan-out")
+    transport = FakeFCMTransport(latency=latency_ms / 1000)
+    print(f"{n_tokens} tokens, {latency_ms} ms per multicast call\n")
+
+    async def inline():
+        delivered = 0
+        for i in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            results = transport.send_each(tokens[i:i + FCM_MULTICAST_LIMIT], message)
+            delivered += sum(r.success for r in results)
+        return delivered
+
+    delivery = PushDeliveryService(transport)
+
+    async def pooled():
+        return (await delivery.deliver(tokens, message)).success_count
+
+    await measure("inline", inline)
+    await measure("pool", pooled)
+    delivery.shutdown()
+
+
+if __name__ == "__main__":
+    n_tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 80
+    asyncio.run(main(n_tokens, latency_ms))
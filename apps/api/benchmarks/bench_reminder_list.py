@@ -0,0 +1,126 @@
+"""
+Benchmark: GET /reminders/ before and after the joined reminder query
+
+"legacy" replays the previous route body (reminders, one categories lookup
+per reminder, then three COUNT-by-loading queries); "joined" is
+list_reminders + reminder_counts. The joined path must stay at a constant
+number of round trips whatever the number of reminders - the run fails
+(exit status 1) if it does not, so it doubles as the N+1 regression check.
+
+    python -m benchmarks.bench_reminder_list [n_reminders]
+"""
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from models import User, Reminder, Category, EntryType
+from services.reminder_service import list_reminders, reminder_counts
+from benchmarks._common import (
+    make_engine, make_session_factory, create_schema, QueryCounter, time_async, report
+)
+
+JOINED_ROUND_TRIPS = 2  # reminders + categories, then the three counts
+
+
+async def seed(session_factory, n_reminders: int) -> int:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    async with session_factory() as db:
+        user = User(email="bench@example.com", password_hash="x", recovery_keyword="x")
+        categories = [
+            Category(name=f"Bills {i}", type=EntryType.expense, icon="📄", color="#FF6B6B", is_default=True)
+            for i in range(8)
+        ]
+        db.add(user)
+        db.add_all(categories)
+        await db.flush()
+
+        rows = [
+            {
+                "user_id": user.id,
+                "category_id": rng.choice(categories).id if rng.random() < 0.8 else None,
+                "title": f"Bill {i}",
+                "amount": round(rng.uniform(5, 500), 2),
+                "currency": "USD",
+                "reminder_date": now + timedelta(seconds=rng.randint(-30 * 86400, 60 * 86400)),
+                "is_completed": rng.random() < 0.2,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(n_reminders)
+        ]
+        for start in range(0, len(rows), 5000):
+            await db.execute(insert(Reminder), rows[start:start + 5000])
+        await db.commit()
+        return user.id
+
+
+async def legacy_list(db, user_id):
+    result = await db.execute(
+        select(Reminder).filter(Reminder.user_id == user_id, Reminder.is_completed == False)
+        .order_by(Reminder.reminder_date.asc())
+    )
+    rows = []
+    for reminder in result.scalars().all():
+        category = None
+        if reminder.category_id:
+            cat_result = await db.execute(select(Category).filter(Category.id == reminder.category_id))
+            category = cat_result.scalar_one_or_none()
+        rows.append((reminder, category.name if category else None))
+
+    total = len((await db.execute(select(Reminder).filter(Reminder.user_id == user_id))).scalars().all())
+    upcoming = len((await db.execute(select(Reminder).filter(
+        Reminder.user_id == user_id, Reminder.is_completed == False,
+        Reminder.reminder_date >= datetime.utcnow()
+    ))).scalars().all())
+    completed = len((await db.execute(select(Reminder).filter(
+        Reminder.user_id == user_id, Reminder.is_completed == True
+    ))).scalars().all())
+    return rows, total, upcoming, completed
+
+
+async def joined_list(db, user_id):
+    rows = await list_reminders(db, user_id)
+    return rows, await reminder_counts(db, user_id)
+
+
+async def main(n_reminders: int, repeat: int = 20) -> int:
+    engine = make_engine()
+    session_factory = make_session_factory(engine)
+    await create_schema(engine)
+    user_id = await seed(session_factory, n_reminders)
+
+    print(f"/reminders/ with {n_reminders} reminders, {repeat} runs")
+
+    async with session_factory() as db:
+        legacy_rows, total, upcoming, completed = await legacy_list(db, user_id)
+        joined_rows, counts = await joined_list(db, user_id)
+        assert [r.id for r, _ in legacy_rows] == [row.Reminder.id for row in joined_rows]
+        assert [name for _, name in legacy_rows] == [row.category_name for row in joined_rows]
+        assert (total, upcoming, completed) == (
+            counts["total"], counts["upcoming_count"], counts["completed_count"]
+        )
+
+        round_trips = {}
+        for label, fn in (
+            ("legacy (N+1)", lambda: legacy_list(db, user_id)),
+            ("joined", lambda: joined_list(db, user_id)),
+        ):
+            with QueryCounter(engine) as counter:
+                await fn()
+            round_trips[label] = counter.count
+            report(label, await time_async(fn, repeat), counter.count)
+
+    await engine.dispose()
+
+    if round_trips["joined"] != JOINED_ROUND_TRIPS:
+        print(f"FAIL: joined path took {round_trips['joined']} round trips (expected {JOINED_ROUND_TRIPS})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)))
@@ -0,0 +1,134 @@
+"""
+Benchmark: reminder push scheduler with 100k pending reminders
+
+Phases:
+- load:    build the heap from the reminders table (horizon window only)
+- refresh: incremental refresh with no changes, then after 1,000 edits
+- burst:   every reminder falls due at once; fire_due marks them notified
+           and queues outbox rows in batches of REMINDER_BATCH_SIZE
+- deliver: the outbox dispatcher sends the queued pushes through
+           FakeFCMTransport (no network)
+
+    python -m benchmarks.bench_reminders [n_reminders] [n_users]
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update, func
+
+from models import User, Reminder, PushToken, NotificationOutbox
+from services.fcm_service import FCMService
+from services.notification_outbox import NotificationDispatcher
+from services.push_delivery import FakeFCMTransport
+from services.reminder_scheduler import ReminderScheduler
+from benchmarks._common import make_engine, make_session_factory, create_schema
+
+
+async def seed(session_factory, n_reminders: int, n_users: int) -> None:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    async with session_factory() as db:
+        await db.execute(insert(User), [
+            {"email": f"bench{i}@example.com", "password_hash": "x", "recovery_keyword": "x"}
+            for i in range(n_users)
+        ])
+        user_ids = (await db.execute(select(User.id))).scalars().all()
+        await db.execute(insert(PushToken), [
+            {"user_id": user_id, "token": f"token-{user_id}", "is_active": True}
+            for user_id in user_ids
+        ])
+
+        rows = [
+            {
+                "user_id": rng.choice(user_ids),
+                "title": f"Bill {i}",
+                "amount": round(rng.uniform(5, 500), 2),
+                "currency": "USD",
+                # Spread over 3 days: the 6 h horizon holds roughly 1/12 of them
+                "reminder_date": now + timedelta(seconds=rng.randint(60, 3 * 86400)),
+                "is_completed": False,
+                "created_at": now - timedelta(days=1),
+                "updated_at": now - timedelta(days=1, seconds=rng.randint(0, 86400)),
+            }
+            for i in range(n_reminders)
+        ]
+        for start in range(0, len(rows), 5000):
+            await db.execute(insert(Reminder), rows[start:start + 5000])
+        await db.commit()
+
+
+async def timed(fn):
+    started = time.perf_counter()
+    result = await fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+async def main(n_reminders: int, n_users: int) -> None:
+    engine = make_engine()
+    try:
+        await create_schema(engine)
+        session_factory = make_session_factory(engine)
+        await seed(session_factory, n_reminders, n_users)
+        print(f"{n_reminders} pending reminders, {n_users} users\n")
+
+        scheduler = ReminderScheduler(session_factory, on_enqueued=lambda: None)
+        loaded, ms = await timed(scheduler.load)
+        print(f"{'load':<22} {ms:9.1f} ms   {loaded} reminders in the heap")
+
+        rows, ms = await timed(scheduler.refresh)
+        print(f"{'refresh (no changes)':<22} {ms:9.1f} ms   {rows} rows read")
+
+        async with session_factory() as db:
+            await db.execute(
+                update(Reminder)
+                .where(Reminder.id <= 1000)
+                .values(reminder_date=datetime.utcnow() + timedelta(minutes=30))
+            )
+            await db.commit()
+        rows, ms = await timed(scheduler.refresh)
+        print(f"{'refresh (1000 edits)':<22} {ms:9.1f} ms   {rows} rows read")
+
+        # Burst: everything falls due now
+        async with session_factory() as db:
+            await db.execute(update(Reminder).values(reminder_date=datetime.utcnow() - timedelta(seconds=1)))
+            await db.commit()
+        await scheduler.load()
+        queued, ms = await timed(scheduler.fire_due)
+        print(f"{'burst fire_due':<22} {ms:9.1f} ms   {queued} pushes queued ({queued / ms * 1000:,.0f}/s)")
+
+        again, _ = await timed(scheduler.fire_due)
+        await scheduler.load()
+        reloaded = scheduler.loaded
+        print(f"{'restart':<22} {'':>12}   {reloaded} reminders left to fire, {again} re-queued")
+
+        transport = FakeFCMTransport()
+        dispatcher = NotificationDispatcher(FCMService(transport=transport), session_factory)
+
+        async def drain():
+            total = 0
+            while True:
+                handled = await dispatcher.dispatch_once()
+                if not handled:
+                    return total
+                total += handled
+
+        handled, ms = await timed(drain)
+        print(f"{'deliver (fake FCM)':<22} {ms:9.1f} ms   {handled} outbox rows, {len(transport.sent)} pushes ({handled / ms * 1000:,.0f}/s)")
+        dispatcher.fcm.delivery.shutdown()
+
+        async with session_factory() as db:
+            pending = (await db.execute(
+                select(func.count(NotificationOutbox.id)).where(NotificationOutbox.status != "sent")
+            )).scalar()
+        print(f"{'':<22} {'':>12}   {pending} outbox rows not sent")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    n_reminders = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    n_users = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    asyncio.run(main(n_reminders, n_users))
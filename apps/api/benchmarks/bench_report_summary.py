@@ -0,0 +1,98 @@
+"""
+Benchmark: /reports/summary before and after the single-scan report engine
+
+"legacy" replays the previous route body (income, expense, one query per
+expense type, then the top-5 categories); "engine" is compute_report_summary.
+
+    python -m benchmarks.bench_report_summary [n_entries]
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from models import Entry, Category, EntryType, ExpenseType
+from services.report_service import compute_report_summary
+from benchmarks._common import (
+    make_engine, make_session_factory, create_schema, seed_entries,
+    QueryCounter, time_async, report
+)
+
+
+async def legacy_summary(db, user_id, start_date, end_date):
+    async def total(entry_type):
+        result = await db.execute(
+            select(func.coalesce(func.sum(Entry.amount), 0)).where(
+                Entry.user_id == user_id,
+                Entry.type == entry_type,
+                Entry.booked_at >= start_date,
+                Entry.booked_at <= end_date
+            )
+        )
+        return float(result.scalar())
+
+    income_total = await total(EntryType.income)
+    expense_total = await total(EntryType.expense)
+
+    expense_by_type = {}
+    for exp_type in ExpenseType:
+        result = await db.execute(
+            select(func.coalesce(func.sum(Entry.amount), 0)).select_from(Entry).join(
+                Category, Entry.category_id == Category.id
+            ).where(
+                Entry.user_id == user_id,
+                Entry.type == EntryType.expense,
+                Category.expense_type == exp_type,
+                Entry.booked_at >= start_date,
+                Entry.booked_at <= end_date
+            )
+        )
+        expense_by_type[exp_type.value] = float(result.scalar())
+
+    result = await db.execute(
+        select(
+            Category.id, Category.name, Category.icon, Category.color, Category.expense_type,
+            func.sum(Entry.amount).label("total"), func.count(Entry.id).label("count")
+        ).select_from(Entry).join(
+            Category, Entry.category_id == Category.id
+        ).where(
+            Entry.user_id == user_id,
+            Entry.type == EntryType.expense,
+            Entry.booked_at >= start_date,
+            Entry.booked_at <= end_date
+        ).group_by(
+            Category.id, Category.name, Category.icon, Category.color, Category.expense_type
+        ).order_by(func.sum(Entry.amount).desc()).limit(5)
+    )
+    top_categories = result.all()
+
+    return income_total, expense_total, expense_by_type, top_categories
+
+
+async def main(n_entries: int, repeat: int = 50):
+    engine = make_engine()
+    session_factory = make_session_factory(engine)
+    await create_schema(engine)
+    user_id = await seed_entries(session_factory, n_entries)
+
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=90)
+
+    print(f"/reports/summary over 90 days, {n_entries} entries, {repeat} runs")
+
+    async with session_factory() as db:
+        for label, fn in (
+            ("legacy (6 queries)", lambda: legacy_summary(db, user_id, start_date, end_date)),
+            ("engine (1 grouped scan)", lambda: compute_report_summary(db, user_id, start_date, end_date)),
+        ):
+            with QueryCounter(engine) as counter:
+                await fn()
+            durations = await time_async(fn, repeat)
+            report(label, durations, counter.count)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
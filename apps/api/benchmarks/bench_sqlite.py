@@ -0,0 +1,104 @@
+"""
+Benchmark: SQLite default setup vs the tuned engine profile under mixed load
+
+"legacy" is the previous engine: NullPool (a new connection per session),
+rollback journal, default cache. "tuned" is db.pool_options() +
+db.configure_sqlite(): pooled connections, WAL, synchronous=NORMAL, larger
+cache/mmap and busy_timeout. Readers page through entries while writers
+insert entries one transaction at a time, all concurrently.
+
+    python -m benchmarks.bench_sqlite [n_entries] [readers] [writers] [ops_per_task]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import select, insert
+from sqlalchemy.exc import OperationalError
+
+from db import pool_options, configure_sqlite
+from models import Entry, EntryType
+from benchmarks._common import (
+    make_engine, make_session_factory, create_schema, seed_entries, report
+)
+
+
+async def run_mixed_load(engine, user_id: int, readers: int, writers: int, ops: int):
+    session_factory = make_session_factory(engine)
+    read_ms, write_ms = [], []
+    errors = 0
+
+    async def reader():
+        nonlocal errors
+        for _ in range(ops):
+            started = time.perf_counter()
+            try:
+                async with session_factory() as db:
+                    await db.execute(
+                        select(Entry).where(Entry.user_id == user_id)
+                        .order_by(Entry.booked_at.desc(), Entry.id.desc()).limit(100)
+                    )
+            except OperationalError:
+                errors += 1
+                continue
+            read_ms.append((time.perf_counter() - started) * 1000)
+
+    async def writer():
+        nonlocal errors
+        for _ in range(ops):
+            started = time.perf_counter()
+            try:
+                async with session_factory() as db:
+                    await db.execute(insert(Entry).values(
+                        user_id=user_id, type=EntryType.expense, amount=1.0,
+                        currency="USD", booked_at=datetime.utcnow()
+                    ))
+                    await db.commit()
+            except OperationalError:
+                # "database is locked"
+                errors += 1
+                continue
+            write_ms.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(reader() for _ in range(readers)),
+        *(writer() for _ in range(writers))
+    )
+    elapsed = time.perf_counter() - started
+    return read_ms, write_ms, errors, elapsed
+
+
+async def bench(label: str, n_entries: int, readers: int, writers: int, ops: int, tuned: bool) -> None:
+    if tuned:
+        engine = make_engine(None, **pool_options("sqlite+aiosqlite:///bench.db", "queue"))
+        configure_sqlite(engine)
+    else:
+        engine = make_engine(None)
+
+    try:
+        await create_schema(engine)
+        user_id = await seed_entries(make_session_factory(engine), n_entries)
+        read_ms, write_ms, errors, elapsed = await run_mixed_load(engine, user_id, readers, writers, ops)
+    finally:
+        await engine.dispose()
+
+    report(f"{label} reads", read_ms)
+    report(f"{label} writes", write_ms)
+    total = len(read_ms) + len(write_ms)
+    print(f"{'':<28} throughput {total / elapsed:8.1f} ops/s   lock errors {errors}\n")
+
+
+async def main(n_entries: int, readers: int, writers: int, ops: int) -> None:
+    print(f"{n_entries} entries, {readers} readers + {writers} writers x {ops} ops\n")
+    await bench("legacy", n_entries, readers, writers, ops, tuned=False)
+    await bench("tuned", n_entries, readers, writers, ops, tuned=True)
+
+
+if __name__ == "__main__":
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    ops = int(sys.argv[4]) if len(sys.argv) > 4 else 100
+    asyncio.run(main(n_entries, readers, writers, ops))
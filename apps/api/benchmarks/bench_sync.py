@@ -0,0 +1,71 @@
+"""
+Benchmark: initial download through GET /entries/changes
+
+Pages a new device's full download with fetch_entry_changes, following
+next_token until has_more is false. Most seeded entries were last updated
+long before SYNC_TOMBSTONE_RETENTION_DAYS, so page boundaries carry old
+watermarks; the run fails (exit status 1) if a page token is refused as
+expired or the pages do not add up to every entry exactly once.
+
+    python -m benchmarks.bench_sync [n_entries] [page_size]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from config import settings
+from models import Entry
+from services.sync_service import fetch_entry_changes, SyncTokenExpired
+from benchmarks._common import make_engine, make_session_factory, create_schema, seed_entries, QueryCounter
+
+
+async def main(n_entries: int, page_size: int) -> int:
+    engine = make_engine()
+    session_factory = make_session_factory(engine)
+    await create_schema(engine)
+    user_id = await seed_entries(session_factory, n_entries, days=3 * settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    async with session_factory() as db:
+        cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        old = (await db.execute(
+            select(func.count()).select_from(Entry).where(Entry.user_id == user_id, Entry.updated_at < cutoff)
+        )).scalar()
+    print(f"initial download of {n_entries} entries ({old} older than the retention window), "
+          f"pages of {page_size}")
+
+    seen = set()
+    pages = 0
+    token = None
+    started = time.perf_counter()
+    with QueryCounter(engine) as counter:
+        while True:
+            async with session_factory() as db:
+                try:
+                    page = await fetch_entry_changes(db, user_id, token, page_size)
+                except SyncTokenExpired:
+                    print(f"FAIL: page {pages + 1} token refused as expired")
+                    return 1
+            pages += 1
+            seen.update(entry.id for entry in page["changed"])
+            token = page["next_token"]
+            if not page["has_more"]:
+                break
+    elapsed = (time.perf_counter() - started) * 1000
+
+    await engine.dispose()
+
+    print(f"{pages} pages in {elapsed:.1f} ms ({elapsed / pages:.2f} ms/page), round trips {counter.count}")
+    if len(seen) != n_entries:
+        print(f"FAIL: downloaded {len(seen)} distinct entries (expected {n_entries})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )))
@@ -19,14 +19,88 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 14
 
+    # Authenticated user cache (per worker; other workers see profile changes after the TTL)
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_USER_CACHE_MAX_SIZE: int = 10000  # 0 disables the cache
+
+    # Books catalog cache (per worker; other workers pick up book changes within this many seconds)
+    BOOK_CATALOG_CHECK_SECONDS: float = 30.0  # 0 disables the cache
+
     # DB - Read from environment variable, with SQLite default for local dev
     # On Railway, this will be set to PostgreSQL connection string
     DATABASE_URL: str = "sqlite+aiosqlite:///./dev.db"
 
+    # Apply pending schema migrations at startup (otherwise run `python migrate.py` before deploying)
+    MIGRATE_ON_STARTUP: bool = True
+
+    # Connection pool ("queue" = pooled, "null" = new connection per session)
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Reconnect connections older than this (seconds)
+    DB_POOL_PRE_PING: bool = True  # Detect connections dropped by the server/proxy
+
+    # SQLite profile (applied to every new connection)
+    SQLITE_POOL_SIZE: int = 5
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 20000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Background goal maintenance queue
+    GOAL_QUEUE_CONCURRENCY: int = 4
+    GOAL_QUEUE_SHUTDOWN_TIMEOUT: float = 10.0
+    GOAL_QUEUE_MAX_RETRIES: int = 3  # Retries of a failed job (delay doubles each time)
+    GOAL_QUEUE_RETRY_DELAY: float = 1.0
+
+    # Offline sync: how long deleted-entry tombstones are kept (older sync tokens force a full resync)
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+
+    # Batch entry upload: max items per request, and how long idempotency keys are remembered
+    ENTRY_BATCH_MAX_ITEMS: int = 500
+    ENTRY_CLIENT_KEY_RETENTION_DAYS: int = 30
+
+    # Background export jobs: output directory, parallel jobs, how long a worker's claim on a job lasts
+    # without renewal, and how long finished files are kept
+    EXPORT_DIR: str = "./exports"
+    EXPORT_JOB_CONCURRENCY: int = 2
+    EXPORT_JOB_LEASE_SECONDS: int = 300
+    EXPORT_RETENTION_HOURS: int = 24
+    EXPORT_MAX_ACTIVE_JOBS_PER_USER: int = 3
+
     # Firebase
     FIREBASE_CREDENTIALS_PATH: str = ""
     FIREBASE_CREDENTIALS_JSON: str = ""  # Base64 encoded credentials (production)
 
+    # Push delivery: threads for the blocking FCM calls, tokens per multicast (max 500),
+    # and multicast requests in flight per fan-out
+    FCM_DELIVERY_THREADS: int = 8
+    FCM_MULTICAST_CHUNK_SIZE: int = 500
+    FCM_MAX_CONCURRENT_CHUNKS: int = 4
+
+    # Push outbox dispatcher: rows claimed per batch, idle poll interval, retry policy
+    # (exponential backoff from BASE up to MAX seconds), claim lease and retention of finished rows
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_POLL_SECONDS: float = 2.0
+    OUTBOX_MAX_ATTEMPTS: int = 6
+    OUTBOX_BACKOFF_BASE_SECONDS: float = 30.0
+    OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+    OUTBOX_LEASE_SECONDS: int = 300
+    OUTBOX_RETENTION_DAYS: int = 7
+
+    # Reminder push scheduler: how far ahead reminders are held in memory, how often changes
+    # are picked up, reminders per push batch, and how late a missed reminder may still be sent
+    REMINDER_SCHEDULER_ENABLED: bool = True
+    REMINDER_HORIZON_MINUTES: int = 360
+    REMINDER_REFRESH_SECONDS: float = 30.0
+    REMINDER_BATCH_SIZE: int = 500
+    REMINDER_MAX_LATENESS_HOURS: int = 24
+
+    # Conditional GET: the dashboard's rolling 7/30-day windows are revalidated at least this often
+    ETAG_DASHBOARD_MAX_AGE_SECONDS: int = 60
+
 settings = Settings()
 
 # Strip whitespace from all environment variables (critical for Railway)
@@ -55,13 +129,8 @@ if settings.FIREBASE_CREDENTIALS_JSON and not settings.FIREBASE_CREDENTIALS_PATH
     except Exception as e:
         print(f"[Firebase] ⚠️ Failed to decode Base64 credentials: {e}")
 
-# Debug: Log what DATABASE_URL we're using
-print(f"[DB] Initial DATABASE_URL: {settings.DATABASE_URL[:60] if settings.DATABASE_URL else 'NOT SET'}...")
-print(f"[DB] Environment DATABASE_URL exists: {'DATABASE_URL' in os.environ}")
-
 # Convert standard PostgreSQL URL to async format if needed
 if settings.DATABASE_URL.startswith("postgresql://"):
-    print("[DB] Converting postgresql:// to postgresql+asyncpg://")
     # Railway provides standard postgresql:// URL, convert to asyncpg format
     settings.DATABASE_URL = settings.DATABASE_URL.replace(
         "postgresql://", "postgresql+asyncpg://", 1
@@ -72,9 +141,7 @@ if settings.DATABASE_URL.startswith("postgresql://"):
             settings.DATABASE_URL = settings.DATABASE_URL + "&sslmode=disable"
         else:
             settings.DATABASE_URL = settings.DATABASE_URL + "?sslmode=disable"
-    print("[DB] Using internal Railway connection (SSL disabled via sslmode=disable)")
 elif settings.DATABASE_URL.startswith("postgres://"):
-    print("[DB] Converting postgres:// to postgresql+asyncpg://")
     # Handle old postgres:// format as well
     settings.DATABASE_URL = settings.DATABASE_URL.replace(
         "postgres://", "postgresql+asyncpg://", 1
@@ -85,6 +152,3 @@ elif settings.DATABASE_URL.startswith("postgres://"):
             settings.DATABASE_URL = settings.DATABASE_URL + "&sslmode=disable"
         else:
             settings.DATABASE_URL = settings.DATABASE_URL + "?sslmode=disable"
-    print("[DB] Using internal Railway connection (SSL disabled via sslmode=disable)")
-
-print(f"[DB] Final DATABASE_URL: {settings.DATABASE_URL[:60]}...")
@@ -2,65 +2,106 @@
 Database configuration and session management for ACT Gen-1 API.
 Uses SQLAlchemy async ORM with proper async pool configuration.
 """
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import NullPool
 
 from config import settings
 
-print("\n" + "="*60)
-print("DATABASE INITIALIZATION")
-print("="*60)
-
 # Get database URL from config
 db_url = settings.DATABASE_URL
-print(f"[DB] Database URL (first 60 chars): {db_url[:60]}...")
 
-# Configure connection pool based on database type
-# CRITICAL: Use NullPool for async engines - QueuePool causes crashes!
-if "sqlite" in db_url.lower():
-    print("[DB] SQLite detected - using NullPool")
-    pool_config = {
-        "poolclass": NullPool,
-        "connect_args": {"check_same_thread": False}
-    }
-elif "postgresql" in db_url.lower() or "asyncpg" in db_url.lower():
-    print("[DB] PostgreSQL detected - using NullPool (async-safe)")
-    # For async engines, we must use NullPool to avoid blocking issues
-    # Connection pooling is handled by the database driver (asyncpg)
-    # SSL configuration is handled in config.py
-    pool_config = {
-        "poolclass": NullPool,
-        "connect_args": {
+
+def pool_options(url: str, pool_mode: str = None) -> dict:
+    """
+    Engine keyword arguments for the connection pool of a database URL
+
+    PostgreSQL uses SQLAlchemy's asyncio-aware queue pool (the default of
+    create_async_engine), sized by the DB_POOL_* settings. SQLite files keep
+    a small pool of connections (SQLITE_POOL_SIZE) so the per-connection
+    pragmas and page cache survive between requests. pool_mode "null"
+    (DB_POOL_MODE=null) opens a fresh connection per session instead, e.g.
+    for deployments behind an external pooler such as PgBouncer.
+    """
+    pool_mode = (pool_mode or settings.DB_POOL_MODE).lower()
+
+    if "sqlite" in url.lower():
+        connect_args = {"check_same_thread": False}
+        if pool_mode == "null" or ":memory:" in url:
+            return {"poolclass": NullPool, "connect_args": connect_args}
+
+        return {
+            "pool_size": settings.SQLITE_POOL_SIZE,
+            "max_overflow": settings.SQLITE_POOL_SIZE,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "connect_args": connect_args
+        }
+
+    if "postgresql" in url.lower() or "asyncpg" in url.lower():
+        # SSL configuration is handled in config.py
+        connect_args = {
             "server_settings": {
                 "application_name": "act_api"
             }
         }
-    }
-else:
-    print("[DB] Unknown database - using NullPool (safe default)")
-    pool_config = {
+        if pool_mode == "null":
+            return {"poolclass": NullPool, "connect_args": connect_args}
+
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "connect_args": connect_args
+        }
+
+    return {
         "poolclass": NullPool
     }
 
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
+
+def configure_sqlite(engine: AsyncEngine) -> None:
+    """
+    Apply the SQLite performance profile to every new connection of an engine
+
+    WAL lets readers run alongside a writer, synchronous=NORMAL is durable in
+    WAL mode except on power loss, and busy_timeout makes writers wait for
+    the lock instead of failing with "database is locked".
+    """
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+
+# Configure connection pool based on database type
+pool_config = pool_options(db_url)
+
 # Create async engine
 engine = None
 try:
-    print("\n[DB] Creating async engine...")
     engine = create_async_engine(
         settings.DATABASE_URL,
         echo=False,
         future=True,
         **pool_config
     )
-    print("[DB] Async engine created successfully!")
-    print("[DB] Ready to connect to database")
-    print("="*60 + "\n")
+    configure_sqlite(engine)
 except Exception as e:
-    print(f"\n[DB] CRITICAL ERROR: {str(e)}")
-    print(f"[DB] Failed to create async engine")
-    print("[DB] Falling back to in-memory SQLite")
-    print("="*60 + "\n")
+    print(f"[DB] CRITICAL ERROR: {str(e)}")
+    print("[DB] Failed to create async engine, falling back to in-memory SQLite")
     
     # Fallback engine for resilience
     try:
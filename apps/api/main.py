@@ -1,11 +1,14 @@
-﻿from contextlib import asynccontextmanager
+﻿import time
+_boot_started = time.perf_counter()  # Before the heavy imports, for the startup timing report
+
+from contextlib import asynccontextmanager, contextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 from sqlalchemy import text
 
 from config import settings
-from db import engine, Base, AsyncSessionLocal
+from db import engine, AsyncSessionLocal
 from routers import auth as auth_router
 from routers import users as users_router
 from routers import categories as categories_router
@@ -21,80 +24,95 @@ from routers import password_reset as password_reset_router
 from routers import push_notifications as push_notifications_router
 from backup_service import daily_backup_task
 from seed_data import seed_default_data
+from services.migration_service import pending_migrations, run_migrations
+from services.goal_service import goal_update_queue
+from services.export_job_service import export_job_queue, resume_export_jobs, export_cleanup_task
+from services.user_cache import user_cache
+from services.conditional_get import conditional_get_metrics
+from services.book_catalog import book_catalog
+from services.fcm_service import fcm_service
+from services.notification_outbox import outbox_dispatcher, outbox_backlog
+from services.reminder_scheduler import reminder_scheduler
+
+
+@contextmanager
+def startup_phase(timings: dict, name: str):
+    """Record how long a startup step takes (milliseconds)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
+    lifespan_started = time.perf_counter()
+    timings = {"imports": round((lifespan_started - _boot_started) * 1000, 1)}
+    app.state.startup_timings = timings
+    
     print("🚀 Starting ACT Gen-1 API...")
-    print(f"📊 Database: {settings.DATABASE_URL[:50]}...")
+    print(f"📊 Database: {settings.DATABASE_URL[:50]}... (pool: {engine.pool.status()})")
     
     backup_task = None
+    export_cleanup = None
     
     try:
-        # STEP 1: Create all base tables from models
-        print("[DB] STEP 1: Creating base tables from models...")
-        try:
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-            print("[DB] ✓ Base tables created/verified")
-        except Exception as e:
-            print(f"[DB] ⚠️  Error creating base tables: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-        
-        # STEP 2: Run PostgreSQL-specific migrations
-        if "postgresql" in settings.DATABASE_URL.lower():
-            print("[DB] STEP 2: Running PostgreSQL migrations...")
+        # Schema: compare schema_migrations with migrations/ (migrations run via `python migrate.py`)
+        with startup_phase(timings, "migrations"):
             try:
-                async with engine.begin() as conn:
-                    # Drop books table for fresh recreation
-                    try:
-                        await conn.execute(text("DROP TABLE IF EXISTS books CASCADE"))
-                        print("[DB] ✓ Books table dropped (will be recreated)")
-                    except Exception as e:
-                        print(f"[DB] ⚠️  Note: Could not drop books table: {str(e)}")
-                    
-                    # Ensure currency column exists in users table
-                    try:
-                        await conn.execute(text("""
-                            ALTER TABLE users 
-                            ADD COLUMN IF NOT EXISTS currency VARCHAR NOT NULL DEFAULT 'USD'
-                        """))
-                        print("[DB] ✓ Currency column verified in users table")
-                    except Exception as e:
-                        print(f"[DB] ⚠️  Could not verify currency column: {str(e)}")
-                    
-                    # Ensure recovery_keyword column exists in users table
-                    try:
-                        await conn.execute(text("""
-                            ALTER TABLE users 
-                            ADD COLUMN IF NOT EXISTS recovery_keyword VARCHAR NOT NULL DEFAULT 'not_set'
-                        """))
-                        print("[DB] ✓ Recovery keyword column verified in users table")
-                    except Exception as e:
-                        print(f"[DB] ⚠️  Could not verify recovery_keyword column: {str(e)}")
-                
-                # Recreate tables that were dropped
-                print("[DB] STEP 3: Recreating dropped tables...")
-                async with engine.begin() as conn:
-                    await conn.run_sync(Base.metadata.create_all)
-                print("[DB] ✓ All tables finalized")
+                pending = await pending_migrations(engine)
+                if pending and settings.MIGRATE_ON_STARTUP:
+                    print(f"[DB] Applying {len(pending)} pending migration(s)...")
+                    for migration in await run_migrations(engine):
+                        print(f"[DB] ✓ {migration.name}")
+                elif pending:
+                    print(
+                        f"[DB] ⚠️  {len(pending)} pending migration(s) "
+                        f"({', '.join(m.name for m in pending)}) - run `python migrate.py`"
+                    )
             except Exception as e:
-                print(f"[DB] ⚠️  Error running PostgreSQL migrations: {str(e)}")
+                print(f"[DB] ⚠️  Error checking/applying migrations: {str(e)}")
                 import traceback
                 print(traceback.format_exc())
         
         print("✓ Database tables ready")
         
-        # Seed default data (categories and books)
+        # Seed default data (categories and books) - skipped when the seed version is unchanged
+        with startup_phase(timings, "seed"):
+            try:
+                async with AsyncSessionLocal() as session:
+                    if await seed_default_data(session):
+                        print("✓ Default data seeded")
+                    else:
+                        print("✓ Default data up to date")
+            except Exception as e:
+                print(f"[DB] ⚠️  Error seeding data: {str(e)}")
+        
+        # Start background goal maintenance workers
+        with startup_phase(timings, "workers"):
+            goal_update_queue.start()
+        print(f"✓ Goal update queue started ({goal_update_queue.concurrency} workers)")
+        
+        # Start export job workers; re-queue jobs interrupted by the last shutdown
         try:
-            async with AsyncSessionLocal() as session:
-                await seed_default_data(session)
-            print("✓ Default data seeded")
+            export_job_queue.start()
+            resumed = await resume_export_jobs()
+            export_cleanup = asyncio.create_task(export_cleanup_task())
+            print(f"✓ Export job queue started ({export_job_queue.concurrency} workers, {resumed} resumed)")
         except Exception as e:
-            print(f"[DB] ⚠️  Error seeding data: {str(e)}")
+            print(f"[Exports] ⚠️  Error starting export jobs: {str(e)}")
+        
+        # Start the push notification outbox dispatcher
+        outbox_dispatcher.start()
+        print(f"✓ Notification outbox dispatcher started (FCM {'available' if fcm_service.is_available() else 'not configured'})")
+        
+        # Start the reminder push scheduler (queues pushes for due reminders)
+        if settings.REMINDER_SCHEDULER_ENABLED:
+            reminder_scheduler.start()
+            print("✓ Reminder scheduler started")
         
         # Start daily backup task (only for SQLite, not PostgreSQL)
         try:
@@ -106,6 +124,8 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             print(f"[DB] ⚠️  Error starting backup task: {str(e)}")
         
+        timings["total"] = round((time.perf_counter() - _boot_started) * 1000, 1)
+        print("⏱️  Startup: " + " | ".join(f"{name} {ms} ms" for name, ms in timings.items()))
         print("✅ ACT Gen-1 API is ready!\n")
     except Exception as e:
         print(f"⚠️ Unexpected error during API initialization: {str(e)}")
@@ -119,6 +139,19 @@ async def lifespan(app: FastAPI):
     print("\n🛑 Shutting down ACT Gen-1 API...")
     if backup_task:
         backup_task.cancel()
+        # Let the task release its pooled connection before the engine is disposed
+        await asyncio.gather(backup_task, return_exceptions=True)
+    if export_cleanup:
+        export_cleanup.cancel()
+        await asyncio.gather(export_cleanup, return_exceptions=True)
+    await reminder_scheduler.stop()
+    await outbox_dispatcher.stop()
+    # Flush queued goal updates before the engine goes away
+    await goal_update_queue.stop(timeout=settings.GOAL_QUEUE_SHUTDOWN_TIMEOUT)
+    # Unfinished exports stay queued/running in the database and resume on next start
+    await export_job_queue.stop(timeout=0)
+    if fcm_service.delivery:
+        fcm_service.delivery.shutdown()
     await engine.dispose()
     print("✓ Cleanup complete")
 
@@ -217,6 +250,35 @@ async def health_db():
         return result
 
 
+@app.get("/health/queues")
+async def health_queues():
+    """Background queue depth, throughput and lag"""
+    async with AsyncSessionLocal() as db:
+        backlog = await outbox_backlog(db)
+    return {
+        "goals": goal_update_queue.metrics(),
+        "exports": export_job_queue.metrics(),
+        "push_outbox": {**outbox_dispatcher.metrics(), **backlog},
+        "reminders": reminder_scheduler.metrics(),
+    }
+
+
+@app.get("/health/startup")
+async def health_startup():
+    """Where the last boot spent its time (milliseconds per phase)"""
+    return getattr(app.state, "startup_timings", {})
+
+
+@app.get("/health/caches")
+async def health_caches():
+    """In-process cache size and hit/miss counters (per worker)"""
+    return {
+        "auth_users": user_cache.metrics(),
+        "books_catalog": book_catalog.metrics(),
+        "conditional_get": conditional_get_metrics(),
+    }
+
+
 # Include all routers
 app.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
 app.include_router(password_reset_router.router, prefix="/password-reset", tags=["Password Reset"])
@@ -0,0 +1,38 @@
+"""
+Database migration CLI
+
+Usage:
+    python migrate.py            # apply pending migrations
+    python migrate.py status     # show applied and pending migrations
+"""
+import argparse
+import asyncio
+import logging
+
+from db import engine
+from services.migration_service import load_migrations, pending_migrations, run_migrations
+
+
+async def main(command: str):
+    try:
+        if command == "status":
+            pending = {m.version for m in await pending_migrations(engine)}
+            for migration in load_migrations():
+                state = "pending" if migration.version in pending else "applied"
+                print(f"  [{state:>7}] {migration.name} - {migration.description}")
+            print(f"\n{len(pending)} pending migration(s)")
+        else:
+            applied = await run_migrations(engine)
+            for migration in applied:
+                print(f"✓ Applied {migration.name}")
+            print(f"✅ Database is up to date ({len(applied)} migration(s) applied)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply versioned database migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main(args.command))
@@ -0,0 +1,8 @@
+"""Baseline schema: create every table defined in models.py"""
+
+from db import Base
+
+
+async def upgrade(conn):
+    # checkfirst: databases created before versioned migrations keep their tables
+    await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,33 @@
+"""Add columns introduced before versioned migrations to old databases"""
+
+from sqlalchemy import text
+
+from services.migration_service import add_column_if_missing
+
+
+async def upgrade(conn):
+    await add_column_if_missing(conn, "users", "currency", "'USD'")
+    await add_column_if_missing(conn, "users", "recovery_keyword", "'not_set'")
+
+    if await add_column_if_missing(conn, "users", "is_admin", "false"):
+        # The first registered user becomes the admin
+        await conn.execute(text(
+            "UPDATE users SET is_admin = true WHERE id = (SELECT MIN(id) FROM users)"
+        ))
+
+    if await add_column_if_missing(conn, "categories", "expense_type"):
+        mandatory = ("Rent", "Utilities", "Groceries", "Transport", "Health")
+        excess = ("Entertainment", "Shopping", "Dining Out")
+        for expense_type, names in (("mandatory", mandatory), ("excess", excess)):
+            for name in names:
+                await conn.execute(
+                    text(
+                        "UPDATE categories SET expense_type = :expense_type "
+                        "WHERE name = :name AND type = 'expense'"
+                    ),
+                    {"expense_type": expense_type, "name": name}
+                )
+        await conn.execute(text(
+            "UPDATE categories SET expense_type = 'neutral' "
+            "WHERE type = 'expense' AND expense_type IS NULL"
+        ))
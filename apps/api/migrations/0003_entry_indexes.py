@@ -0,0 +1,8 @@
+"""Entry indexes for keyset pagination and delta sync"""
+
+from services.migration_service import create_index_if_missing
+
+
+async def upgrade(conn):
+    await create_index_if_missing(conn, "entries", "ix_entries_user_booked_id")
+    await create_index_if_missing(conn, "entries", "ix_entries_user_updated_id")
@@ -0,0 +1,15 @@
+"""Build daily_rollups for entries written before rollups were maintained"""
+
+from sqlalchemy import select, exists
+
+from models import DailyRollup
+from services.rollup_service import rollup_rebuild_statements
+
+
+async def upgrade(conn):
+    has_rollups = (await conn.execute(select(exists().where(DailyRollup.id.isnot(None))))).scalar()
+    if has_rollups:
+        return
+
+    for statement in rollup_rebuild_statements():
+        await conn.execute(statement)
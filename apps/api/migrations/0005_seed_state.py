@@ -0,0 +1,37 @@
+"""Seed bookkeeping: app_meta table and unique keys for default categories / catalog books"""
+
+import logging
+
+from sqlalchemy import text
+
+from services.migration_service import create_table_if_missing, create_index_if_missing
+
+logger = logging.getLogger(__name__)
+
+# index name -> query listing keys that would violate it
+UNIQUE_SEED_KEYS = {
+    "ux_categories_default_name_type": (
+        "categories",
+        "SELECT name, type FROM categories WHERE is_default "
+        "GROUP BY name, type HAVING COUNT(*) > 1"
+    ),
+    "ux_books_catalog_title_language": (
+        "books",
+        "SELECT title, language_code FROM books WHERE NOT is_user_created "
+        "GROUP BY title, language_code HAVING COUNT(*) > 1"
+    ),
+}
+
+
+async def upgrade(conn):
+    await create_table_if_missing(conn, "app_meta")
+
+    for index_name, (table_name, duplicates_query) in UNIQUE_SEED_KEYS.items():
+        duplicates = (await conn.execute(text(duplicates_query))).fetchall()
+        if duplicates:
+            # Seeding still skips existing rows; only concurrent boots lose their guard
+            logger.warning(
+                f"[Migrations] {index_name} not created: {len(duplicates)} duplicate key(s) in {table_name}"
+            )
+            continue
+        await create_index_if_missing(conn, table_name, index_name)
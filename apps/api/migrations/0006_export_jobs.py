@@ -0,0 +1,7 @@
+"""Background export jobs table"""
+
+from services.migration_service import create_table_if_missing
+
+
+async def upgrade(conn):
+    await create_table_if_missing(conn, "export_jobs")
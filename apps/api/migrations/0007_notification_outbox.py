@@ -0,0 +1,7 @@
+"""Push notification outbox table"""
+
+from services.migration_service import create_table_if_missing
+
+
+async def upgrade(conn):
+    await create_table_if_missing(conn, "notification_outbox")
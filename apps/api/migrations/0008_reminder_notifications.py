@@ -0,0 +1,8 @@
+"""Reminder push scheduling: reminders.notified_at and an updated_at index"""
+
+from services.migration_service import add_column_if_missing, create_index_if_missing
+
+
+async def upgrade(conn):
+    await add_column_if_missing(conn, "reminders", "notified_at")
+    await create_index_if_missing(conn, "reminders", "ix_reminders_updated_at")
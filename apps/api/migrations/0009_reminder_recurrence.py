@@ -0,0 +1,10 @@
+"""Recurring reminders: recurrence rule columns on reminders"""
+
+from services.migration_service import add_column_if_missing
+
+
+async def upgrade(conn):
+    await add_column_if_missing(conn, "reminders", "recurrence")
+    await add_column_if_missing(conn, "reminders", "recurrence_interval", server_default="1")
+    await add_column_if_missing(conn, "reminders", "recurrence_start")
+    await add_column_if_missing(conn, "reminders", "recurrence_until")
@@ -0,0 +1,11 @@
+"""Conditional GET: updated_at on categories and books (row versions for ETags)"""
+
+from sqlalchemy import text
+
+from services.migration_service import add_column_if_missing
+
+
+async def upgrade(conn):
+    for table_name in ("categories", "books"):
+        if await add_column_if_missing(conn, table_name, "updated_at", server_default="'1970-01-01 00:00:00'"):
+            await conn.execute(text(f"UPDATE {table_name} SET updated_at = created_at"))
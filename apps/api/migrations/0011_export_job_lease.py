@@ -0,0 +1,7 @@
+"""Export jobs: export_jobs.locked_until (worker lease, so a job runs in one process at a time)"""
+
+from services.migration_service import add_column_if_missing
+
+
+async def upgrade(conn):
+    await add_column_if_missing(conn, "export_jobs", "locked_until")
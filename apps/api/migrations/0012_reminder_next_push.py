@@ -0,0 +1,8 @@
+"""Recurring reminder pushes: reminders.next_push_at and its index"""
+
+from services.migration_service import add_column_if_missing, create_index_if_missing
+
+
+async def upgrade(conn):
+    await add_column_if_missing(conn, "reminders", "next_push_at")
+    await create_index_if_missing(conn, "reminders", "ix_reminders_next_push_at")
@@ -0,0 +1,15 @@
+"""Daily rollups: one row per key (unique ix_daily_rollups_key), rebuilt from entries"""
+
+from sqlalchemy import text
+
+from services.migration_service import create_index_if_missing
+from services.rollup_service import rollup_rebuild_statements
+
+
+async def upgrade(conn):
+    # Rebuilding merges duplicate keys and repairs totals that deltas applied to the wrong duplicate
+    for statement in rollup_rebuild_statements():
+        await conn.execute(statement)
+
+    await conn.execute(text("DROP INDEX IF EXISTS ix_daily_rollups_key"))
+    await create_index_if_missing(conn, "daily_rollups", "ix_daily_rollups_key")
@@ -0,0 +1,8 @@
+"""
+Versioned schema migrations, applied in order by services.migration_service
+
+Add a new file NNNN_short_description.py (next free number) with a one-line
+module docstring and `async def upgrade(conn)`. Migrations must be safe to
+run against databases created by older versions of the app, so prefer the
+*_if_missing helpers of services.migration_service.
+"""
@@ -2,7 +2,7 @@
 Complete data models for ACT Gen-1 MVP
 Using SQLAlchemy for consistency with existing auth system
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Text, Index, Enum as SQLEnum, text, func, literal_column
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -118,6 +118,13 @@ class UserDevice(Base):
 class Category(Base):
     """Expense/Income categories (default + custom)"""
     __tablename__ = "categories"
+    __table_args__ = (
+        # Seeding inserts default categories with ON CONFLICT DO NOTHING
+        Index(
+            "ux_categories_default_name_type", "name", "type", unique=True,
+            sqlite_where=text("is_default"), postgresql_where=text("is_default")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
@@ -129,6 +136,7 @@ class Category(Base):
     is_default = Column(Boolean, default=False, nullable=False, index=True)
     is_deleted = Column(Boolean, default=False, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="categories")
@@ -138,6 +146,12 @@ class Category(Base):
 class Entry(Base):
     """Financial entries (expenses and income)"""
     __tablename__ = "entries"
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? AND (booked_at, id) < (?, ?)
+        Index("ix_entries_user_booked_id", "user_id", "booked_at", "id"),
+        # Delta sync: WHERE user_id = ? AND (updated_at, id) > (?, ?)
+        Index("ix_entries_user_updated_id", "user_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -155,6 +169,56 @@ class Entry(Base):
     category = relationship("Category", back_populates="entries")
 
 
+class EntryTombstone(Base):
+    """Record of a deleted entry, so syncing clients can drop their local copy"""
+    __tablename__ = "entry_tombstones"
+    __table_args__ = (
+        Index("ix_entry_tombstones_user_deleted", "user_id", "deleted_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entry_id = Column(Integer, nullable=False)  # No FK: the entry row is gone
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class EntryClientKey(Base):
+    """Idempotency key of an entry created through POST /entries/batch"""
+    __tablename__ = "entry_client_keys"
+    __table_args__ = (
+        Index("ix_entry_client_keys_user_key", "user_id", "client_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    client_id = Column(String(64), nullable=False)  # Chosen by the device, unique per user
+    entry_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DailyRollup(Base):
+    """Per-user daily totals of entries, maintained on every entry write"""
+    __tablename__ = "daily_rollups"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)  # UTC date of Entry.booked_at
+    type = Column(SQLEnum(EntryType), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    total = Column(Float, default=0, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+
+
+# One row per key (NULL categories compare equal through COALESCE); target of the rollup upsert
+DAILY_ROLLUP_KEY = (
+    DailyRollup.user_id,
+    DailyRollup.day,
+    DailyRollup.type,
+    func.coalesce(DailyRollup.category_id, literal_column("0")),
+)
+Index("ix_daily_rollups_key", *DAILY_ROLLUP_KEY, unique=True)
+
+
 class Streak(Base):
     """Daily logging streak for motivation"""
     __tablename__ = "streaks"
@@ -191,6 +255,13 @@ class Goal(Base):
 class Book(Base):
     """Books library"""
     __tablename__ = "books"
+    __table_args__ = (
+        # Seeding inserts catalog books with ON CONFLICT DO NOTHING
+        Index(
+            "ux_books_catalog_title_language", "title", "language_code", unique=True,
+            sqlite_where=text("NOT is_user_created"), postgresql_where=text("NOT is_user_created")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -208,6 +279,7 @@ class Book(Base):
     file_size = Column(Integer, nullable=True)
     order_index = Column(Integer, default=0, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     user_progress = relationship("UserBookProgress", back_populates="book", cascade="all, delete-orphan")
@@ -263,6 +335,9 @@ class ReadingSession(Base):
 class Reminder(Base):
     """Planned expenses with local device reminders"""
     __tablename__ = "reminders"
+    __table_args__ = (
+        Index("ix_reminders_updated_at", "updated_at"),  # Incremental scheduler refresh
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -275,6 +350,13 @@ class Reminder(Base):
     is_completed = Column(Boolean, default=False, nullable=False, index=True)
     completed_at = Column(DateTime, nullable=True)
     entry_id = Column(Integer, ForeignKey("entries.id", ondelete="SET NULL"), nullable=True)  # Link to actual expense if created
+    notified_at = Column(DateTime, nullable=True)  # Push queued by the reminder scheduler (reset when rescheduled)
+    next_push_at = Column(DateTime, nullable=True, index=True)  # Recurring: next occurrence to push once the open one was pushed
+    # Recurrence rule: reminder_date is the open occurrence, later ones are expanded on read
+    recurrence = Column(String, nullable=True)  # daily, weekly, monthly (NULL = one-off)
+    recurrence_interval = Column(Integer, default=1, nullable=False)  # Every N days/weeks/months
+    recurrence_start = Column(DateTime, nullable=True)  # First occurrence (keeps the day of month)
+    recurrence_until = Column(DateTime, nullable=True)  # Last possible occurrence (NULL = open-ended)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -302,6 +384,31 @@ class PushToken(Base):
     user = relationship("User", back_populates="push_tokens")
 
 
+class NotificationOutbox(Base):
+    """Push notification waiting for (re)delivery by the outbox dispatcher"""
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(32), default="generic", nullable=False)  # reminder, goal, book, motivation, test...
+    title = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    data = Column(Text, nullable=True)  # JSON object of string values
+    priority = Column(String(16), default="high", nullable=False)
+    tokens = Column(Text, nullable=True)  # JSON list still to deliver to; NULL = all active tokens of the user
+    status = Column(String(16), default="pending", nullable=False)  # pending, sending, sent, skipped, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    delivered = Column(Integer, default=0, nullable=False)  # Devices reached so far
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_until = Column(DateTime, nullable=True)  # Claim lease of the dispatcher sending it
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+
 class DatabaseBackup(Base):
     """Track database backups"""
     __tablename__ = "database_backups"
@@ -312,4 +419,37 @@ class DatabaseBackup(Base):
     file_size = Column(Integer, nullable=False)  # bytes
     backup_type = Column(String, default="daily", nullable=False)  # daily, manual
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
-    created_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
\ No newline at end of file
+    created_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+
+class ExportJob(Base):
+    """Background export of a user's entries into a downloadable file"""
+    __tablename__ = "export_jobs"
+    __table_args__ = (
+        Index("ix_export_jobs_user_created", "user_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    format = Column(String(16), nullable=False)  # csv, json, ndjson, parquet, arrow
+    start_date = Column(DateTime, nullable=True)
+    end_date = Column(DateTime, nullable=True)
+    status = Column(String(16), default="queued", nullable=False, index=True)  # queued, running, done, failed
+    filename = Column(String, nullable=True)
+    file_path = Column(String, nullable=True)
+    file_size = Column(Integer, nullable=True)  # bytes
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    locked_until = Column(DateTime, nullable=True)  # Lease of the worker running the job (renewed while it runs)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True, index=True)  # File and row are removed after this
+
+
+class AppMeta(Base):
+    """Key/value state of the deployment itself (e.g. the applied seed version)"""
+    __tablename__ = "app_meta"
+    
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,31 @@
+"""
+Rebuild the daily_rollups table from entries (backfill or repair)
+
+Usage:
+    python rebuild_rollups.py              # all users
+    python rebuild_rollups.py --user-id 7  # a single user
+"""
+import argparse
+import asyncio
+
+from db import engine, AsyncSessionLocal
+from services.migration_service import run_migrations
+from services.rollup_service import rebuild_rollups
+
+
+async def main(user_id=None):
+    await run_migrations(engine)
+
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_rollups(session, user_id)
+
+    scope = f"user {user_id}" if user_id is not None else "all users"
+    print(f"✓ Rebuilt {rows} daily rollup rows for {scope}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild per-user daily rollups")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id))
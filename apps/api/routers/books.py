@@ -21,14 +21,11 @@ from schemas import (
     BookStatsOut
 )
 from security import get_current_user
+from services.conditional_get import conditional_get
+from services.book_catalog import book_catalog, with_progress, progress_by_book
 
-# PDF files storage directory
+# PDF files storage directory (language subdirectories are created on upload)
 UPLOADS_DIR = Path("uploads/books")
-UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
-
-# Create language directories
-for lang in ["en", "ru", "uz"]:
-    (UPLOADS_DIR / lang).mkdir(parents=True, exist_ok=True)
 
 router = APIRouter()
 
@@ -123,6 +120,7 @@ async def create_book(
     db.add(book)
     await db.commit()
     await db.refresh(book)
+    book_catalog.invalidate()
     
     return BookOut(
         id=book.id,
@@ -145,7 +143,7 @@ async def create_book(
     )
 
 
-@router.get("/", response_model=List[BookOut])
+@router.get("/", response_model=List[BookOut], dependencies=[Depends(conditional_get("books"))])
 async def list_books(
     status_filter: Optional[str] = Query(None),  # not_started, in_progress, done
     lang: Optional[str] = Query(None),  # Optionally override user's language (en, ru, uz)
@@ -162,28 +160,9 @@ async def list_books(
     # Determine which language to filter by
     book_language = lang or current_user.language  # Use provided lang or user's preference
     
-    if not include_all_languages:
-        # Filter by language if not requesting all languages
-        result = await db.execute(
-            select(Book)
-            .where(Book.language_code == book_language)
-            .order_by(Book.order_index, Book.created_at)
-        )
-    else:
-        # Get all books regardless of language
-        result = await db.execute(
-            select(Book).order_by(Book.order_index, Book.created_at)
-        )
-    
-    books = result.scalars().all()
-    
-    # Get user's progress for all books
-    progress_result = await db.execute(
-        select(UserBookProgress).where(
-            UserBookProgress.user_id == current_user.id
-        )
-    )
-    progress_map = {p.book_id: p for p in progress_result.scalars().all()}
+    # Catalog payloads come from the in-process cache; only progress is per user
+    books = await book_catalog.books(db, None if include_all_languages else book_language)
+    progress_map = await progress_by_book(db, current_user.id)
     
     # Build response with filtering
     books_out = []
@@ -199,41 +178,7 @@ async def list_books(
             if status_filter != "not_started":
                 continue
         
-        user_progress_out = None
-        if progress:
-            user_progress_out = UserBookProgressOut(
-                user_id=progress.user_id,
-                book_id=progress.book_id,
-                status=progress.status,
-                progress_percent=progress.progress_percent,
-                pages_read=progress.pages_read,
-                chapters_read=progress.chapters_read,
-                total_time_minutes=progress.total_time_minutes,
-                started_at=progress.started_at,
-                completed_at=progress.completed_at,
-                updated_at=progress.updated_at
-            )
-        
-        book_out = BookOut(
-            id=book.id,
-            title=book.title,
-            author=book.author,
-            cover_url=book.cover_url,
-            summary=book.summary,
-            key_takeaways=book.key_takeaways,
-            genre=book.genre,
-            isbn=book.isbn,
-            total_pages=book.total_pages,
-            total_chapters=book.total_chapters,
-            is_user_created=book.is_user_created,
-            language_code=book.language_code,
-            file_path=book.file_path,
-            file_size=book.file_size,
-            order_index=book.order_index,
-            created_at=book.created_at,
-            user_progress=user_progress_out
-        )
-        books_out.append(book_out)
+        books_out.append(with_progress(book, progress))
     
     return books_out
 
@@ -245,10 +190,7 @@ async def get_book(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific book with user's progress and reading sessions"""
-    result = await db.execute(
-        select(Book).where(Book.id == book_id)
-    )
-    book = result.scalar_one_or_none()
+    book = await book_catalog.book(db, book_id)
     
     if not book:
         raise HTTPException(
@@ -263,42 +205,7 @@ async def get_book(
             UserBookProgress.book_id == book_id
         )
     )
-    progress = progress_result.scalar_one_or_none()
-    
-    user_progress_out = None
-    if progress:
-        user_progress_out = UserBookProgressOut(
-            user_id=progress.user_id,
-            book_id=progress.book_id,
-            status=progress.status,
-            progress_percent=progress.progress_percent,
-            pages_read=progress.pages_read,
-            chapters_read=progress.chapters_read,
-            total_time_minutes=progress.total_time_minutes,
-            started_at=progress.started_at,
-            completed_at=progress.completed_at,
-            updated_at=progress.updated_at
-        )
-    
-    return BookOut(
-        id=book.id,
-        title=book.title,
-        author=book.author,
-        cover_url=book.cover_url,
-        summary=book.summary,
-        key_takeaways=book.key_takeaways,
-        genre=book.genre,
-        isbn=book.isbn,
-        total_pages=book.total_pages,
-        total_chapters=book.total_chapters,
-        is_user_created=book.is_user_created,
-        language_code=book.language_code,
-        file_path=book.file_path,
-        file_size=book.file_size,
-        order_index=book.order_index,
-        created_at=book.created_at,
-        user_progress=user_progress_out
-    )
+    return with_progress(book, progress_result.scalar_one_or_none())
 
 
 # ===== READING SESSIONS =====
@@ -560,14 +467,7 @@ async def get_reading_stats(
     book_language = lang or current_user.language
     
     # Get books (filtered by language)
-    if include_all_languages:
-        book_result = await db.execute(select(Book))
-    else:
-        book_result = await db.execute(
-            select(Book).where(Book.language_code == book_language)
-        )
-    
-    all_books = book_result.scalars().all()
+    all_books = await book_catalog.books(db, None if include_all_languages else book_language)
     total_books = len(all_books)
     
     # Get user's progress for all books
@@ -627,10 +527,7 @@ async def get_reading_stats(
             default=None
         )
         if most_recent:
-            book = await db.execute(
-                select(Book).where(Book.id == most_recent.book_id)
-            )
-            book_obj = book.scalar_one_or_none()
+            book_obj = await book_catalog.book(db, most_recent.book_id)
             if book_obj:
                 recent_activity = {
                     "book_title": book_obj.title,
@@ -688,14 +585,7 @@ async def get_reading_stats_alias(
     book_language = lang or current_user.language
     
     # Get books (filtered by language)
-    if include_all_languages:
-        book_result = await db.execute(select(Book))
-    else:
-        book_result = await db.execute(
-            select(Book).where(Book.language_code == book_language)
-        )
-    
-    all_books = book_result.scalars().all()
+    all_books = await book_catalog.books(db, None if include_all_languages else book_language)
     total_books = len(all_books)
     
     # Get user's progress for all books
@@ -765,10 +655,7 @@ async def get_reading_stats_alias(
             default=None
         )
         if most_recent:
-            book = await db.execute(
-                select(Book).where(Book.id == most_recent.book_id)
-            )
-            book_obj = book.scalar_one_or_none()
+            book_obj = await book_catalog.book(db, most_recent.book_id)
             if book_obj:
                 recent_activity = {
                     "book_title": book_obj.title,
@@ -846,6 +733,7 @@ async def delete_book(
     
     await db.delete(book)
     await db.commit()
+    book_catalog.invalidate()
     
     return {"message": "Book deleted successfully"}
 
@@ -867,64 +755,11 @@ async def get_books_by_language(
             detail="Language code must be 'en', 'ru', or 'uz'"
         )
     
-    # Get all books with the specified language
-    result = await db.execute(
-        select(Book)
-        .where(Book.language_code == language_code)
-        .order_by(Book.order_index, Book.created_at)
-    )
-    books = result.scalars().all()
+    # Get all books with the specified language (cached catalog) and merge the user's progress
+    books = await book_catalog.books(db, language_code)
+    progress_map = await progress_by_book(db, current_user.id)
     
-    # Get user's progress for all books
-    progress_result = await db.execute(
-        select(UserBookProgress).where(
-            UserBookProgress.user_id == current_user.id
-        )
-    )
-    progress_map = {p.book_id: p for p in progress_result.scalars().all()}
-    
-    # Build response
-    books_out = []
-    for book in books:
-        progress = progress_map.get(book.id)
-        
-        user_progress_out = None
-        if progress:
-            user_progress_out = UserBookProgressOut(
-                user_id=progress.user_id,
-                book_id=progress.book_id,
-                status=progress.status,
-                progress_percent=progress.progress_percent,
-                pages_read=progress.pages_read,
-                chapters_read=progress.chapters_read,
-                total_time_minutes=progress.total_time_minutes,
-                started_at=progress.started_at,
-                completed_at=progress.completed_at,
-                updated_at=progress.updated_at
-            )
-        
-        book_out = BookOut(
-            id=book.id,
-            title=book.title,
-            author=book.author,
-            cover_url=book.cover_url,
-            summary=book.summary,
-            key_takeaways=book.key_takeaways,
-            genre=book.genre,
-            isbn=book.isbn,
-            total_pages=book.total_pages,
-            total_chapters=book.total_chapters,
-            is_user_created=book.is_user_created,
-            language_code=book.language_code,
-            file_path=book.file_path,
-            file_size=book.file_size,
-            order_index=book.order_index,
-            created_at=book.created_at,
-            user_progress=user_progress_out
-        )
-        books_out.append(book_out)
-    
-    return books_out
+    return [with_progress(book, progress_map.get(book.id)) for book in books]
 
 
 @router.post("/{book_id}/upload")
@@ -983,6 +818,7 @@ async def upload_book_file(
     
     await db.commit()
     await db.refresh(book)
+    book_catalog.invalidate()
     
     return {
         "message": "File uploaded successfully",
@@ -3,18 +3,21 @@ Categories API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, update, delete, or_
+from datetime import datetime
 from typing import List
 
 from db import get_db
-from models import User, Category
+from models import User, Category, Entry, DailyRollup
 from schemas import CategoryCreate, CategoryUpdate, CategoryOut
 from security import get_current_user
+from services.rollup_service import rebuild_rollups
+from services.conditional_get import conditional_get
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[CategoryOut])
+@router.get("/", response_model=List[CategoryOut], dependencies=[Depends(conditional_get("categories"))])
 async def list_categories(
     type: str = None,
     expense_type: str = None,
@@ -187,10 +190,25 @@ async def delete_category(
         )
     
     if hard_delete:
+        # Uncategorize the entries explicitly so delta sync sees them as changed
+        await db.execute(
+            update(Entry)
+            .where(Entry.category_id == category.id)
+            .values(category_id=None, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        # Its rollups would be SET NULL onto keys the day's uncategorized rows already hold
+        await db.execute(
+            delete(DailyRollup)
+            .where(DailyRollup.category_id == category.id)
+            .execution_options(synchronize_session=False)
+        )
         await db.delete(category)
+        await db.flush()
+        # The entries are uncategorized now; re-derive their rollups (commits)
+        await rebuild_rollups(db, current_user.id)
     else:
         category.is_deleted = True
-    
-    await db.commit()
+        await db.commit()
     
     return None
\ No newline at end of file
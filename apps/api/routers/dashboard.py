@@ -3,42 +3,30 @@ Dashboard API endpoints - Statistics and analytics
 """
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
 from datetime import datetime, timedelta
 from typing import List
 
 from db import get_db
-from models import User, Entry, Category, EntryType
+from models import User
 from schemas import DashboardResponse, DashboardStats, CategoryBreakdown
 from security import get_current_user
+from services.aggregation_service import aggregate_entries, summarize_window, category_totals
+from services.conditional_get import conditional_get
 
 router = APIRouter()
 
 
-async def calculate_stats(
-    user_id: int,
+def build_stats(
+    groups: list,
+    key,
     days: int,
-    db: AsyncSession
+    start_date: datetime,
+    end_date: datetime
 ) -> DashboardStats:
-    """Calculate statistics for a given period"""
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
-    
-    # Get all entries in period
-    result = await db.execute(
-        select(Entry).where(
-            and_(
-                Entry.user_id == user_id,
-                Entry.booked_at >= start_date,
-                Entry.booked_at <= end_date
-            )
-        )
-    )
-    entries = result.scalars().all()
-    
-    # Calculate totals
-    total_income = sum(e.amount for e in entries if e.type == EntryType.income)
-    total_expenses = sum(e.amount for e in entries if e.type == EntryType.expense)
+    """Build DashboardStats for one window of aggregated groups"""
+    totals = summarize_window(groups, key)
+    total_income = totals["total_income"]
+    total_expenses = totals["total_expenses"]
     balance = total_income - total_expenses
     
     return DashboardStats(
@@ -46,12 +34,46 @@ async def calculate_stats(
         total_income=round(total_income, 2),
         total_expenses=round(total_expenses, 2),
         balance=round(balance, 2),
-        entry_count=len(entries),
+        entry_count=totals["entry_count"],
         start_date=start_date,
         end_date=end_date
     )
 
 
+def build_category_breakdown(groups: list, key) -> List[CategoryBreakdown]:
+    """Build CategoryBreakdown list (largest first) for one window of aggregated groups"""
+    totals = category_totals(groups, key)
+    total_amount = sum(t["amount"] for t in totals)
+    
+    breakdowns = []
+    for t in totals:
+        percentage = (t["amount"] / total_amount * 100) if total_amount > 0 else 0
+        
+        breakdowns.append(CategoryBreakdown(
+            category_id=t["category_id"],
+            category_name=t["category_name"],
+            type=t["type"],
+            total_amount=round(t["amount"], 2),
+            entry_count=t["count"],
+            percentage=round(percentage, 2)
+        ))
+    
+    return breakdowns
+
+
+async def calculate_stats(
+    user_id: int,
+    days: int,
+    db: AsyncSession
+) -> DashboardStats:
+    """Calculate statistics for a given period"""
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+    
+    groups = await aggregate_entries(db, user_id, {days: start_date}, end_date)
+    return build_stats(groups, days, days, start_date, end_date)
+
+
 async def calculate_category_breakdown(
     user_id: int,
     days: int,
@@ -61,62 +83,11 @@ async def calculate_category_breakdown(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get entries with categories
-    result = await db.execute(
-        select(Entry, Category).outerjoin(
-            Category, Entry.category_id == Category.id
-        ).where(
-            and_(
-                Entry.user_id == user_id,
-                Entry.booked_at >= start_date,
-                Entry.booked_at <= end_date
-            )
-        )
-    )
-    entries_with_categories = result.all()
-    
-    # Group by category
-    category_totals = {}
-    total_amount = 0
-    
-    for entry, category in entries_with_categories:
-        cat_name = category.name if category else "Uncategorized"
-        cat_id = category.id if category else None
-        cat_type = entry.type
-        
-        key = (cat_id, cat_name, cat_type)
-        
-        if key not in category_totals:
-            category_totals[key] = {
-                "amount": 0,
-                "count": 0
-            }
-        
-        category_totals[key]["amount"] += entry.amount
-        category_totals[key]["count"] += 1
-        total_amount += entry.amount
-    
-    # Convert to CategoryBreakdown objects
-    breakdowns = []
-    for (cat_id, cat_name, cat_type), data in category_totals.items():
-        percentage = (data["amount"] / total_amount * 100) if total_amount > 0 else 0
-        
-        breakdowns.append(CategoryBreakdown(
-            category_id=cat_id,
-            category_name=cat_name,
-            type=cat_type,
-            total_amount=round(data["amount"], 2),
-            entry_count=data["count"],
-            percentage=round(percentage, 2)
-        ))
-    
-    # Sort by amount descending
-    breakdowns.sort(key=lambda x: x.total_amount, reverse=True)
-    
-    return breakdowns
+    groups = await aggregate_entries(db, user_id, {days: start_date}, end_date)
+    return build_category_breakdown(groups, days)
 
 
-@router.get("/", response_model=DashboardResponse)
+@router.get("/", response_model=DashboardResponse, dependencies=[Depends(conditional_get("dashboard"))])
 async def get_dashboard(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -127,12 +98,18 @@ async def get_dashboard(
     - 30-day statistics
     - Category breakdown (30 days)
     """
-    # Calculate stats for both periods
-    stats_7d = await calculate_stats(current_user.id, 7, db)
-    stats_30d = await calculate_stats(current_user.id, 30, db)
+    # One grouped scan of the 30-day window answers both periods and the breakdown
+    end_date = datetime.utcnow()
+    start_7d = end_date - timedelta(days=7)
+    start_30d = end_date - timedelta(days=30)
+    
+    groups = await aggregate_entries(
+        db, current_user.id, {7: start_7d, 30: start_30d}, end_date
+    )
     
-    # Calculate category breakdown for 30 days
-    category_breakdown = await calculate_category_breakdown(current_user.id, 30, db)
+    stats_7d = build_stats(groups, 7, 7, start_7d, end_date)
+    stats_30d = build_stats(groups, 30, 30, start_30d, end_date)
+    category_breakdown = build_category_breakdown(groups, 30)
     
     return DashboardResponse(
         stats_7d=stats_7d,
@@ -1,44 +1,84 @@
 """
 Entries (Expenses/Income) API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, func, tuple_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Tuple
 from datetime import datetime
+import base64
+import json
 
+from config import settings
 from db import get_db
 from models import User, Entry, Category, EntryType
-from schemas import EntryCreate, EntryUpdate, EntryOut
+from schemas import EntryCreate, EntryUpdate, EntryOut, EntryChangesOut, EntryBatchCreate, EntryBatchOut
 from security import get_current_user
+from services.rollup_service import add_entry_to_rollups, remove_entry_from_rollups
+from services.goal_service import entry_snapshot, entry_goal_delta, goal_update_queue
+from services.entry_batch_service import create_entries_batch
+from services.sync_service import (
+    fetch_entry_changes, record_entry_tombstone, SyncTokenError, SyncTokenExpired
+)
 
 router = APIRouter()
 
 
-async def update_goals_after_entry_change(user_id: int, entry_date: datetime, db: AsyncSession):
+async def compute_goal_update(
+    user_id: int,
+    old: Optional[dict],
+    new: Optional[dict],
+    db: AsyncSession
+) -> Optional[dict]:
     """
-    Update user goals after an entry is created or updated.
-    This is called automatically to keep goals in sync with entries.
+    Compute how an entry change moves the user's goals.
+    Call inside the entry's transaction (after the rollup update) and hand
+    the result to submit_goal_update() once the transaction is committed.
     """
     try:
-        # Import here to avoid circular imports
-        from routers.motivation import update_goals_for_user
-        await update_goals_for_user(user_id, db, entry_date)
+        return await entry_goal_delta(db, user_id, old, new)
     except Exception as e:
         # Log but don't fail - goals should not block entry operations
-        print(f"Warning: Failed to update goals: {str(e)}")
-        pass
+        print(f"Warning: Failed to compute goal update: {str(e)}")
+        return None
+
+
+def submit_goal_update(user_id: int, delta: Optional[dict]) -> None:
+    """Hand a committed entry's goal delta to the background goal queue"""
+    if delta and (delta["spend"] or delta["days"]):
+        goal_update_queue.submit(user_id, delta)
+
+
+def encode_entry_cursor(entry: Entry) -> str:
+    """Opaque keyset cursor pointing just past an entry in (booked_at, id) desc order"""
+    raw = json.dumps({"b": entry.booked_at.isoformat(), "i": entry.id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_entry_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["b"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 
 @router.get("/", response_model=List[EntryOut])
 async def list_entries(
+    response: Response,
     type: Optional[EntryType] = None,
     category_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -47,7 +87,11 @@ async def list_entries(
     - Filter by type (expense/income)
     - Filter by category
     - Filter by date range
-    - Pagination support
+    - Pagination support:
+      - cursor mode: pass the X-Next-Cursor response header of the previous
+        page as ?cursor= (offset is ignored); cost is independent of depth
+      - offset mode: ?offset=N (kept for compatibility)
+    - X-Next-Cursor is set whenever more entries follow this page
     """
     query = select(Entry).where(Entry.user_id == current_user.id)
     
@@ -64,11 +108,18 @@ async def list_entries(
     if end_date:
         query = query.where(Entry.booked_at <= end_date)
     
-    # Order by booked_at descending (most recent first)
-    query = query.order_by(Entry.booked_at.desc())
+    # Order by booked_at descending (most recent first), id breaks ties
+    query = query.order_by(Entry.booked_at.desc(), Entry.id.desc())
     
-    # Pagination
-    query = query.offset(offset).limit(limit)
+    # Pagination (one extra row tells whether another page exists)
+    if cursor:
+        cursor_booked_at, cursor_id = decode_entry_cursor(cursor)
+        query = query.where(
+            tuple_(Entry.booked_at, Entry.id) < tuple_(cursor_booked_at, cursor_id)
+        )
+    else:
+        query = query.offset(offset)
+    query = query.limit(limit + 1)
     
     # Load category relationship
     query = query.options(selectinload(Entry.category))
@@ -76,9 +127,41 @@ async def list_entries(
     result = await db.execute(query)
     entries = result.scalars().all()
     
+    if len(entries) > limit:
+        entries = entries[:limit]
+        response.headers["X-Next-Cursor"] = encode_entry_cursor(entries[-1])
+    
     return entries
 
 
+@router.get("/changes", response_model=EntryChangesOut)
+async def list_entry_changes(
+    since: Optional[str] = Query(default=None, description="next_token from the previous sync"),
+    limit: int = Query(default=500, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delta sync for offline clients
+    - Without since: every entry (initial download), paged
+    - With since: entries created/updated and ids of entries deleted since the token
+    - Keep calling with next_token while has_more is true
+    - 410 Gone: token too old, drop local entries and sync again without since
+    """
+    try:
+        return await fetch_entry_changes(db, current_user.id, since, limit)
+    except SyncTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+    except SyncTokenExpired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired, full resync required"
+        )
+
+
 @router.get("/{entry_id}", response_model=EntryOut)
 async def get_entry(
     entry_id: int,
@@ -145,19 +228,65 @@ async def create_entry(
     )
     
     db.add(entry)
+    await add_entry_to_rollups(db, entry)
+    goal_delta = await compute_goal_update(current_user.id, None, entry_snapshot(entry), db)
     await db.commit()
     await db.refresh(entry)
     
     # Load category relationship
     await db.refresh(entry, ["category"])
     
-    # Update goals based on this new entry
-    # This must happen AFTER the entry is committed to the database
-    await update_goals_after_entry_change(current_user.id, entry.booked_at, db)
+    # Update goals in the background, only AFTER the entry is committed
+    submit_goal_update(current_user.id, goal_delta)
     
     return entry
 
 
+@router.post("/batch", response_model=EntryBatchOut)
+async def create_entries_in_batch(
+    batch: EntryBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many entries in one request (offline queue flush)
+    - Each item is validated on its own; invalid items are reported, not fatal
+    - Items with a client_id already seen are returned as "duplicate" with the
+      original entry, so retrying a flush never double-inserts
+    - Results are returned in request order
+    """
+    if len(batch.items) > settings.ENTRY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.ENTRY_BATCH_MAX_ITEMS} entries per batch"
+        )
+    
+    try:
+        results, goal_delta = await create_entries_batch(db, current_user.id, batch.items)
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry of the same batch stored the idempotency keys first
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch is already being processed, retry"
+        )
+    
+    # Update goals once for the whole batch
+    submit_goal_update(current_user.id, goal_delta)
+    
+    counts = {"created": 0, "duplicate": 0, "error": 0}
+    for res in results:
+        counts[res["status"]] += 1
+    
+    return {
+        "results": results,
+        "created": counts["created"],
+        "duplicates": counts["duplicate"],
+        "errors": counts["error"]
+    }
+
+
 @router.patch("/{entry_id}", response_model=EntryOut)
 async def update_entry(
     entry_id: int,
@@ -206,17 +335,23 @@ async def update_entry(
                 detail=f"Category type '{category.type}' does not match entry type '{entry.type}'"
             )
     
+    # Move the entry's contribution out of its old rollup before changing it
+    old_snapshot = entry_snapshot(entry)
+    await remove_entry_from_rollups(db, entry)
+    
     # Update fields
     update_data = entry_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(entry, field, value)
     
+    await add_entry_to_rollups(db, entry)
+    goal_delta = await compute_goal_update(current_user.id, old_snapshot, entry_snapshot(entry), db)
     await db.commit()
     await db.refresh(entry)
     await db.refresh(entry, ["category"])
     
     # Update goals based on the modified entry
-    await update_goals_after_entry_change(current_user.id, entry.booked_at, db)
+    submit_goal_update(current_user.id, goal_delta)
     
     return entry
 
@@ -242,14 +377,17 @@ async def delete_entry(
             detail="Entry not found"
         )
     
-    # Store the date before deleting
-    entry_date = entry.booked_at
+    # Store the entry's goal contribution before deleting
+    old_snapshot = entry_snapshot(entry)
     
+    await remove_entry_from_rollups(db, entry)
+    goal_delta = await compute_goal_update(current_user.id, old_snapshot, None, db)
+    await record_entry_tombstone(db, entry)
     await db.delete(entry)
     await db.commit()
     
     # Update goals after deletion
-    await update_goals_after_entry_change(current_user.id, entry_date, db)
+    submit_goal_update(current_user.id, goal_delta)
     
     return None
 
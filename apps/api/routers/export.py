@@ -1,144 +1,220 @@
 """
-Data Export API endpoints - CSV export of entries
+Data Export API endpoints - CSV / JSON / NDJSON / Parquet / Arrow export of entries,
+streamed directly or produced by a background job and downloaded later
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from typing import Optional
-import csv
-import io
+from pathlib import Path
+from typing import List, Optional
 
 from db import get_db
-from models import User, Entry
+from models import ExportJob, User
+from schemas import ExportJobCreate, ExportJobOut
 from security import get_current_user
+from services.export_service import (
+    iter_export_batches, csv_chunks, json_document_chunks, ndjson_chunks, gzip_chunks,
+    columnar_chunks, PYARROW_AVAILABLE
+)
+from services.export_job_service import (
+    create_export_job, enqueue_export_job, media_type_for, ExportJobError
+)
 
 router = APIRouter()
 
 
+def _stream_export(chunks, extension: str, media_type: str, compress: bool) -> StreamingResponse:
+    """Attachment response for an export stream, optionally gzipped"""
+    # Generate filename
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    filename = f"act_entries_{timestamp}.{extension}"
+    
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
+
 @router.get("/entries/csv")
 async def export_entries_csv(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    compress: bool = Query(default=False, description="Gzip the file on the fly (.csv.gz)"),
+    current_user: User = Depends(get_current_user)
 ):
     """
     Export user's entries as CSV file
     Optionally filter by date range
+    Rows are streamed from the database in batches, so memory use stays flat
+    and the first bytes go out immediately
     """
-    # Build query
-    query = select(Entry).where(Entry.user_id == current_user.id)
-    
-    if start_date:
-        query = query.where(Entry.booked_at >= start_date)
-    
-    if end_date:
-        query = query.where(Entry.booked_at <= end_date)
-    
-    query = query.order_by(Entry.booked_at.desc())
-    query = query.options(selectinload(Entry.category))
-    
-    # Execute query
-    result = await db.execute(query)
-    entries = result.scalars().all()
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        'ID',
-        'Type',
-        'Category',
-        'Amount',
-        'Currency',
-        'Note',
-        'Date',
-        'Created At'
-    ])
-    
-    # Write data
-    for entry in entries:
-        category_name = entry.category.name if entry.category else 'Uncategorized'
-        
-        writer.writerow([
-            entry.id,
-            entry.type.value,
-            category_name,
-            entry.amount,
-            entry.currency,
-            entry.note or '',
-            entry.booked_at.strftime('%Y-%m-%d %H:%M:%S'),
-            entry.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
-    
-    # Prepare response
-    output.seek(0)
-    
-    # Generate filename
-    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-    filename = f"act_entries_{timestamp}.csv"
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
+    chunks = csv_chunks(iter_export_batches(current_user.id, start_date, end_date))
+    return _stream_export(chunks, "csv", "text/csv", compress)
 
 
 @router.get("/entries/json")
 async def export_entries_json(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    compress: bool = Query(default=False, description="Gzip the body on the fly"),
+    current_user: User = Depends(get_current_user)
 ):
     """
     Export user's entries as JSON
     Optionally filter by date range
+    The entries array is streamed as rows are read; total_entries comes last
     """
-    # Build query
-    query = select(Entry).where(Entry.user_id == current_user.id)
-    
-    if start_date:
-        query = query.where(Entry.booked_at >= start_date)
-    
-    if end_date:
-        query = query.where(Entry.booked_at <= end_date)
-    
-    query = query.order_by(Entry.booked_at.desc())
-    query = query.options(selectinload(Entry.category))
-    
-    # Execute query
-    result = await db.execute(query)
-    entries = result.scalars().all()
-    
-    # Convert to dict
-    entries_data = []
-    for entry in entries:
-        entries_data.append({
-            "id": entry.id,
-            "type": entry.type.value,
-            "category": entry.category.name if entry.category else None,
-            "category_id": entry.category_id,
-            "amount": entry.amount,
-            "currency": entry.currency,
-            "note": entry.note,
-            "booked_at": entry.booked_at.isoformat(),
-            "created_at": entry.created_at.isoformat(),
-            "updated_at": entry.updated_at.isoformat()
-        })
-    
-    return {
+    header = {
         "user_id": current_user.id,
         "user_email": current_user.email,
-        "exported_at": datetime.utcnow().isoformat(),
-        "total_entries": len(entries_data),
-        "entries": entries_data
-    }
\ No newline at end of file
+        "exported_at": datetime.utcnow().isoformat()
+    }
+    chunks = json_document_chunks(iter_export_batches(current_user.id, start_date, end_date), header)
+    return _stream_export(chunks, "json", "application/json", compress)
+
+
+@router.get("/entries/ndjson")
+async def export_entries_ndjson(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    compress: bool = Query(default=False, description="Gzip the body on the fly"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export user's entries as newline-delimited JSON (one entry per line)
+    Consumers can process entries as they arrive
+    """
+    chunks = ndjson_chunks(iter_export_batches(current_user.id, start_date, end_date))
+    return _stream_export(chunks, "ndjson", "application/x-ndjson", compress)
+
+
+def _require_pyarrow() -> None:
+    if not PYARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Columnar export is not available on this server (pyarrow is not installed)"
+        )
+
+
+@router.get("/entries/parquet")
+async def export_entries_parquet(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export user's entries as a Parquet file (typed, zstd-compressed columns)
+    Optionally filter by date range
+    Much smaller than CSV and loads directly into pandas/DuckDB/spreadsheets
+    """
+    _require_pyarrow()
+    chunks = columnar_chunks(iter_export_batches(current_user.id, start_date, end_date), "parquet")
+    return _stream_export(chunks, "parquet", "application/vnd.apache.parquet", compress=False)
+
+
+@router.get("/entries/arrow")
+async def export_entries_arrow(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export user's entries as an Arrow IPC stream (typed, zstd-compressed batches)
+    Optionally filter by date range
+    """
+    _require_pyarrow()
+    chunks = columnar_chunks(iter_export_batches(current_user.id, start_date, end_date), "arrow")
+    return _stream_export(chunks, "arrows", "application/vnd.apache.arrow.stream", compress=False)
+
+
+# ===== Background export jobs =====
+
+async def _get_user_job(db: AsyncSession, job_id: int, user_id: int) -> ExportJob:
+    result = await db.execute(
+        select(ExportJob).where(ExportJob.id == job_id, ExportJob.user_id == user_id)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return job
+
+
+@router.post("/jobs", response_model=ExportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job_endpoint(
+    job_in: ExportJobCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start an export in the background
+    Returns immediately; poll GET /export/jobs/{id} until status is "done",
+    then fetch the file from GET /export/jobs/{id}/download
+    """
+    try:
+        job = await create_export_job(
+            db, current_user.id, job_in.format, job_in.start_date, job_in.end_date
+        )
+    except ExportJobError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    await db.commit()
+    enqueue_export_job(job.id)
+    return job
+
+
+@router.get("/jobs", response_model=List[ExportJobOut])
+async def list_export_jobs(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the user's export jobs, newest first"""
+    result = await db.execute(
+        select(ExportJob)
+        .where(ExportJob.user_id == current_user.id)
+        .order_by(ExportJob.created_at.desc(), ExportJob.id.desc())
+    )
+    return result.scalars().all()
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobOut)
+async def get_export_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Status of one export job"""
+    return await _get_user_job(db, job_id, current_user.id)
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download the file of a finished export job
+    Supports Range requests, so interrupted downloads can resume
+    """
+    job = await _get_user_job(db, job_id, current_user.id)
+
+    if job.status != "done":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is not ready (status: {job.status})"
+        )
+
+    if (job.expires_at and job.expires_at < datetime.utcnow()) or not Path(job.file_path).exists():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export file has expired")
+
+    return FileResponse(job.file_path, media_type=media_type_for(job), filename=job.filename)
@@ -3,7 +3,7 @@ Motivation System API endpoints - Streaks and Goals with authentic expense/incom
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 from pydantic import BaseModel, Field
@@ -12,6 +12,8 @@ from db import get_db
 from models import User, Streak, Goal, Entry, Category, GoalKind, GoalStatus, EntryType
 from schemas import StreakOut, GoalCreate, GoalUpdate, GoalOut
 from security import get_current_user
+from services.goal_service import refresh_goals
+from services.conditional_get import conditional_get
 
 router = APIRouter()
 
@@ -61,92 +63,20 @@ async def get_personal_no_spend_record(user_id: int, db: AsyncSession) -> int:
         return 0
 
 
-async def update_goals_for_user(user_id: int, db: AsyncSession, entry_date: datetime = None):
+async def update_goals_for_user(user_id: int, db: AsyncSession):
     """
-    Automatically update all active goals for a user based on their entries.
-    Called after each entry is created/updated.
+    Fully recalculate all active goals for a user based on their entries.
+    Entry writes apply incremental deltas instead (see services/goal_service.py);
+    this is the full recompute used on goal creation and /goals/refresh. It runs
+    on the user's goal queue, so deltas still queued are not counted twice.
     
-    - spend_under goals: Count neutral + excess expenses (exclude mandatory) and mark as failed if exceeded
+    - spend_under goals: Sum neutral + excess expenses (exclude mandatory)
     - log_n_days goals: Count days with any entries
     - streak goals: Already handled by streak system
     """
-    if entry_date is None:
-        entry_date = datetime.utcnow()
-    
-    # Get all active spend_under goals for this user
-    result = await db.execute(
-        select(Goal).where(
-            Goal.user_id == user_id,
-            Goal.kind == GoalKind.spend_under,
-            Goal.status == GoalStatus.active,
-            Goal.start_date <= entry_date,
-            and_(Goal.end_date == None, True) | (Goal.end_date >= entry_date)
-        )
-    )
-    spend_goals = result.scalars().all()
-    
-    for goal in spend_goals:
-        # Calculate total discretionary (non-mandatory) expenses within goal period
-        expense_query = select(Entry).where(
-            Entry.user_id == user_id,
-            Entry.type == EntryType.expense,
-            Entry.booked_at >= goal.start_date,
-            Entry.booked_at <= (goal.end_date or entry_date)
-        )
-        
-        expense_result = await db.execute(expense_query)
-        expenses = expense_result.scalars().all()
-        
-        # Sum discretionary expenses (exclude mandatory)
-        discretionary_total = 0.0
-        for exp in expenses:
-            if exp.category:
-                # Check if category is NOT mandatory
-                from models import ExpenseType as ModelExpenseType
-                if exp.category.expense_type != ModelExpenseType.mandatory:
-                    discretionary_total += exp.amount
-            else:
-                # No category info, include it (safer assumption)
-                discretionary_total += exp.amount
-        
-        goal.current_value = discretionary_total
-        
-        # Mark goal as FAILED if spending exceeds target
-        if discretionary_total > goal.target_value:
-            goal.status = GoalStatus.failed
-    
-    # Get all active log_n_days goals for this user
-    result = await db.execute(
-        select(Goal).where(
-            Goal.user_id == user_id,
-            Goal.kind == GoalKind.log_n_days,
-            Goal.status == GoalStatus.active,
-            Goal.start_date <= entry_date,
-            and_(Goal.end_date == None, True) | (Goal.end_date >= entry_date)
-        )
-    )
-    log_goals = result.scalars().all()
-    
-    for goal in log_goals:
-        # Count unique days with at least one entry in goal period
-        entry_query = select(Entry).where(
-            Entry.user_id == user_id,
-            Entry.booked_at >= goal.start_date,
-            Entry.booked_at <= (goal.end_date or entry_date)
-        ).order_by(Entry.booked_at)
-        
-        entry_result = await db.execute(entry_query)
-        entries = entry_result.scalars().all()
-        
-        # Count unique days
-        unique_days = set()
-        for entry in entries:
-            day = entry.booked_at.date()
-            unique_days.add(day)
-        
-        goal.current_value = float(len(unique_days))
-    
-    await db.commit()
+    await db.commit()  # The recompute reads in its own session
+    await refresh_goals(user_id)
+    db.expire_all()  # Goals already loaded here are stale
 
 
 async def calculate_no_spend_challenge_progress(user_id: int, db: AsyncSession) -> ChallengeProgress:
@@ -317,7 +247,7 @@ async def check_and_update_streak(
 
 
 # ===== GOALS =====
-@router.get("/goals", response_model=List[GoalOut])
+@router.get("/goals", response_model=List[GoalOut], dependencies=[Depends(conditional_get("goals"))])
 async def list_goals(
     status: str = None,
     current_user: User = Depends(get_current_user),
@@ -426,7 +356,7 @@ async def create_goal(
     await db.refresh(goal)
     
     # Update goal progress based on existing entries
-    await update_goals_for_user(current_user.id, db, goal.start_date)
+    await update_goals_for_user(current_user.id, db)
     await db.refresh(goal)
     
     # Calculate progress
@@ -3,7 +3,9 @@ Push Notifications Router
 Handles registration and management of push notification tokens
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 
@@ -12,6 +14,7 @@ from models import User, PushToken
 from security import get_current_user
 from pydantic import BaseModel
 from services.fcm_service import fcm_service
+from services.push_delivery import PushMessage
 
 
 router = APIRouter(prefix="/push", tags=["Push Notifications"])
@@ -39,135 +42,155 @@ class PushTokenResponse(BaseModel):
 
 # ===== ENDPOINTS =====
 @router.post("/register", response_model=PushTokenResponse, status_code=status.HTTP_201_CREATED)
-def register_push_token(
+async def register_push_token(
     data: PushTokenRegister,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Register or update a push notification token for the current user.
     If the token already exists, it will be reactivated and updated.
     """
-    # Check if token already exists
-    existing_token = db.query(PushToken).filter(PushToken.token == data.token).first()
-    
-    if existing_token:
-        # Update existing token
-        existing_token.user_id = current_user.id
-        existing_token.device_type = data.device_type
-        existing_token.device_name = data.device_name
-        existing_token.is_active = True
-        existing_token.updated_at = datetime.utcnow()
-        existing_token.last_used_at = datetime.utcnow()
-        db.commit()
-        db.refresh(existing_token)
-        return existing_token
-    
-    # Create new token
-    new_token = PushToken(
-        user_id=current_user.id,
-        token=data.token,
-        device_type=data.device_type,
-        device_name=data.device_name,
-        is_active=True
-    )
+    now = datetime.utcnow()
+    values = {
+        "user_id": current_user.id,
+        "token": data.token,
+        "device_type": data.device_type,
+        "device_name": data.device_name,
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+        "last_used_at": now,
+    }
     
-    db.add(new_token)
-    db.commit()
-    db.refresh(new_token)
+    # Single INSERT ... ON CONFLICT (token) DO UPDATE
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(PushToken).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PushToken.token],
+            set_={
+                key: stmt.excluded[key]
+                for key in ("user_id", "device_type", "device_name", "is_active", "updated_at", "last_used_at")
+            }
+        ).returning(PushToken)
+        result = await db.execute(
+            select(PushToken).from_statement(stmt).execution_options(populate_existing=True)
+        )
+        push_token = result.scalar_one()
+    else:
+        result = await db.execute(select(PushToken).where(PushToken.token == data.token))
+        push_token = result.scalar_one_or_none()
+        if push_token:
+            for key, value in values.items():
+                if key != "created_at":
+                    setattr(push_token, key, value)
+        else:
+            push_token = PushToken(**values)
+            db.add(push_token)
+        await db.flush()
     
-    return new_token
+    await db.commit()
+    return push_token
 
 
 @router.get("/tokens", response_model=List[PushTokenResponse])
-def get_user_push_tokens(
-    db: Session = Depends(get_db),
+async def get_user_push_tokens(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all push tokens for the current user.
     """
-    tokens = db.query(PushToken).filter(
-        PushToken.user_id == current_user.id
-    ).order_by(PushToken.created_at.desc()).all()
+    result = await db.execute(
+        select(PushToken)
+        .where(PushToken.user_id == current_user.id)
+        .order_by(PushToken.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+async def _get_user_token(db: AsyncSession, token_id: int, user_id: int) -> PushToken:
+    result = await db.execute(
+        select(PushToken).where(
+            PushToken.id == token_id,
+            PushToken.user_id == user_id
+        )
+    )
+    token = result.scalar_one_or_none()
     
-    return tokens
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Push token not found"
+        )
+    return token
 
 
 @router.delete("/tokens/{token_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_push_token(
+async def delete_push_token(
     token_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete a specific push token.
     """
-    token = db.query(PushToken).filter(
-        PushToken.id == token_id,
-        PushToken.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        delete(PushToken).where(
+            PushToken.id == token_id,
+            PushToken.user_id == current_user.id
+        )
+    )
     
-    if not token:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Push token not found"
         )
     
-    db.delete(token)
-    db.commit()
-    
+    await db.commit()
     return None
 
 
 @router.post("/tokens/{token_id}/deactivate", response_model=PushTokenResponse)
-def deactivate_push_token(
+async def deactivate_push_token(
     token_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Deactivate a push token without deleting it.
     """
-    token = db.query(PushToken).filter(
-        PushToken.id == token_id,
-        PushToken.user_id == current_user.id
-    ).first()
-    
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Push token not found"
-        )
+    token = await _get_user_token(db, token_id, current_user.id)
     
     token.is_active = False
     token.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(token)
+    await db.commit()
     
     return token
 
 
 @router.delete("/tokens", status_code=status.HTTP_204_NO_CONTENT)
-def delete_all_push_tokens(
-    db: Session = Depends(get_db),
+async def delete_all_push_tokens(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete all push tokens for the current user.
     """
-    db.query(PushToken).filter(
-        PushToken.user_id == current_user.id
-    ).delete()
-    
-    db.commit()
+    await db.execute(
+        delete(PushToken).where(PushToken.user_id == current_user.id)
+    )
+    await db.commit()
     
     return None
 
 
 @router.post("/test-notification", status_code=200)
-def send_test_notification(
-    db: Session = Depends(get_db),
+async def send_test_notification(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -175,7 +198,7 @@ def send_test_notification(
     This is useful for debugging and testing the push notification system.
     """
     # Get active tokens for current user
-    tokens = get_active_tokens_for_user(db, current_user.id)
+    tokens = await get_active_tokens_for_user(db, current_user.id)
     
     if not tokens:
         raise HTTPException(
@@ -183,67 +206,72 @@ def send_test_notification(
             detail="No active push tokens registered for this user. Please register a device first."
         )
     
-    # Send test notification
-    success_count, failed_tokens = fcm_service.send_multicast(
-        tokens=tokens,
-        title="🧪 Test Notification",
-        body="If you see this, push notifications are working!",
-        data={
-            "type": "test",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+    # Send test notification (sent right away rather than through the outbox, to report the outcome)
+    result = await fcm_service.deliver(
+        tokens,
+        PushMessage(
+            title="🧪 Test Notification",
+            body="If you see this, push notifications are working!",
+            data={
+                "type": "test",
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+        )
     )
+    failed_tokens = [r.token for r in result.results if not r.success]
     
-    # Update last_used_at for successful tokens
-    for token in tokens:
-        if token not in failed_tokens:
-            update_token_last_used(db, token)
-    
-    # Deactivate failed tokens
-    for token in failed_tokens:
-        deactivate_invalid_token(db, token)
+    # Update last_used_at of delivered tokens, deactivate dead ones (one statement each)
+    await update_tokens_last_used(db, [r.token for r in result.results if r.success])
+    await deactivate_invalid_tokens(db, result.invalid_tokens)
+    await db.commit()
     
     return {
         "success": True,
-        "message": f"Test notification sent to {success_count} device(s)",
-        "tokens_sent": success_count,
+        "message": f"Test notification sent to {result.success_count} device(s)",
+        "tokens_sent": result.success_count,
         "tokens_failed": len(failed_tokens),
         "failed_tokens": failed_tokens if failed_tokens else None
     }
 
 
 # ===== HELPER FUNCTIONS (for internal use) =====
-def get_active_tokens_for_user(db: Session, user_id: int) -> List[str]:
+async def get_active_tokens_for_user(db: AsyncSession, user_id: int) -> List[str]:
     """
     Get all active push tokens for a specific user.
     This function is used internally by other services to send notifications.
     """
-    tokens = db.query(PushToken).filter(
-        PushToken.user_id == user_id,
-        PushToken.is_active == True
-    ).all()
-    
-    return [token.token for token in tokens]
+    result = await db.execute(
+        select(PushToken.token).where(
+            PushToken.user_id == user_id,
+            PushToken.is_active == True
+        )
+    )
+    return list(result.scalars().all())
 
 
-def update_token_last_used(db: Session, token: str):
+async def update_tokens_last_used(db: AsyncSession, tokens: List[str]):
     """
-    Update the last_used_at timestamp for a token.
-    Call this after successfully sending a notification.
+    Update the last_used_at timestamp of tokens in one statement.
+    Call this after successfully sending a notification (the caller commits).
     """
-    push_token = db.query(PushToken).filter(PushToken.token == token).first()
-    if push_token:
-        push_token.last_used_at = datetime.utcnow()
-        db.commit()
+    if not tokens:
+        return
+    await db.execute(
+        update(PushToken)
+        .where(PushToken.token.in_(tokens))
+        .values(last_used_at=datetime.utcnow())
+    )
 
 
-def deactivate_invalid_token(db: Session, token: str):
+async def deactivate_invalid_tokens(db: AsyncSession, tokens: List[str]):
     """
-    Deactivate a token that failed to deliver.
-    Call this when FCM returns an error indicating the token is invalid.
+    Deactivate tokens that failed to deliver, in one statement.
+    Call this when FCM reports tokens as invalid (the caller commits).
     """
-    push_token = db.query(PushToken).filter(PushToken.token == token).first()
-    if push_token:
-        push_token.is_active = False
-        push_token.updated_at = datetime.utcnow()
-        db.commit()
\ No newline at end of file
+    if not tokens:
+        return
+    await db.execute(
+        update(PushToken)
+        .where(PushToken.token.in_(tokens))
+        .values(is_active=False, updated_at=datetime.utcnow())
+    )
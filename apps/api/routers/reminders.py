@@ -3,7 +3,7 @@ Reminders API endpoints - Planned expenses with local notifications
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, or_
 from typing import Optional, List
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
@@ -11,6 +11,15 @@ from pydantic import BaseModel, Field
 from db import get_db
 from models import User, Reminder, Category, Entry
 from security import get_current_user
+from services.rollup_service import add_entry_to_rollups
+from services.goal_service import entry_snapshot
+from routers.entries import compute_goal_update, submit_goal_update
+from services.reminder_scheduler import reminder_scheduler
+from services.conditional_get import conditional_get
+from services.reminder_service import (
+    list_reminders, get_reminder_row, reminder_counts, calendar_rows,
+    occurrences_between, next_occurrence, complete_occurrence
+)
 
 router = APIRouter()
 
@@ -23,6 +32,9 @@ class ReminderCreate(BaseModel):
     category_id: Optional[int] = None
     note: Optional[str] = None
     reminder_date: datetime
+    recurrence: Optional[str] = Field(None, pattern="^(daily|weekly|monthly)$")
+    recurrence_interval: int = Field(1, ge=1, le=365)
+    recurrence_until: Optional[datetime] = None
 
 
 class ReminderUpdate(BaseModel):
@@ -33,6 +45,9 @@ class ReminderUpdate(BaseModel):
     note: Optional[str] = None
     reminder_date: Optional[datetime] = None
     is_completed: Optional[bool] = None
+    recurrence: Optional[str] = Field(None, pattern="^(daily|weekly|monthly|none)$")  # "none" stops repeating
+    recurrence_interval: Optional[int] = Field(None, ge=1, le=365)
+    recurrence_until: Optional[datetime] = None
 
 
 class ReminderResponse(BaseModel):
@@ -51,6 +66,9 @@ class ReminderResponse(BaseModel):
     is_completed: bool
     completed_at: Optional[datetime]
     entry_id: Optional[int]
+    recurrence: Optional[str] = None
+    recurrence_interval: int = 1
+    recurrence_until: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -73,6 +91,43 @@ class QuickExpenseCreate(BaseModel):
     booked_at: Optional[datetime] = None
 
 
+def _reminder_response(
+    reminder: Reminder,
+    category_name: Optional[str] = None,
+    category_icon: Optional[str] = None,
+    category_color: Optional[str] = None
+) -> ReminderResponse:
+    return ReminderResponse(
+        id=reminder.id,
+        user_id=reminder.user_id,
+        category_id=reminder.category_id,
+        category_name=category_name,
+        category_icon=category_icon,
+        category_color=category_color,
+        title=reminder.title,
+        amount=reminder.amount,
+        currency=reminder.currency,
+        note=reminder.note,
+        reminder_date=reminder.reminder_date,
+        is_completed=reminder.is_completed,
+        completed_at=reminder.completed_at,
+        entry_id=reminder.entry_id,
+        recurrence=reminder.recurrence,
+        recurrence_interval=reminder.recurrence_interval,
+        recurrence_until=reminder.recurrence_until,
+        created_at=reminder.created_at,
+        updated_at=reminder.updated_at
+    )
+
+
+async def _get_reminder_or_404(db: AsyncSession, user_id: int, reminder_id: int):
+    """(Reminder, category_name, category_icon, category_color) in one query"""
+    row = await get_reminder_row(db, user_id, reminder_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Reminder not found")
+    return row
+
+
 # ===== ENDPOINTS =====
 
 @router.post("/", response_model=ReminderResponse, status_code=201)
@@ -84,7 +139,8 @@ async def create_reminder(
     """
     Create a new reminder for planned expense
     
-    - Limited to 3 months in the future
+    - Limited to 3 months in the future (the first occurrence, for recurring reminders)
+    - Optional recurrence: daily, weekly or monthly, every recurrence_interval units
     - Optional category and amount
     - Returns created reminder with category details
     """
@@ -97,6 +153,9 @@ async def create_reminder(
     if reminder_data.reminder_date > max_date:
         raise HTTPException(status_code=400, detail="Reminder date cannot be more than 3 months in the future")
     
+    if reminder_data.recurrence_until and reminder_data.recurrence_until < reminder_data.reminder_date:
+        raise HTTPException(status_code=400, detail="Recurrence end cannot be before the reminder date")
+    
     # Validate category if provided
     category = None
     if reminder_data.category_id:
@@ -120,35 +179,25 @@ async def create_reminder(
         currency=current_user.currency,
         note=reminder_data.note,
         reminder_date=reminder_data.reminder_date,
-        is_completed=False
+        is_completed=False,
+        recurrence=reminder_data.recurrence,
+        recurrence_interval=reminder_data.recurrence_interval,
+        recurrence_start=reminder_data.reminder_date if reminder_data.recurrence else None,
+        recurrence_until=reminder_data.recurrence_until if reminder_data.recurrence else None
     )
     
     db.add(new_reminder)
     await db.commit()
     await db.refresh(new_reminder)
+    reminder_scheduler.schedule(new_reminder.id, new_reminder.reminder_date)
     
     # Build response with category details
-    return ReminderResponse(
-        id=new_reminder.id,
-        user_id=new_reminder.user_id,
-        category_id=new_reminder.category_id,
-        category_name=category.name if category else None,
-        category_icon=category.icon if category else None,
-        category_color=category.color if category else None,
-        title=new_reminder.title,
-        amount=new_reminder.amount,
-        currency=new_reminder.currency,
-        note=new_reminder.note,
-        reminder_date=new_reminder.reminder_date,
-        is_completed=new_reminder.is_completed,
-        completed_at=new_reminder.completed_at,
-        entry_id=new_reminder.entry_id,
-        created_at=new_reminder.created_at,
-        updated_at=new_reminder.updated_at
-    )
+    if category:
+        return _reminder_response(new_reminder, category.name, category.icon, category.color)
+    return _reminder_response(new_reminder)
 
 
-@router.get("/", response_model=ReminderListResponse)
+@router.get("/", response_model=ReminderListResponse, dependencies=[Depends(conditional_get("reminders"))])
 async def get_reminders(
     include_completed: bool = Query(default=False, description="Include completed reminders"),
     start_date: Optional[datetime] = Query(None, description="Filter by start date"),
@@ -164,82 +213,17 @@ async def get_reminders(
     - Returns reminders with category details
     - Includes summary counts
     """
-    # Build query
-    query = select(Reminder).filter(Reminder.user_id == current_user.id)
-    
-    # Filter by completion status
-    if not include_completed:
-        query = query.filter(Reminder.is_completed == False)
-    
-    # Filter by date range
-    if start_date:
-        query = query.filter(Reminder.reminder_date >= start_date)
-    if end_date:
-        query = query.filter(Reminder.reminder_date <= end_date)
-    
-    # Order by reminder date
-    query = query.order_by(Reminder.reminder_date.asc())
-    
-    result = await db.execute(query)
-    reminders = result.scalars().all()
-    
-    # Get category details for each reminder
-    reminder_responses = []
-    for reminder in reminders:
-        category = None
-        if reminder.category_id:
-            cat_result = await db.execute(
-                select(Category).filter(Category.id == reminder.category_id)
-            )
-            category = cat_result.scalar_one_or_none()
-        
-        reminder_responses.append(ReminderResponse(
-            id=reminder.id,
-            user_id=reminder.user_id,
-            category_id=reminder.category_id,
-            category_name=category.name if category else None,
-            category_icon=category.icon if category else None,
-            category_color=category.color if category else None,
-            title=reminder.title,
-            amount=reminder.amount,
-            currency=reminder.currency,
-            note=reminder.note,
-            reminder_date=reminder.reminder_date,
-            is_completed=reminder.is_completed,
-            completed_at=reminder.completed_at,
-            entry_id=reminder.entry_id,
-            created_at=reminder.created_at,
-            updated_at=reminder.updated_at
-        ))
-    
-    # Get summary counts
-    total_result = await db.execute(
-        select(Reminder).filter(Reminder.user_id == current_user.id)
-    )
-    total_count = len(total_result.scalars().all())
+    # Reminders with their category fields (one joined query)
+    rows = await list_reminders(db, current_user.id, include_completed, start_date, end_date)
     
-    upcoming_result = await db.execute(
-        select(Reminder).filter(
-            Reminder.user_id == current_user.id,
-            Reminder.is_completed == False,
-            Reminder.reminder_date >= datetime.utcnow()
-        )
-    )
-    upcoming_count = len(upcoming_result.scalars().all())
-    
-    completed_result = await db.execute(
-        select(Reminder).filter(
-            Reminder.user_id == current_user.id,
-            Reminder.is_completed == True
-        )
-    )
-    completed_count = len(completed_result.scalars().all())
+    # Summary counts (one conditional-aggregate query)
+    counts = await reminder_counts(db, current_user.id)
     
     return ReminderListResponse(
-        reminders=reminder_responses,
-        total=total_count,
-        upcoming_count=upcoming_count,
-        completed_count=completed_count
+        reminders=[_reminder_response(*row) for row in rows],
+        total=counts["total"],
+        upcoming_count=counts["upcoming_count"],
+        completed_count=counts["completed_count"]
     )
 
 
@@ -250,43 +234,8 @@ async def get_reminder(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific reminder by ID"""
-    result = await db.execute(
-        select(Reminder).filter(
-            Reminder.id == reminder_id,
-            Reminder.user_id == current_user.id
-        )
-    )
-    reminder = result.scalar_one_or_none()
-    
-    if not reminder:
-        raise HTTPException(status_code=404, detail="Reminder not found")
-    
-    # Get category details
-    category = None
-    if reminder.category_id:
-        cat_result = await db.execute(
-            select(Category).filter(Category.id == reminder.category_id)
-        )
-        category = cat_result.scalar_one_or_none()
-    
-    return ReminderResponse(
-        id=reminder.id,
-        user_id=reminder.user_id,
-        category_id=reminder.category_id,
-        category_name=category.name if category else None,
-        category_icon=category.icon if category else None,
-        category_color=category.color if category else None,
-        title=reminder.title,
-        amount=reminder.amount,
-        currency=reminder.currency,
-        note=reminder.note,
-        reminder_date=reminder.reminder_date,
-        is_completed=reminder.is_completed,
-        completed_at=reminder.completed_at,
-        entry_id=reminder.entry_id,
-        created_at=reminder.created_at,
-        updated_at=reminder.updated_at
-    )
+    row = await _get_reminder_or_404(db, current_user.id, reminder_id)
+    return _reminder_response(*row)
 
 
 @router.put("/{reminder_id}", response_model=ReminderResponse)
@@ -300,20 +249,12 @@ async def update_reminder(
     Update a reminder
     
     - Can update title, amount, category, note, date, completion status
+    - Completing a recurring reminder moves it on to its next occurrence
     - Cannot update if already linked to an entry
     - Validates date constraints
     """
-    # Get reminder
-    result = await db.execute(
-        select(Reminder).filter(
-            Reminder.id == reminder_id,
-            Reminder.user_id == current_user.id
-        )
-    )
-    reminder = result.scalar_one_or_none()
-    
-    if not reminder:
-        raise HTTPException(status_code=404, detail="Reminder not found")
+    # Get reminder (with its current category fields)
+    reminder, *category_fields = await _get_reminder_or_404(db, current_user.id, reminder_id)
     
     # Validate reminder date if provided
     if reminder_data.reminder_date:
@@ -336,6 +277,7 @@ async def update_reminder(
         category = cat_result.scalar_one_or_none()
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
+        category_fields = [category.name, category.icon, category.color]
     
     # Update fields
     if reminder_data.title is not None:
@@ -347,43 +289,46 @@ async def update_reminder(
     if reminder_data.note is not None:
         reminder.note = reminder_data.note
     if reminder_data.reminder_date is not None:
+        if reminder_data.reminder_date != reminder.reminder_date:
+            reminder.notified_at = None  # Rescheduled: push again at the new time
+            reminder.next_push_at = None
         reminder.reminder_date = reminder_data.reminder_date
-    if reminder_data.is_completed is not None:
-        reminder.is_completed = reminder_data.is_completed
-        if reminder_data.is_completed and not reminder.completed_at:
-            reminder.completed_at = datetime.utcnow()
-        elif not reminder_data.is_completed:
-            reminder.completed_at = None
     
-    await db.commit()
-    await db.refresh(reminder)
+    # Recurrence rule ("none" turns the reminder back into a one-off)
+    if reminder_data.recurrence is not None:
+        reminder.recurrence = None if reminder_data.recurrence == "none" else reminder_data.recurrence
+    if reminder_data.recurrence_interval is not None:
+        reminder.recurrence_interval = reminder_data.recurrence_interval
+    if reminder_data.recurrence_until is not None:
+        reminder.recurrence_until = reminder_data.recurrence_until
+    if not reminder.recurrence:
+        reminder.recurrence_start = None
+        reminder.recurrence_until = None
+    elif reminder_data.recurrence or reminder_data.recurrence_interval or reminder_data.reminder_date:
+        reminder.recurrence_start = reminder.reminder_date  # The series restarts from the open occurrence
+    if reminder.recurrence_until and reminder.recurrence_until < reminder.reminder_date:
+        raise HTTPException(status_code=400, detail="Recurrence end cannot be before the reminder date")
+    
+    # Completion (after the rule, so a recurring reminder advances by its new rule)
+    if reminder_data.is_completed and not reminder.is_completed:
+        # Like /complete: a recurring reminder moves on and only completes when the series has ended
+        complete_occurrence(reminder)
+    elif reminder_data.is_completed is False:
+        reminder.is_completed = False
+        reminder.completed_at = None
+    
+    if reminder.notified_at is not None:
+        # Already pushed: the next push follows the (possibly changed) rule
+        reminder.next_push_at = next_occurrence(reminder, after=datetime.utcnow())
     
-    # Get category details
-    category = None
-    if reminder.category_id:
-        cat_result = await db.execute(
-            select(Category).filter(Category.id == reminder.category_id)
-        )
-        category = cat_result.scalar_one_or_none()
+    await db.commit()
+    if not reminder.is_completed:
+        if reminder.notified_at is None:
+            reminder_scheduler.schedule(reminder.id, reminder.reminder_date)
+        elif reminder.next_push_at is not None:
+            reminder_scheduler.schedule(reminder.id, reminder.next_push_at)
     
-    return ReminderResponse(
-        id=reminder.id,
-        user_id=reminder.user_id,
-        category_id=reminder.category_id,
-        category_name=category.name if category else None,
-        category_icon=category.icon if category else None,
-        category_color=category.color if category else None,
-        title=reminder.title,
-        amount=reminder.amount,
-        currency=reminder.currency,
-        note=reminder.note,
-        reminder_date=reminder.reminder_date,
-        is_completed=reminder.is_completed,
-        completed_at=reminder.completed_at,
-        entry_id=reminder.entry_id,
-        created_at=reminder.created_at,
-        updated_at=reminder.updated_at
-    )
+    return _reminder_response(reminder, *category_fields)
 
 
 @router.delete("/{reminder_id}", status_code=204)
@@ -421,53 +366,21 @@ async def mark_reminder_complete(
     
     - Sets is_completed to true
     - Records completion timestamp
+    - Recurring reminders move on to their next occurrence instead
+      (and complete once the series has ended)
     """
-    result = await db.execute(
-        select(Reminder).filter(
-            Reminder.id == reminder_id,
-            Reminder.user_id == current_user.id
-        )
-    )
-    reminder = result.scalar_one_or_none()
-    
-    if not reminder:
-        raise HTTPException(status_code=404, detail="Reminder not found")
+    reminder, *category_fields = await _get_reminder_or_404(db, current_user.id, reminder_id)
     
     if reminder.is_completed:
         raise HTTPException(status_code=400, detail="Reminder is already completed")
     
-    reminder.is_completed = True
-    reminder.completed_at = datetime.utcnow()
+    complete_occurrence(reminder)
     
     await db.commit()
-    await db.refresh(reminder)
+    if not reminder.is_completed:
+        reminder_scheduler.schedule(reminder.id, reminder.reminder_date)
     
-    # Get category details
-    category = None
-    if reminder.category_id:
-        cat_result = await db.execute(
-            select(Category).filter(Category.id == reminder.category_id)
-        )
-        category = cat_result.scalar_one_or_none()
-    
-    return ReminderResponse(
-        id=reminder.id,
-        user_id=reminder.user_id,
-        category_id=reminder.category_id,
-        category_name=category.name if category else None,
-        category_icon=category.icon if category else None,
-        category_color=category.color if category else None,
-        title=reminder.title,
-        amount=reminder.amount,
-        currency=reminder.currency,
-        note=reminder.note,
-        reminder_date=reminder.reminder_date,
-        is_completed=reminder.is_completed,
-        completed_at=reminder.completed_at,
-        entry_id=reminder.entry_id,
-        created_at=reminder.created_at,
-        updated_at=reminder.updated_at
-    )
+    return _reminder_response(reminder, *category_fields)
 
 
 @router.post("/{reminder_id}/create-expense", response_model=dict)
@@ -481,7 +394,7 @@ async def create_expense_from_reminder(
     Quick add: Create an actual expense from a reminder and mark it complete
     
     - Creates expense entry with reminder details
-    - Marks reminder as completed
+    - Marks reminder as completed (recurring: moves on to the next occurrence)
     - Links reminder to created entry
     - Returns both reminder and entry IDs
     """
@@ -540,16 +453,21 @@ async def create_expense_from_reminder(
     
     db.add(new_entry)
     await db.flush()  # Get entry ID without committing
+    await add_entry_to_rollups(db, new_entry)
+    goal_delta = await compute_goal_update(current_user.id, None, entry_snapshot(new_entry), db)
     
     # Mark reminder as completed and link to entry
-    reminder.is_completed = True
-    reminder.completed_at = datetime.utcnow()
+    complete_occurrence(reminder)
     reminder.entry_id = new_entry.id
     
     await db.commit()
     await db.refresh(reminder)
     await db.refresh(new_entry)
     
+    submit_goal_update(current_user.id, goal_delta)
+    if not reminder.is_completed:
+        reminder_scheduler.schedule(reminder.id, reminder.reminder_date)
+    
     return {
         "message": "Expense created successfully from reminder",
         "reminder_id": reminder.id,
@@ -587,48 +505,41 @@ async def get_calendar_reminders(
     start_date = datetime(year, month, 1, 0, 0, 0)
     end_date = datetime(year, month, last_day, 23, 59, 59)
     
-    # Get reminders for the month
-    result = await db.execute(
-        select(Reminder).filter(
-            Reminder.user_id == current_user.id,
-            Reminder.reminder_date >= start_date,
-            Reminder.reminder_date <= end_date
-        ).order_by(Reminder.reminder_date.asc())
-    )
-    reminders = result.scalars().all()
+    # Reminders of the month plus recurring ones (with category fields, one query)
+    rows = await calendar_rows(db, current_user.id, start_date, end_date)
     
-    # Group reminders by date
+    # Group reminders by date; recurring reminders are expanded for this month only
     reminders_by_date = {}
-    for reminder in reminders:
-        date_key = reminder.reminder_date.strftime("%Y-%m-%d")
-        
-        # Get category details
-        category = None
-        if reminder.category_id:
-            cat_result = await db.execute(
-                select(Category).filter(Category.id == reminder.category_id)
-            )
-            category = cat_result.scalar_one_or_none()
-        
-        reminder_data = {
-            "id": reminder.id,
-            "title": reminder.title,
-            "amount": reminder.amount,
-            "currency": reminder.currency,
-            "time": reminder.reminder_date.strftime("%H:%M"),
-            "is_completed": reminder.is_completed,
-            "category_name": category.name if category else None,
-            "category_icon": category.icon if category else None,
-            "category_color": category.color if category else None
-        }
-        
-        if date_key not in reminders_by_date:
-            reminders_by_date[date_key] = []
-        reminders_by_date[date_key].append(reminder_data)
+    total_reminders = 0
+    for reminder, category_name, category_icon, category_color in rows:
+        for occurrence_date in occurrences_between(reminder, start_date, end_date):
+            date_key = occurrence_date.strftime("%Y-%m-%d")
+            
+            reminder_data = {
+                "id": reminder.id,
+                "title": reminder.title,
+                "amount": reminder.amount,
+                "currency": reminder.currency,
+                "time": occurrence_date.strftime("%H:%M"),
+                "is_completed": reminder.is_completed,
+                "recurrence": reminder.recurrence,
+                "is_upcoming_occurrence": occurrence_date != reminder.reminder_date,
+                "category_name": category_name,
+                "category_icon": category_icon,
+                "category_color": category_color
+            }
+            
+            if date_key not in reminders_by_date:
+                reminders_by_date[date_key] = []
+            reminders_by_date[date_key].append(reminder_data)
+            total_reminders += 1
+    
+    for day_reminders in reminders_by_date.values():
+        day_reminders.sort(key=lambda r: r["time"])
     
     return {
         "year": year,
         "month": month,
         "reminders_by_date": reminders_by_date,
-        "total_reminders": len(reminders)
-    }
\ No newline at end of file
+        "total_reminders": total_reminders
+    }
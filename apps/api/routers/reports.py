@@ -9,8 +9,9 @@ from datetime import datetime, timedelta
 from enum import Enum
 
 from db import get_db
-from models import User, Entry, Category, EntryType, ExpenseType
+from models import User, Entry, EntryType
 from security import get_current_user
+from services.report_service import compute_report_summary
 
 router = APIRouter()
 
@@ -65,93 +66,14 @@ async def get_report_summary(
     """
     start_date, end_date = get_date_range(range)
     
-    # ===== 1. Calculate Income Total =====
-    income_query = select(
-        func.coalesce(func.sum(Entry.amount), 0).label('total')
-    ).where(
-        Entry.user_id == current_user.id,
-        Entry.type == EntryType.income,
-        Entry.booked_at >= start_date,
-        Entry.booked_at <= end_date
-    )
+    # ===== 1-5. Totals, expense-type split and top categories (one grouped scan) =====
+    summary = await compute_report_summary(db, current_user.id, start_date, end_date)
     
-    income_result = await db.execute(income_query)
-    income_total = float(income_result.scalar())
-    
-    # ===== 2. Calculate Expense Total =====
-    expense_query = select(
-        func.coalesce(func.sum(Entry.amount), 0).label('total')
-    ).where(
-        Entry.user_id == current_user.id,
-        Entry.type == EntryType.expense,
-        Entry.booked_at >= start_date,
-        Entry.booked_at <= end_date
-    )
-    
-    expense_result = await db.execute(expense_query)
-    expense_total = float(expense_result.scalar())
-    
-    # ===== 3. Calculate Net Balance =====
+    income_total = summary["income_total"]
+    expense_total = summary["expense_total"]
     net = income_total - expense_total
-    
-    # ===== 4. Breakdown by Expense Type =====
-    expense_by_type = {
-        "mandatory": 0.0,
-        "neutral": 0.0,
-        "excess": 0.0
-    }
-    
-    for exp_type in ExpenseType:
-        type_query = select(
-            func.coalesce(func.sum(Entry.amount), 0).label('total')
-        ).select_from(Entry).join(
-            Category, Entry.category_id == Category.id
-        ).where(
-            Entry.user_id == current_user.id,
-            Entry.type == EntryType.expense,
-            Category.expense_type == exp_type,
-            Entry.booked_at >= start_date,
-            Entry.booked_at <= end_date
-        )
-        
-        type_result = await db.execute(type_query)
-        expense_by_type[exp_type.value] = float(type_result.scalar())
-    
-    # ===== 5. Top Categories (Top 5 by spending) =====
-    top_categories_query = select(
-        Category.id,
-        Category.name,
-        Category.icon,
-        Category.color,
-        Category.expense_type,
-        func.sum(Entry.amount).label('total'),
-        func.count(Entry.id).label('count')
-    ).select_from(Entry).join(
-        Category, Entry.category_id == Category.id
-    ).where(
-        Entry.user_id == current_user.id,
-        Entry.type == EntryType.expense,
-        Entry.booked_at >= start_date,
-        Entry.booked_at <= end_date
-    ).group_by(
-        Category.id, Category.name, Category.icon, Category.color, Category.expense_type
-    ).order_by(
-        func.sum(Entry.amount).desc()
-    ).limit(5)
-    
-    top_result = await db.execute(top_categories_query)
-    top_categories = []
-    
-    for row in top_result:
-        top_categories.append({
-            "category_id": row.id,
-            "category_name": row.name,
-            "category_icon": row.icon,
-            "category_color": row.color,
-            "expense_type": row.expense_type.value if row.expense_type else None,
-            "total": round(float(row.total), 2),
-            "count": int(row.count)
-        })
+    expense_by_type = summary["expense_by_type"]
+    top_categories = summary["top_categories"]
     
     # ===== 6. Excess Alert Rule =====
     # Alert if: excess > 0.5 × mandatory
@@ -7,6 +7,7 @@ from security import get_current_user, get_current_admin_user
 from schemas import UserOut, UserUpdate
 from models import User
 from db import get_db
+from services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -21,15 +22,19 @@ async def update_me(
     db: AsyncSession = Depends(get_db)
 ):
     """Update current user's settings"""
+    # current_user may be a cached, detached copy; update the stored row
+    user = await db.get(User, current_user.id)
+    
     # Update fields
     update_data = user_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(user)
+    user_cache.invalidate(user.id)
     
-    return current_user
+    return user
 
 @router.get("/", response_model=List[UserOut])
 async def list_all_users(
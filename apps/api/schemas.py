@@ -205,6 +205,36 @@ class EntryFilter(BaseModel):
     offset: int = Field(default=0, ge=0)
 
 
+class EntryBatchItem(EntryCreate):
+    client_id: Optional[str] = Field(None, min_length=1, max_length=64)  # Idempotency key
+
+
+class EntryBatchCreate(BaseModel):
+    items: List[EntryBatchItem] = Field(..., min_length=1)
+
+
+class EntryBatchResult(BaseModel):
+    index: int
+    client_id: Optional[str] = None
+    status: str  # created | duplicate | error
+    entry: Optional[EntryOut] = None
+    error: Optional[str] = None
+
+
+class EntryBatchOut(BaseModel):
+    results: List[EntryBatchResult]
+    created: int
+    duplicates: int
+    errors: int
+
+
+class EntryChangesOut(BaseModel):
+    changed: List[EntryOut]
+    deleted: List[int]
+    next_token: str
+    has_more: bool
+
+
 # ===== DASHBOARD SCHEMAS =====
 class DashboardStats(BaseModel):
     period_days: int
@@ -404,6 +434,31 @@ class ExportResponse(BaseModel):
     created_at: datetime
 
 
+# ===== EXPORT JOB SCHEMAS =====
+class ExportJobCreate(BaseModel):
+    format: str = Field("csv", pattern="^(csv|json|ndjson|parquet|arrow)$")
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+
+class ExportJobOut(BaseModel):
+    id: int
+    format: str
+    status: str  # queued | running | done | failed
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    filename: Optional[str] = None
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # ===== BACKUP SCHEMAS =====
 class BackupOut(BaseModel):
     id: int
@@ -12,6 +12,7 @@ from sqlalchemy import select
 from config import settings
 from db import get_db
 from models import User, Token
+from services.user_cache import user_cache
 
 http_bearer = HTTPBearer(auto_error=False)
 
@@ -105,10 +106,17 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="Invalid token type")
 
     user_id = int(payload.get("sub"))
+    
+    # Served from the per-worker cache when possible (a detached User object)
+    user = user_cache.get(user_id)
+    if user:
+        return user
+    
     q = await db.execute(select(User).where(User.id == user_id))
     user = q.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    user_cache.put(user)
     return user
 
 async def get_current_admin_user(
@@ -1,9 +1,13 @@
 """
 Seed default data: categories and books
 """
+import hashlib
+import json
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models import Category, Book, EntryType, ExpenseType
+from sqlalchemy import select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from models import Category, Book, AppMeta, EntryType, ExpenseType
 from db import AsyncSessionLocal
 
 
@@ -162,33 +166,42 @@ BOOKS_DATA = [
 ]
 
 
-async def seed_default_categories(db: AsyncSession):
-    """Seed default categories if they don't exist"""
-    for cat_data in DEFAULT_CATEGORIES:
-        # Check if default category already exists
-        result = await db.execute(
-            select(Category).where(
-                Category.name == cat_data["name"],
-                Category.type == cat_data["type"],
-                Category.is_default == True
-            )
-        )
-        existing = result.scalar_one_or_none()
-        
-        if not existing:
-            category = Category(
-                name=cat_data["name"],
-                type=cat_data["type"],
-                expense_type=cat_data.get("expense_type"),
-                icon=cat_data["icon"],
-                color=cat_data["color"],
-                is_default=True,
-                user_id=None  # Global default
-            )
-            db.add(category)
+def _insert_ignoring_conflicts(db: AsyncSession, model):
+    """INSERT ... ON CONFLICT DO NOTHING for the session's database"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
+async def seed_default_categories(db: AsyncSession) -> int:
+    """Insert missing default categories with one query + one bulk insert"""
+    result = await db.execute(
+        select(Category.name, Category.type).where(Category.is_default == True)
+    )
+    existing = {(row[0], row[1]) for row in result}
+    
+    rows = [
+        {
+            "name": cat_data["name"],
+            "type": cat_data["type"],
+            "expense_type": cat_data.get("expense_type"),
+            "icon": cat_data["icon"],
+            "color": cat_data["color"],
+            "is_default": True,
+            "user_id": None  # Global default
+        }
+        for cat_data in DEFAULT_CATEGORIES
+        if (cat_data["name"], cat_data["type"]) not in existing
+    ]
     
+    if rows:
+        await db.execute(_insert_ignoring_conflicts(db, Category), rows)
     await db.commit()
-    print(f"✓ Seeded {len(DEFAULT_CATEGORIES)} default categories")
+    print(f"✓ Seeded {len(rows)} default categories")
+    return len(rows)
 
 
 async def seed_multilingual_books(db: AsyncSession):
@@ -344,30 +357,34 @@ async def seed_multilingual_books(db: AsyncSession):
         print(f"✓ Seeded {books_created} multilingual books")
 
 
-async def seed_books(db: AsyncSession):
-    """Seed additional financial literacy books if they don't exist"""
-    for book_data in BOOKS_DATA:
-        # Check if book already exists
-        result = await db.execute(
-            select(Book).where(
-                Book.title == book_data["title"]
-            )
-        )
-        existing = result.scalar_one_or_none()
-        
-        if not existing:
-            book = Book(
-                title=book_data["title"],
-                author=book_data.get("author"),
-                summary=book_data.get("summary"),
-                order_index=book_data.get("order_index", 0)
-            )
-            db.add(book)
+async def seed_books(db: AsyncSession) -> int:
+    """Insert missing financial literacy books with one query + one bulk insert"""
+    result = await db.execute(select(Book.title))
+    existing = {row[0] for row in result}
     
+    rows = [
+        {
+            "title": book_data["title"],
+            "author": book_data.get("author"),
+            "summary": book_data.get("summary"),
+            "order_index": book_data.get("order_index", 0)
+        }
+        for book_data in BOOKS_DATA
+        if book_data["title"] not in existing
+    ]
+    
+    if rows:
+        await db.execute(_insert_ignoring_conflicts(db, Book), rows)
     await db.commit()
-    additional_books_count = len([b for b in BOOKS_DATA])  # Count added books
-    if additional_books_count > 0:
-        print(f"✓ Seeded {additional_books_count} additional books")
+    if rows:
+        print(f"✓ Seeded {len(rows)} additional books")
+    return len(rows)
+
+
+# Changes whenever the seed data above is edited
+SEED_VERSION = hashlib.sha256(
+    json.dumps([DEFAULT_CATEGORIES, BOOKS_DATA], sort_keys=True, default=str).encode()
+).hexdigest()[:16]
 
 
 async def seed_all(db: AsyncSession):
@@ -378,6 +395,22 @@ async def seed_all(db: AsyncSession):
     print("✓ All seed data loaded successfully")
 
 
-async def seed_default_data(db: AsyncSession):
-    """Main function to seed default data (alias for seed_all)"""
-    await seed_all(db)
\ No newline at end of file
+async def seed_default_data(db: AsyncSession) -> bool:
+    """
+    Seed default data unless this SEED_VERSION was already applied
+
+    Returns:
+        bool: True if seeding ran, False if it was skipped
+    """
+    applied = await db.get(AppMeta, "seed_version")
+    if applied and applied.value == SEED_VERSION:
+        return False
+    
+    await seed_all(db)
+    
+    if applied:
+        applied.value = SEED_VERSION
+    else:
+        db.add(AppMeta(key="seed_version", value=SEED_VERSION))
+    await db.commit()
+    return True
@@ -0,0 +1,203 @@
+"""
+Entry Aggregation Service
+
+Computes income/expense totals, counts and per-category sums in the database
+with a single GROUP BY query, so analytics routes never hydrate Entry objects.
+Whole days come from the daily_rollups table (see rollup_service), so the
+cost grows with the number of days in the window, not the number of entries.
+
+Several overlapping time windows that share an end date (e.g. 7 and 30 days)
+are answered by the same scan: each window becomes a pair of conditional
+SUM/COUNT columns over the widest window.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Hashable, List, Optional
+
+from sqlalchemy import select, func, case, and_, or_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Entry, Category, DailyRollup, EntryType
+
+
+UNCATEGORIZED = "Uncategorized"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+async def aggregate_entries(
+    db: AsyncSession,
+    user_id: int,
+    windows: Dict[Hashable, datetime],
+    end_date: datetime,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate a user's entries per (type, category) for several windows at once
+
+    Whole days inside the windows are read from daily_rollups; only the
+    partial boundary days (each window's first day and the last day) are
+    summed from raw entries. Both parts are combined in one statement.
+
+    Args:
+        db: Database session
+        user_id: Owner of the entries
+        windows: Mapping of window key -> window start date
+        end_date: Common (inclusive) end date of all windows
+
+    Returns:
+        list: One dict per (type, category) group with category details and
+        a "windows" mapping of window key -> {"amount", "count"}
+    """
+    if not windows:
+        return []
+
+    keys = list(windows.keys())
+    start_days = {key: windows[key].date() for key in keys}
+    end_day = end_date.date()
+    boundary_days = sorted(set(start_days.values()) | {end_day})
+
+    # Boundary days: exact timestamps matter, so sum raw entries
+    raw_columns = []
+    for idx, key in enumerate(keys):
+        in_window = Entry.booked_at >= windows[key]
+        raw_columns.append(func.sum(case((in_window, Entry.amount), else_=0)).label(f"amount_{idx}"))
+        raw_columns.append(func.sum(case((in_window, 1), else_=0)).label(f"count_{idx}"))
+
+    raw = select(
+        Entry.type.label("type"),
+        Entry.category_id.label("category_id"),
+        *raw_columns
+    ).where(
+        Entry.user_id == user_id,
+        Entry.booked_at >= min(windows.values()),
+        Entry.booked_at <= end_date,
+        or_(*[
+            and_(Entry.booked_at >= _day_start(day), Entry.booked_at < _day_start(day + timedelta(days=1)))
+            for day in boundary_days
+        ])
+    ).group_by(Entry.type, Entry.category_id)
+
+    # Whole days in between: read the maintained daily rollups
+    rollup_columns = []
+    for idx, key in enumerate(keys):
+        in_window = DailyRollup.day > start_days[key]
+        rollup_columns.append(func.sum(case((in_window, DailyRollup.total), else_=0)).label(f"amount_{idx}"))
+        rollup_columns.append(func.sum(case((in_window, DailyRollup.count), else_=0)).label(f"count_{idx}"))
+
+    rolled = select(
+        DailyRollup.type.label("type"),
+        DailyRollup.category_id.label("category_id"),
+        *rollup_columns
+    ).where(
+        DailyRollup.user_id == user_id,
+        DailyRollup.day > min(start_days.values()),
+        DailyRollup.day < end_day,
+        DailyRollup.day.notin_(boundary_days)
+    ).group_by(DailyRollup.type, DailyRollup.category_id)
+
+    combined = union_all(raw, rolled).subquery()
+
+    window_columns = []
+    for idx in range(len(keys)):
+        window_columns.append(func.coalesce(func.sum(combined.c[f"amount_{idx}"]), 0).label(f"amount_{idx}"))
+        window_columns.append(func.coalesce(func.sum(combined.c[f"count_{idx}"]), 0).label(f"count_{idx}"))
+
+    query = select(
+        combined.c.type,
+        combined.c.category_id,
+        Category.name,
+        Category.icon,
+        Category.color,
+        Category.expense_type,
+        *window_columns
+    ).select_from(combined).outerjoin(
+        Category, combined.c.category_id == Category.id
+    ).group_by(
+        combined.c.type,
+        combined.c.category_id,
+        Category.name,
+        Category.icon,
+        Category.color,
+        Category.expense_type
+    )
+
+    result = await db.execute(query)
+
+    groups = []
+    for row in result:
+        mapping = row._mapping
+        groups.append({
+            "type": row.type,
+            "category_id": row.category_id,
+            "category_name": row.name,
+            "category_icon": row.icon,
+            "category_color": row.color,
+            "expense_type": row.expense_type,
+            "windows": {
+                key: {
+                    "amount": float(mapping[f"amount_{idx}"] or 0),
+                    "count": int(mapping[f"count_{idx}"] or 0),
+                }
+                for idx, key in enumerate(keys)
+            },
+        })
+
+    return groups
+
+
+def summarize_window(groups: List[Dict[str, Any]], key: Hashable) -> Dict[str, Any]:
+    """Collapse aggregated groups into income/expense totals for one window"""
+    total_income = 0.0
+    total_expenses = 0.0
+    entry_count = 0
+
+    for group in groups:
+        window = group["windows"][key]
+        if group["type"] == EntryType.income:
+            total_income += window["amount"]
+        else:
+            total_expenses += window["amount"]
+        entry_count += window["count"]
+
+    return {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "entry_count": entry_count,
+    }
+
+
+def category_totals(
+    groups: List[Dict[str, Any]],
+    key: Hashable,
+    entry_type: Optional[EntryType] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Per-category totals for one window, largest first
+
+    Groups with no entries inside the window are dropped. Entries without a
+    category are reported under "Uncategorized".
+    """
+    totals = []
+    for group in groups:
+        if entry_type is not None and group["type"] != entry_type:
+            continue
+
+        window = group["windows"][key]
+        if window["count"] == 0:
+            continue
+
+        totals.append({
+            "category_id": group["category_id"] if group["category_name"] is not None else None,
+            "category_name": group["category_name"] or UNCATEGORIZED,
+            "category_icon": group["category_icon"],
+            "category_color": group["category_color"],
+            "expense_type": group["expense_type"],
+            "type": group["type"],
+            "amount": window["amount"],
+            "count": window["count"],
+        })
+
+    totals.sort(key=lambda t: t["amount"], reverse=True)
+    return totals
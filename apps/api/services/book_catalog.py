@@ -0,0 +1,150 @@
+"""
+Books Catalog Cache
+
+Book rows are shared by every user and change only on seeding, create,
+upload and delete, yet the book routes re-read and rebuild them on every
+call. This cache holds the whole catalog as prebuilt BookOut payloads
+(user_progress=None), ordered by (order_index, created_at) and keyed by
+language; routes only query the user's UserBookProgress rows and merge them
+in (with_progress).
+
+Each uvicorn worker has its own copy. A worker that changes a book drops it
+right away (invalidate()). Other workers - and seed scripts - are caught by
+the catalog version (count(*), max(updated_at) of books), checked at most
+every BOOK_CATALOG_CHECK_SECONDS: when it moved, the catalog is reloaded.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import Book, UserBookProgress
+from schemas import BookOut, UserBookProgressOut
+
+# Book columns of a BookOut (user_progress is per user and merged per request)
+CATALOG_FIELDS = tuple(name for name in BookOut.model_fields if name != "user_progress")
+
+
+class CatalogSnapshot:
+    """One load of the books table"""
+
+    def __init__(self, books: List[BookOut], version: Tuple):
+        self.version = version
+        self.books = books
+        self.by_id: Dict[int, BookOut] = {book.id: book for book in books}
+        self.by_language: Dict[str, List[BookOut]] = {}
+        for book in books:
+            self.by_language.setdefault(book.language_code, []).append(book)
+
+
+class BookCatalogCache:
+    """Versioned in-process copy of the books catalog"""
+
+    def __init__(self, check_seconds: float):
+        self.check_seconds = check_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._generation = 0  # Bumped by invalidate(); a load started before it is not kept
+
+        # Metrics
+        self.hits = 0
+        self.loads = 0
+        self.version_checks = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.check_seconds > 0
+
+    async def _version(self, db: AsyncSession) -> Tuple:
+        result = await db.execute(select(func.count(Book.id), func.max(Book.updated_at)))
+        return tuple(result.one())
+
+    async def _load(self, db: AsyncSession, version: Tuple = None) -> CatalogSnapshot:
+        generation = self._generation
+        if version is None:
+            version = await self._version(db)
+        result = await db.execute(select(Book).order_by(Book.order_index, Book.created_at))
+        snapshot = CatalogSnapshot(
+            [
+                BookOut(**{name: getattr(book, name) for name in CATALOG_FIELDS})
+                for book in result.scalars().all()
+            ],
+            version
+        )
+        self.loads += 1
+        if generation == self._generation:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        return snapshot
+
+    async def snapshot(self, db: AsyncSession) -> CatalogSnapshot:
+        """Current catalog, reloaded when missing or when the stored version moved"""
+        if not self.enabled:
+            return await self._load(db)
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            return await self._load(db)
+
+        if time.monotonic() - self._checked_at >= self.check_seconds:
+            self.version_checks += 1
+            version = await self._version(db)
+            if version != snapshot.version:
+                return await self._load(db, version)
+            self._checked_at = time.monotonic()
+
+        self.hits += 1
+        return snapshot
+
+    async def books(self, db: AsyncSession, language: Optional[str] = None) -> List[BookOut]:
+        """Books of one language (None = all languages), in catalog order"""
+        snapshot = await self.snapshot(db)
+        if language is None:
+            return snapshot.books
+        return snapshot.by_language.get(language, [])
+
+    async def book(self, db: AsyncSession, book_id: int) -> Optional[BookOut]:
+        snapshot = await self.snapshot(db)
+        return snapshot.by_id.get(book_id)
+
+    def invalidate(self) -> None:
+        """Drop the catalog after a book was created, changed or deleted"""
+        self._generation += 1
+        if self._snapshot is not None:
+            self._snapshot = None
+            self.invalidations += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "books": len(snapshot.books) if snapshot else 0,
+            "languages": sorted(snapshot.by_language) if snapshot else [],
+            "check_seconds": self.check_seconds,
+            "hits": self.hits,
+            "loads": self.loads,
+            "version_checks": self.version_checks,
+            "invalidations": self.invalidations,
+        }
+
+
+def with_progress(book: BookOut, progress: Optional[UserBookProgress]) -> BookOut:
+    """A cached book with one user's progress merged in (the cached payload is not modified)"""
+    if progress is None:
+        return book
+    return book.model_copy(update={"user_progress": UserBookProgressOut.model_validate(progress)})
+
+
+async def progress_by_book(db: AsyncSession, user_id: int) -> Dict[int, UserBookProgress]:
+    result = await db.execute(
+        select(UserBookProgress).where(UserBookProgress.user_id == user_id)
+    )
+    return {p.book_id: p for p in result.scalars().all()}
+
+
+# Global instance used by routers/books.py
+book_catalog = BookCatalogCache(check_seconds=settings.BOOK_CATALOG_CHECK_SECONDS)
@@ -0,0 +1,150 @@
+"""
+Conditional GET
+
+The mobile app refetches its list screens (categories, books, goals,
+reminders, dashboard) on every focus. Those endpoints publish an ETag built
+from a cheap version of the rows they read - row count and max(updated_at),
+taken in one aggregate round trip - and answer a matching If-None-Match with
+304 before any of their real queries run.
+
+Deletes lower the count and inserts/updates raise max(updated_at), so the
+version moves with every change the response could show. Responses that
+also depend on the clock fold it in: reminders count the open reminders
+already past due (upcoming_count moves with time), and the dashboard's
+rolling windows get a weak ETag that expires every
+ETAG_DASHBOARD_MAX_AGE_SECONDS.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db import get_db
+from models import User, Category, Book, UserBookProgress, Goal, Reminder, Entry
+from security import get_current_user
+
+# Part of every ETag: bump when a response shape changes so clients refetch once
+ETAG_SCHEMA_VERSION = 1
+
+
+def _rows_version(model, *where) -> list:
+    """count(*) and max(updated_at) of some rows, as scalar subqueries"""
+    return [
+        select(func.count()).select_from(model).where(*where).scalar_subquery(),
+        select(func.max(model.updated_at)).where(*where).scalar_subquery(),
+    ]
+
+
+def _categories_of(user: User) -> list:
+    return _rows_version(Category, or_(Category.user_id == user.id, Category.user_id.is_(None)))
+
+
+async def _select_version(db: AsyncSession, columns: list) -> Tuple:
+    return tuple((await db.execute(select(*columns))).one())
+
+
+# ===== Resource versions =====
+
+async def categories_version(db: AsyncSession, user: User, now: datetime) -> Tuple:
+    return await _select_version(db, _categories_of(user))
+
+
+async def books_version(db: AsyncSession, user: User, now: datetime) -> Tuple:
+    # The list defaults to the user's language
+    return (user.language,) + await _select_version(
+        db, _rows_version(Book) + _rows_version(UserBookProgress, UserBookProgress.user_id == user.id)
+    )
+
+
+async def goals_version(db: AsyncSession, user: User, now: datetime) -> Tuple:
+    return await _select_version(db, _rows_version(Goal, Goal.user_id == user.id))
+
+
+async def reminders_version(db: AsyncSession, user: User, now: datetime) -> Tuple:
+    past_due = select(func.count()).select_from(Reminder).where(
+        Reminder.user_id == user.id,
+        Reminder.is_completed == False,
+        Reminder.reminder_date < now
+    ).scalar_subquery()
+    return await _select_version(
+        db, _rows_version(Reminder, Reminder.user_id == user.id) + _categories_of(user) + [past_due]
+    )
+
+
+async def dashboard_version(db: AsyncSession, user: User, now: datetime) -> Tuple:
+    window = int(now.timestamp()) // max(1, settings.ETAG_DASHBOARD_MAX_AGE_SECONDS)
+    return (window,) + await _select_version(
+        db, _rows_version(Entry, Entry.user_id == user.id) + _categories_of(user)
+    )
+
+
+RESOURCE_VERSIONS: Dict[str, Callable] = {
+    "categories": categories_version,
+    "books": books_version,
+    "goals": goals_version,
+    "reminders": reminders_version,
+    "dashboard": dashboard_version,
+}
+
+# Resources whose body may change within one version (clock-dependent)
+WEAK_RESOURCES = {"dashboard"}
+
+_stats: Dict[str, Dict[str, int]] = {name: {"not_modified": 0, "full": 0} for name in RESOURCE_VERSIONS}
+
+
+# ===== ETags =====
+
+def make_etag(resource: str, user_id: int, query: str, version: Tuple, weak: bool = False) -> str:
+    digest = hashlib.sha1(
+        repr((ETAG_SCHEMA_VERSION, resource, user_id, query, version)).encode()
+    ).hexdigest()[:32]
+    return f'{"W/" if weak else ""}"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_get(resource: str) -> Callable:
+    """
+    Route dependency: set the resource's ETag, or end the request with 304
+
+    Usage: @router.get("/", dependencies=[Depends(conditional_get("goals"))])
+    """
+    version_of = RESOURCE_VERSIONS[resource]
+    weak = resource in WEAK_RESOURCES
+
+    async def check(
+        request: Request,
+        response: Response,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+    ) -> None:
+        version = await version_of(db, current_user, datetime.utcnow())
+        etag = make_etag(resource, current_user.id, request.url.query, version, weak)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            _stats[resource]["not_modified"] += 1
+            raise HTTPException(status_code=304, headers=headers)
+
+        _stats[resource]["full"] += 1
+        response.headers.update(headers)
+
+    return check
+
+
+def conditional_get_metrics() -> Dict[str, Any]:
+    """304 vs full responses per resource (per worker)"""
+    return {name: dict(counts) for name, counts in _stats.items()}
@@ -0,0 +1,165 @@
+"""
+Batch Entry Creation Service
+
+Backs POST /entries/batch, used by offline devices to flush their queue of
+locally created entries in one request. The whole batch costs a fixed
+number of statements: one IN query for idempotency keys, one for categories,
+one multi-row INSERT for entries and one for keys, one rollup update per
+(day, type, category) and a single goal delta.
+
+Items may carry a client_id idempotency key. A key that was already stored
+(or repeats within the batch) is reported as a duplicate pointing at the
+original entry instead of being inserted again, so a retried flush is safe.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, insert, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from config import settings
+from models import Entry, Category, EntryClientKey
+from schemas import EntryBatchItem
+from services.rollup_service import apply_rollup_delta
+from services.goal_service import entry_snapshot, entries_created_goal_delta
+
+
+async def create_entries_batch(
+    db: AsyncSession,
+    user_id: int,
+    items: List[EntryBatchItem],
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Validate and insert a batch of entries. Does not commit.
+
+    Returns:
+        tuple: (per-item results in request order, goal delta of the created
+        entries for submit_goal_update() once committed)
+    """
+    results: List[Dict[str, Any]] = [
+        {"index": idx, "client_id": item.client_id, "status": None, "entry_id": None, "error": None}
+        for idx, item in enumerate(items)
+    ]
+
+    # 1. Idempotency keys already stored for this user
+    client_ids = {item.client_id for item in items if item.client_id}
+    known_keys: Dict[str, int] = {}
+    if client_ids:
+        cutoff = datetime.utcnow() - timedelta(days=settings.ENTRY_CLIENT_KEY_RETENTION_DAYS)
+        await db.execute(
+            delete(EntryClientKey).where(
+                EntryClientKey.user_id == user_id,
+                EntryClientKey.created_at < cutoff
+            )
+        )
+        result = await db.execute(
+            select(EntryClientKey.client_id, EntryClientKey.entry_id).where(
+                EntryClientKey.user_id == user_id,
+                EntryClientKey.client_id.in_(client_ids)
+            )
+        )
+        known_keys = {row[0]: row[1] for row in result}
+
+    # 2. Categories the user may book on, in one query
+    category_ids = {item.category_id for item in items if item.category_id}
+    category_types = {}
+    if category_ids:
+        result = await db.execute(
+            select(Category.id, Category.type).where(
+                Category.id.in_(category_ids),
+                and_(
+                    (Category.user_id == user_id) | (Category.user_id == None),
+                    Category.is_deleted == False
+                )
+            )
+        )
+        category_types = {row[0]: row[1] for row in result}
+
+    to_insert = []
+    first_in_batch: Dict[str, int] = {}
+    for item, res in zip(items, results):
+        if item.client_id in known_keys:
+            res["status"] = "duplicate"
+            res["entry_id"] = known_keys[item.client_id]
+            continue
+        if item.client_id in first_in_batch:
+            # Same key twice in one batch: resolved to the first item after insert
+            res["status"] = "duplicate"
+            continue
+
+        if item.category_id:
+            category_type = category_types.get(item.category_id)
+            if category_type is None:
+                res["status"] = "error"
+                res["error"] = "Invalid category"
+                continue
+            if category_type != item.type:
+                res["status"] = "error"
+                res["error"] = f"Category type '{category_type}' does not match entry type '{item.type}'"
+                continue
+
+        if item.client_id:
+            first_in_batch[item.client_id] = res["index"]
+        res["status"] = "created"
+        to_insert.append((item, res))
+
+    # 3. Insert all new entries with one executemany
+    if to_insert:
+        rows = [
+            {**item.model_dump(exclude={"client_id"}), "user_id": user_id}
+            for item, _ in to_insert
+        ]
+        result = await db.execute(
+            insert(Entry).returning(Entry.id, sort_by_parameter_order=True),
+            rows
+        )
+        for (_, res), entry_id in zip(to_insert, result.scalars().all()):
+            res["entry_id"] = entry_id
+
+        key_rows = [
+            {"user_id": user_id, "client_id": item.client_id, "entry_id": res["entry_id"]}
+            for item, res in to_insert if item.client_id
+        ]
+        if key_rows:
+            await db.execute(insert(EntryClientKey), key_rows)
+
+    for item, res in zip(items, results):
+        if res["status"] == "duplicate" and res["entry_id"] is None:
+            res["entry_id"] = results[first_in_batch[item.client_id]]["entry_id"]
+
+    # 4. Load entries for the response (created and duplicates)
+    entry_ids = {res["entry_id"] for res in results if res["entry_id"] is not None}
+    entries = {}
+    if entry_ids:
+        result = await db.execute(
+            select(Entry).where(
+                Entry.id.in_(entry_ids),
+                Entry.user_id == user_id
+            ).options(selectinload(Entry.category))
+        )
+        entries = {entry.id: entry for entry in result.scalars().all()}
+    for res in results:
+        res["entry"] = entries.get(res.pop("entry_id"))
+
+    created = [res["entry"] for _, res in to_insert]
+    if not created:
+        return results, None
+
+    # 5. Rollups: one delta per (day, type, category)
+    rollup_deltas: Dict[Tuple, List] = {}
+    for entry in created:
+        key = (entry.booked_at.date(), entry.type, entry.category_id)
+        delta = rollup_deltas.setdefault(key, [entry.booked_at, 0.0, 0])
+        delta[1] += entry.amount
+        delta[2] += 1
+    for (_, entry_type, category_id), (booked_at, amount, count) in rollup_deltas.items():
+        await apply_rollup_delta(db, user_id, booked_at, entry_type, category_id, amount, count)
+
+    # 6. Goals: one delta for the whole batch
+    goal_delta = await entries_created_goal_delta(
+        db, user_id, [entry_snapshot(entry) for entry in created]
+    )
+
+    return results, goal_delta
@@ -0,0 +1,309 @@
+"""
+Background Export Jobs
+
+POST /export/jobs only records an ExportJob row and hands its id to the
+export_job_queue; a worker streams the entries (export_service) into a file
+under EXPORT_DIR and marks the job done. Text formats are gzipped, Parquet
+and Arrow are compressed column by column. Finished files are kept for
+EXPORT_RETENTION_HOURS, then removed together with their row by
+export_cleanup_task.
+
+A worker claims a job with one guarded UPDATE (queued, or running with an
+expired lease -> running with a fresh lease) and renews the lease while it
+writes, so a job runs in one process at a time even with several workers or
+while a restarting process is still draining. Jobs survive restarts: rows
+left queued, or running under an expired lease, are re-queued at startup
+(resume_export_jobs), and a file only appears under its final name once it
+is complete.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Optional
+
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db import AsyncSessionLocal
+from models import ExportJob, User
+from services.export_service import (
+    iter_export_batches, csv_chunks, json_document_chunks, ndjson_chunks, gzip_chunks,
+    columnar_chunks, PYARROW_AVAILABLE
+)
+from services.work_queue import CoalescingWorkQueue
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(settings.EXPORT_DIR)  # Created on first export
+
+# format -> (file extension, media type of the downloaded file)
+EXPORT_FORMATS = {
+    "csv": ("csv.gz", "application/gzip"),
+    "json": ("json.gz", "application/gzip"),
+    "ndjson": ("ndjson.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+}
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _claimable(now: datetime):
+    """Queued jobs, and running jobs whose worker stopped renewing its lease"""
+    return or_(
+        ExportJob.status == "queued",
+        and_(
+            ExportJob.status == "running",
+            or_(ExportJob.locked_until.is_(None), ExportJob.locked_until < now)
+        )
+    )
+
+
+class ExportJobError(Exception):
+    """A job can't be created (unknown format, too many active jobs...)"""
+
+
+def media_type_for(job: ExportJob) -> str:
+    return EXPORT_FORMATS[job.format][1]
+
+
+async def create_export_job(
+    db: AsyncSession,
+    user_id: int,
+    export_format: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> ExportJob:
+    """Record a queued job (the caller commits, then calls enqueue_export_job)"""
+    if export_format not in EXPORT_FORMATS:
+        raise ExportJobError(f"Unknown export format '{export_format}'")
+    if export_format in COLUMNAR_FORMATS and not PYARROW_AVAILABLE:
+        raise ExportJobError("Columnar export is not available on this server (pyarrow is not installed)")
+
+    result = await db.execute(
+        select(func.count(ExportJob.id)).where(
+            ExportJob.user_id == user_id,
+            ExportJob.status.in_(ACTIVE_STATUSES)
+        )
+    )
+    if result.scalar() >= settings.EXPORT_MAX_ACTIVE_JOBS_PER_USER:
+        raise ExportJobError(
+            f"Too many exports in progress (max {settings.EXPORT_MAX_ACTIVE_JOBS_PER_USER})"
+        )
+
+    job = ExportJob(
+        user_id=user_id,
+        format=export_format,
+        start_date=start_date,
+        end_date=end_date,
+        status="queued",
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+def enqueue_export_job(job_id: int) -> None:
+    export_job_queue.submit(job_id, job_id)
+
+
+def _export_chunks(job: ExportJob, user: Optional[User]):
+    batches = iter_export_batches(job.user_id, job.start_date, job.end_date)
+
+    if job.format in COLUMNAR_FORMATS:
+        return columnar_chunks(batches, job.format)
+
+    if job.format == "csv":
+        chunks = csv_chunks(batches)
+    elif job.format == "json":
+        header = {
+            "user_id": job.user_id,
+            "user_email": user.email if user else None,
+            "exported_at": datetime.utcnow().isoformat()
+        }
+        chunks = json_document_chunks(batches, header)
+    else:
+        chunks = ndjson_chunks(batches)
+    return gzip_chunks(chunks)
+
+
+async def _write_file(chunks, target: Path) -> int:
+    """Write the stream to target via a temporary file; returns the size in bytes"""
+    loop = asyncio.get_event_loop()
+    partial = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+    handle = await loop.run_in_executor(None, open, partial, "wb")
+    try:
+        async for chunk in chunks:
+            await loop.run_in_executor(None, handle.write, chunk)
+    except BaseException:
+        handle.close()
+        partial.unlink(missing_ok=True)
+        raise
+    handle.close()
+
+    os.replace(partial, target)
+    return target.stat().st_size
+
+
+def _lease_end() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.EXPORT_JOB_LEASE_SECONDS)
+
+
+async def _claim_export_job(db: AsyncSession, job_id: int) -> Optional[datetime]:
+    """Mark a job running under our lease; returns the claim's started_at, or None if not claimable"""
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, _claimable(now))
+        .values(status="running", started_at=now, locked_until=_lease_end(), error=None)
+        .returning(ExportJob.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.scalar_one_or_none() is not None
+    await db.commit()
+    return now if claimed else None
+
+
+def _owned(job_id: int, started_at: datetime):
+    """The job is still running under the claim made at started_at"""
+    return (
+        ExportJob.id == job_id,
+        ExportJob.status == "running",
+        ExportJob.started_at == started_at,
+    )
+
+
+async def _renew_lease(job_id: int, started_at: datetime) -> None:
+    """Keep extending the lease while the job runs (cancelled when it ends)"""
+    while True:
+        await asyncio.sleep(settings.EXPORT_JOB_LEASE_SECONDS / 3)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(ExportJob).where(*_owned(job_id, started_at)).values(locked_until=_lease_end())
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"[Exports] lease renewal of job {job_id} failed: {e}")
+
+
+async def _finish_export_job(db: AsyncSession, job_id: int, started_at: datetime, **values) -> bool:
+    """Record the outcome unless another worker took the job over meanwhile"""
+    result = await db.execute(
+        update(ExportJob)
+        .where(*_owned(job_id, started_at))
+        .values(locked_until=None, finished_at=datetime.utcnow(), **values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if result.rowcount == 0:
+        logger.warning(f"[Exports] job {job_id} lost its lease; outcome not recorded")
+        return False
+    return True
+
+
+async def run_export_job(job_id: int) -> None:
+    """Produce the file of one job and record the outcome"""
+    async with AsyncSessionLocal() as db:
+        started_at = await _claim_export_job(db, job_id)
+        if started_at is None:
+            return  # Done, failed, deleted, or running in another worker
+
+        job = await db.get(ExportJob, job_id)
+        user = await db.get(User, job.user_id)
+        timestamp = job.created_at.strftime('%Y%m%d_%H%M%S')
+        filename = f"act_entries_{timestamp}_{job.id}.{EXPORT_FORMATS[job.format][0]}"
+
+        lease = asyncio.create_task(_renew_lease(job_id, started_at))
+        try:
+            EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+            target = EXPORT_DIR / filename
+            file_size = await _write_file(_export_chunks(job, user), target)
+        except Exception as e:
+            await _finish_export_job(db, job_id, started_at, status="failed", error=str(e)[:500])
+            raise
+        finally:
+            lease.cancel()
+
+        finished = await _finish_export_job(
+            db, job_id, started_at,
+            status="done",
+            filename=filename,
+            file_path=str(target.absolute()),
+            file_size=file_size,
+            expires_at=datetime.utcnow() + timedelta(hours=settings.EXPORT_RETENTION_HOURS),
+        )
+
+    if finished:
+        logger.info(f"[Exports] job {job_id} done ({file_size} bytes)")
+
+
+async def _run_queued_export(job_id: int, items: List[Any]) -> None:
+    """Queue handler (a job id is only ever submitted once per run)"""
+    await run_export_job(job_id)
+
+
+async def resume_export_jobs() -> int:
+    """
+    Re-queue jobs left queued, or running under an expired lease (interrupted mid-run)
+
+    Jobs another live process is running keep a fresh lease and are left
+    alone; if two processes queue the same job, only one claim succeeds.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ExportJob.id).where(_claimable(datetime.utcnow())).order_by(ExportJob.id)
+        )
+        job_ids = result.scalars().all()
+
+    for job_id in job_ids:
+        enqueue_export_job(job_id)
+    return len(job_ids)
+
+
+async def cleanup_expired_exports(db: AsyncSession) -> int:
+    """Delete files and rows of jobs past their expiry (failed jobs after the same retention)"""
+    now = datetime.utcnow()
+    failed_cutoff = now - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    result = await db.execute(
+        select(ExportJob).where(
+            (ExportJob.expires_at < now)
+            | ((ExportJob.status == "failed") & (ExportJob.finished_at < failed_cutoff))
+        )
+    )
+    expired = result.scalars().all()
+
+    for job in expired:
+        if job.file_path:
+            Path(job.file_path).unlink(missing_ok=True)
+        await db.delete(job)
+
+    if expired:
+        await db.commit()
+        logger.info(f"[Exports] removed {len(expired)} expired export(s)")
+    return len(expired)
+
+
+async def export_cleanup_task():
+    """Background task removing expired export files (hourly)"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await cleanup_expired_exports(db)
+        except Exception as e:
+            logger.error(f"[Exports] cleanup failed: {e}")
+        await asyncio.sleep(3600)
+
+
+# Global export worker queue (started/stopped in main.py lifespan)
+export_job_queue = CoalescingWorkQueue(
+    "exports",
+    _run_queued_export,
+    concurrency=settings.EXPORT_JOB_CONCURRENCY,
+)
@@ -2,16 +2,22 @@
 Firebase Cloud Messaging (FCM) Service
 
 Handles sending push notifications to mobile devices via Firebase.
+Delivery itself (thread pool, multicast chunking) lives in push_delivery.
 """
 
 import os
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 
+from config import settings
+from services.push_delivery import (
+    PushDeliveryService, PushMessage, DeliveryResult, TokenResult, FirebaseTransport
+)
+
 try:
     import firebase_admin
-    from firebase_admin import credentials, messaging
+    from firebase_admin import credentials
     FIREBASE_AVAILABLE = True
 except ImportError:
     FIREBASE_AVAILABLE = False
@@ -20,12 +26,47 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def reminder_message(
+    reminder_title: str,
+    reminder_amount: Optional[float],
+    reminder_id: int,
+    currency: str = "USD"
+) -> PushMessage:
+    """Push payload of a due reminder (amount is optional on reminders)"""
+    body = reminder_title
+    if reminder_amount is not None:
+        body = f"{reminder_title} - {currency} {reminder_amount:.2f}"
+    
+    return PushMessage(
+        title="💰 Reminder",
+        body=body,
+        data={
+            "type": "reminder",
+            "reminder_id": str(reminder_id),
+            "screen": "Reminders",
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        sound="default",
+        priority="high"
+    )
+
+
 class FCMService:
     """Firebase Cloud Messaging service for push notifications"""
     
-    def __init__(self):
+    def __init__(self, transport=None):
+        """
+        Args:
+            transport: Send through this transport instead of Firebase
+                (e.g. push_delivery.FakeFCMTransport in tests)
+        """
         self.initialized = False
         self.app = None
+        self.delivery: Optional[PushDeliveryService] = None
+        
+        if transport is not None:
+            self._start_delivery(transport)
+            return
         
         if not FIREBASE_AVAILABLE:
             logger.warning("Firebase Admin SDK not available")
@@ -33,8 +74,6 @@ class FCMService:
         
         # Initialize Firebase Admin SDK
         try:
-            # Import settings to get Firebase credentials path
-            from config import settings
             credentials_path = settings.FIREBASE_CREDENTIALS_PATH or 'firebase-service-account.json'
             
             if not os.path.exists(credentials_path):
@@ -51,15 +90,56 @@ class FCMService:
                 self.app = firebase_admin.initialize_app(cred)
                 logger.info("Firebase Admin SDK initialized successfully")
             
-            self.initialized = True
+            self._start_delivery(FirebaseTransport(self.app))
             
         except Exception as e:
             logger.error(f"Failed to initialize Firebase: {e}")
             self.initialized = False
     
+    def _start_delivery(self, transport) -> None:
+        self.delivery = PushDeliveryService(
+            transport,
+            max_threads=settings.FCM_DELIVERY_THREADS,
+            chunk_size=settings.FCM_MULTICAST_CHUNK_SIZE,
+            max_concurrent_chunks=settings.FCM_MAX_CONCURRENT_CHUNKS,
+        )
+        self.initialized = True
+    
     def is_available(self) -> bool:
         """Check if FCM service is available"""
-        return FIREBASE_AVAILABLE and self.initialized
+        return self.initialized and self.delivery is not None
+    
+    async def deliver(self, tokens: List[str], message: PushMessage) -> DeliveryResult:
+        """
+        Send one message to many devices (chunked, concurrent, off the event loop)
+        
+        Returns:
+            DeliveryResult: Per-token outcomes plus success/invalid/retryable totals
+        """
+        if not self.is_available():
+            logger.warning("FCM not available, skipping delivery")
+            result = DeliveryResult()
+            for token in tokens:
+                result.add(TokenResult(token, False, error="FCM not available"))
+            return result
+        
+        return await self.delivery.deliver(tokens, message)
+    
+    async def deliver_each(self, items: List[Tuple[str, PushMessage]]) -> DeliveryResult:
+        """
+        Send a different message to each token, batched into as few requests as possible
+        
+        Returns:
+            DeliveryResult: Per-token outcomes in the order of `items`
+        """
+        if not self.is_available():
+            logger.warning("FCM not available, skipping delivery")
+            result = DeliveryResult()
+            for token, _ in items:
+                result.add(TokenResult(token, False, error="FCM not available"))
+            return result
+        
+        return await self.delivery.deliver_each(items)
     
     async def send_notification(
         self,
@@ -92,58 +172,17 @@ class FCMService:
             logger.warning("FCM not available, skipping notification")
             return False
         
-        try:
-            # Build notification
-            notification = messaging.Notification(
-                title=title,
-                body=body,
-                image=image_url
-            )
-            
-            # Build Android config
-            android_config = messaging.AndroidConfig(
-                priority=priority,
-                notification=messaging.AndroidNotification(
-                    sound=sound,
-                    channel_id="default",
-                    color="#FF6B6B",  # ACT brand color
-                    icon="notification_icon",
-                )
-            )
-            
-            # Build iOS config
-            apns_config = messaging.APNSConfig(
-                payload=messaging.APNSPayload(
-                    aps=messaging.Aps(
-                        sound=sound,
-                        badge=badge,
-                        content_available=True,
-                    )
-                )
-            )
-            
-            # Build message
-            message = messaging.Message(
-                token=token,
-                notification=notification,
-                data=data or {},
-                android=android_config,
-                apns=apns_config,
-            )
-            
-            # Send message
-            response = messaging.send(message)
-            logger.info(f"Notification sent successfully: {response}")
-            return True
-            
-        except messaging.UnregisteredError:
+        message = PushMessage(
+            title=title, body=body, data=data or {}, image_url=image_url,
+            sound=sound, badge=badge, priority=priority
+        )
+        result = await self.delivery.deliver([token], message)
+        
+        if result.invalid_tokens:
             logger.warning(f"Token is invalid or unregistered: {token[:20]}...")
-            # Token should be removed from database
-            return False
-            
-        except Exception as e:
-            logger.error(f"Failed to send notification: {e}")
-            return False
+        elif result.failure_count:
+            logger.error(f"Failed to send notification: {result.results[0].error}")
+        return result.success_count == 1
     
     async def send_multicast(
         self,
@@ -159,7 +198,7 @@ class FCMService:
         Send push notification to multiple devices
         
         Args:
-            tokens: List of FCM device tokens
+            tokens: List of FCM device tokens (any number; sent in chunks)
             title: Notification title
             body: Notification body text
             data: Additional data payload
@@ -178,70 +217,18 @@ class FCMService:
                 "invalid_tokens": []
             }
         
-        if not tokens:
-            return {
-                "success_count": 0,
-                "failure_count": 0,
-                "invalid_tokens": []
-            }
+        message = PushMessage(
+            title=title, body=body, data=data or {}, image_url=image_url,
+            sound=sound, priority=priority
+        )
+        result = await self.delivery.deliver(tokens, message)
         
-        try:
-            # Build notification
-            notification = messaging.Notification(
-                title=title,
-                body=body,
-                image=image_url
-            )
-            
-            # Build Android config
-            android_config = messaging.AndroidConfig(
-                priority=priority,
-                notification=messaging.AndroidNotification(
-                    sound=sound,
-                    channel_id="default",
-                    color="#FF6B6B",
-                    icon="notification_icon",
-                )
-            )
-            
-            # Build multicast message
-            message = messaging.MulticastMessage(
-                tokens=tokens,
-                notification=notification,
-                data=data or {},
-                android=android_config,
-            )
-            
-            # Send multicast
-            response = messaging.send_multicast(message)
-            
-            # Collect invalid tokens
-            invalid_tokens = []
-            if response.failure_count > 0:
-                for idx, resp in enumerate(response.responses):
-                    if not resp.success:
-                        if isinstance(resp.exception, messaging.UnregisteredError):
-                            invalid_tokens.append(tokens[idx])
-            
-            logger.info(
-                f"Multicast sent: {response.success_count} success, "
-                f"{response.failure_count} failures, "
-                f"{len(invalid_tokens)} invalid tokens"
-            )
-            
-            return {
-                "success_count": response.success_count,
-                "failure_count": response.failure_count,
-                "invalid_tokens": invalid_tokens
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to send multicast: {e}")
-            return {
-                "success_count": 0,
-                "failure_count": len(tokens),
-                "invalid_tokens": []
-            }
+        logger.info(
+            f"Multicast sent: {result.success_count} success, "
+            f"{result.failure_count} failures, "
+            f"{len(result.invalid_tokens)} invalid tokens ({result.chunks} chunk(s))"
+        )
+        return result.as_dict()
     
     async def send_reminder_notification(
         self,
@@ -264,23 +251,15 @@ class FCMService:
         Returns:
             bool: True if sent successfully
         """
-        title = "💰 Reminder"
-        body = f"{reminder_title} - {currency} {reminder_amount:.2f}"
-        
-        data = {
-            "type": "reminder",
-            "reminder_id": str(reminder_id),
-            "screen": "Reminders",
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        message = reminder_message(reminder_title, reminder_amount, reminder_id, currency)
         
         return await self.send_notification(
             token=token,
-            title=title,
-            body=body,
-            data=data,
-            sound="default",
-            priority="high"
+            title=message.title,
+            body=message.body,
+            data=message.data,
+            sound=message.sound,
+            priority=message.priority
         )
     
     async def send_goal_notification(
@@ -0,0 +1,297 @@
+"""
+Goal Maintenance Service
+
+Keeps spend_under and log_n_days goals in sync with entries.
+
+Entry writes are turned into small commutative deltas (a signed expense
+amount, and +1/-1 for a day that gained its first / lost its last entry) that
+adjust only the affected goals' current_value. The day deltas read the
+daily_rollups row of the touched day, so the cost of a write does not depend
+on how long a goal's window is. recompute_goals() remains the full
+recalculation behind goal creation and /motivation/goals/refresh.
+
+Deltas are applied off the request path by goal_update_queue, which merges
+all deltas queued for a user into one transaction and adds them to
+current_value in SQL. Full recomputes go through the same per-user queue
+(refresh_goals): a recompute already counts every committed entry, so the
+deltas queued with it are dropped instead of being counted twice, and it
+never runs alongside a delta job of the same user. Deltas that still fail
+after the queue's retries are replaced by a recompute, so progress does not
+drift.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update, func, case, cast, or_, true, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db import AsyncSessionLocal
+from models import Goal, Entry, Category, DailyRollup, GoalKind, GoalStatus, EntryType, ExpenseType
+from services.work_queue import CoalescingWorkQueue
+
+
+MAINTAINED_KINDS = (GoalKind.spend_under, GoalKind.log_n_days)
+
+# Queue item asking for a full recompute of the user's goals
+RECOMPUTE = "recompute"
+
+
+def entry_snapshot(entry: Entry) -> Dict[str, Any]:
+    """Capture the fields of an entry that goals depend on"""
+    booked_at = entry.booked_at
+    if booked_at.tzinfo is not None:
+        # Stored as wall-clock time; keep comparisons with goal dates naive
+        booked_at = booked_at.replace(tzinfo=None)
+    return {
+        "booked_at": booked_at,
+        "type": entry.type,
+        "amount": entry.amount,
+        "category_id": entry.category_id,
+    }
+
+
+async def entry_goal_delta(
+    db: AsyncSession,
+    user_id: int,
+    old: Optional[Dict[str, Any]],
+    new: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Describe how one entry change moves the user's goals
+
+    Call after the change has been applied to daily_rollups (same
+    transaction), passing snapshots of the entry before (None on create) and
+    after (None on delete) the change.
+
+    Returns:
+        dict: {"spend": [(booked_at, signed_amount, category_id)],
+               "days": {day: +1 | -1}}
+    """
+    spend = []
+    if old and old["type"] == EntryType.expense:
+        spend.append((old["booked_at"], -old["amount"], old["category_id"]))
+    if new and new["type"] == EntryType.expense:
+        spend.append((new["booked_at"], new["amount"], new["category_id"]))
+
+    old_day = old["booked_at"].date() if old else None
+    new_day = new["booked_at"].date() if new else None
+
+    days = {}
+    if old_day != new_day:
+        day_counts = {}
+        if old_day is not None:
+            day_counts[old_day] = -1
+        if new_day is not None:
+            day_counts[new_day] = day_counts.get(new_day, 0) + 1
+        days = await _logged_day_changes(db, user_id, day_counts)
+
+    return {"spend": spend, "days": days}
+
+
+async def entries_created_goal_delta(
+    db: AsyncSession,
+    user_id: int,
+    snapshots: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Goal delta for a batch of newly created entries, in the same shape as
+    entry_goal_delta(). Call after the batch is in daily_rollups.
+    """
+    spend = [
+        (new["booked_at"], new["amount"], new["category_id"])
+        for new in snapshots if new["type"] == EntryType.expense
+    ]
+
+    day_counts: Dict[Any, int] = {}
+    for new in snapshots:
+        day = new["booked_at"].date()
+        day_counts[day] = day_counts.get(day, 0) + 1
+
+    return {"spend": spend, "days": await _logged_day_changes(db, user_id, day_counts)}
+
+
+async def _logged_day_changes(db: AsyncSession, user_id: int, day_counts: Dict[Any, int]) -> Dict[Any, int]:
+    """
+    Turn per-day entry count changes into +1/-1 for days that gained their
+    first / lost their last entry, using the rollup counts after the change
+    """
+    if not day_counts:
+        return {}
+
+    result = await db.execute(
+        select(DailyRollup.day, func.sum(DailyRollup.count)).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.day.in_(day_counts.keys())
+        ).group_by(DailyRollup.day)
+    )
+    counts_after = {row[0]: int(row[1] or 0) for row in result}
+
+    days = {}
+    for day, count in day_counts.items():
+        after = counts_after.get(day, 0)
+        change = int(after > 0) - int(after - count > 0)
+        if change:
+            days[day] = change
+    return days
+
+
+def _in_window(goal: Goal, moment: datetime) -> bool:
+    if moment < goal.start_date:
+        return False
+    return goal.end_date is None or moment <= goal.end_date
+
+
+def _day_in_window(goal: Goal, day) -> bool:
+    if day < goal.start_date.date():
+        return False
+    return goal.end_date is None or day <= goal.end_date.date()
+
+
+async def apply_goal_deltas(db: AsyncSession, user_id: int, deltas: List[Dict[str, Any]]) -> int:
+    """
+    Apply one or more entry deltas to the user's active goals
+
+    Loads the active goals once and resolves category expense types with a
+    single query. Does not commit.
+
+    Returns:
+        int: Number of goals whose current_value changed
+    """
+    spend = [item for delta in deltas for item in delta["spend"]]
+    days: Dict[Any, int] = {}
+    for delta in deltas:
+        for day, change in delta["days"].items():
+            days[day] = days.get(day, 0) + change
+
+    if not spend and not any(days.values()):
+        return 0
+
+    result = await db.execute(
+        select(Goal).where(
+            Goal.user_id == user_id,
+            Goal.status == GoalStatus.active,
+            Goal.kind.in_(MAINTAINED_KINDS)
+        )
+    )
+    goals = result.scalars().all()
+    if not goals:
+        return 0
+
+    # Mandatory expenses do not count towards spend_under limits
+    mandatory = set()
+    category_ids = {category_id for _, _, category_id in spend if category_id is not None}
+    if category_ids and any(goal.kind == GoalKind.spend_under for goal in goals):
+        result = await db.execute(
+            select(Category.id).where(
+                Category.id.in_(category_ids),
+                Category.expense_type == ExpenseType.mandatory
+            )
+        )
+        mandatory = {row[0] for row in result}
+
+    changed = 0
+    for goal in goals:
+        if goal.kind == GoalKind.spend_under:
+            change = sum(
+                amount for booked_at, amount, category_id in spend
+                if category_id not in mandatory and _in_window(goal, booked_at)
+            )
+        else:
+            change = sum(count for day, count in days.items() if _day_in_window(goal, day))
+
+        if change:
+            # Relative to the stored value, not the one loaded above
+            new_value = Goal.current_value + change
+            await db.execute(
+                update(Goal)
+                .where(Goal.id == goal.id)
+                .values(current_value=case(
+                    (new_value < 0, 0.0),
+                    else_=func.round(cast(new_value, Numeric), 2)
+                ))
+                .execution_options(synchronize_session=False)
+            )
+            changed += 1
+
+    return changed
+
+
+async def recompute_goals(db: AsyncSession, user_id: int) -> None:
+    """
+    Fully recalculate current_value of the user's active spend_under and
+    log_n_days goals (one aggregate query per goal). Does not commit.
+    """
+    result = await db.execute(
+        select(Goal).where(
+            Goal.user_id == user_id,
+            Goal.status == GoalStatus.active,
+            Goal.kind.in_(MAINTAINED_KINDS)
+        )
+    )
+    goals = result.scalars().all()
+
+    for goal in goals:
+        # Same window as _in_window/_day_in_window: open-ended goals also count future-dated entries
+        if goal.kind == GoalKind.spend_under:
+            # Discretionary (non-mandatory) expenses; uncategorized ones count
+            result = await db.execute(
+                select(func.coalesce(func.sum(Entry.amount), 0)).select_from(Entry).outerjoin(
+                    Category, Entry.category_id == Category.id
+                ).where(
+                    Entry.user_id == user_id,
+                    Entry.type == EntryType.expense,
+                    Entry.booked_at >= goal.start_date,
+                    Entry.booked_at <= goal.end_date if goal.end_date else true(),
+                    or_(
+                        Category.id.is_(None),
+                        Category.expense_type.is_(None),
+                        Category.expense_type != ExpenseType.mandatory
+                    )
+                )
+            )
+        else:
+            # Days with at least one entry
+            result = await db.execute(
+                select(func.count(func.distinct(DailyRollup.day))).where(
+                    DailyRollup.user_id == user_id,
+                    DailyRollup.day >= goal.start_date.date(),
+                    DailyRollup.day <= goal.end_date.date() if goal.end_date else true(),
+                    DailyRollup.count > 0
+                )
+            )
+
+        goal.current_value = round(float(result.scalar() or 0), 2)
+
+
+async def _apply_queued_goal_updates(user_id: int, items: List[Any]) -> None:
+    """Queue handler: apply every delta queued for a user in one transaction, or recompute"""
+    async with AsyncSessionLocal() as db:
+        if RECOMPUTE in items:
+            # Counts the entries of the queued deltas too
+            await recompute_goals(db, user_id)
+            await db.commit()
+        elif await apply_goal_deltas(db, user_id, items):
+            await db.commit()
+
+
+def _recompute_instead(user_id: int, items: List[Any]) -> Optional[str]:
+    """Queue fallback: deltas that kept failing are replaced by a full recompute"""
+    return None if RECOMPUTE in items else RECOMPUTE
+
+
+async def refresh_goals(user_id: int) -> None:
+    """Fully recompute a user's goals on the goal queue and wait for it"""
+    await goal_update_queue.submit_and_wait(user_id, RECOMPUTE)
+
+
+# Global goal maintenance queue (started/flushed in main.py lifespan)
+goal_update_queue = CoalescingWorkQueue(
+    "goals",
+    _apply_queued_goal_updates,
+    concurrency=settings.GOAL_QUEUE_CONCURRENCY,
+    max_retries=settings.GOAL_QUEUE_MAX_RETRIES,
+    retry_delay=settings.GOAL_QUEUE_RETRY_DELAY,
+    fallback=_recompute_instead,
+)
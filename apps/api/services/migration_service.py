@@ -0,0 +1,172 @@
+"""
+Schema Migration Service
+
+Versioned, ordered schema migrations. Every module in the migrations/
+package named NNNN_description.py is one migration: its module docstring
+describes it and it defines
+
+    async def upgrade(conn: AsyncConnection) -> None
+
+Applied versions are recorded in the schema_migrations table, each in the
+same transaction as the migration itself. App startup only compares that
+table with the scripts on disk; migrations run from the CLI:
+
+    python migrate.py            # apply pending migrations
+    python migrate.py status     # list applied / pending migrations
+
+or at startup when MIGRATE_ON_STARTUP is enabled.
+"""
+
+import importlib
+import logging
+import pkgutil
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Set
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, insert, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+import migrations
+import models  # noqa: F401 - registers every table on Base.metadata
+from db import Base
+
+logger = logging.getLogger(__name__)
+
+# Kept out of Base.metadata so create_all never touches it
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Serializes migration runs of several workers/instances on PostgreSQL
+_PG_LOCK_KEY = 804_612_001
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    description: str
+    upgrade: Callable
+
+
+def load_migrations() -> List[Migration]:
+    """All migration scripts, ordered by version"""
+    found = []
+    for module_info in pkgutil.iter_modules(migrations.__path__):
+        prefix, _, _ = module_info.name.partition("_")
+        if not prefix.isdigit():
+            continue
+        module = importlib.import_module(f"migrations.{module_info.name}")
+        description = (module.__doc__ or "").strip().splitlines()
+        found.append(Migration(
+            version=int(prefix),
+            name=module_info.name,
+            description=description[0] if description else "",
+            upgrade=module.upgrade,
+        ))
+
+    found.sort(key=lambda m: m.version)
+    versions = [m.version for m in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return found
+
+
+async def applied_versions(conn: AsyncConnection) -> Set[int]:
+    has_table = await conn.run_sync(
+        lambda sync_conn: inspect(sync_conn).has_table(schema_migrations.name)
+    )
+    if not has_table:
+        return set()
+    result = await conn.execute(select(schema_migrations.c.version))
+    return {row[0] for row in result}
+
+
+async def pending_migrations(engine: AsyncEngine) -> List[Migration]:
+    """Migrations not applied yet (one cheap query when up to date)"""
+    async with engine.connect() as conn:
+        applied = await applied_versions(conn)
+    return [m for m in load_migrations() if m.version not in applied]
+
+
+async def run_migrations(engine: AsyncEngine) -> List[Migration]:
+    """
+    Apply pending migrations in order, each in its own transaction
+
+    Returns:
+        list: The migrations that were applied
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: schema_migrations.create(sync_conn, checkfirst=True))
+
+    done = []
+    for migration in load_migrations():
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+
+            # Re-check under the lock: another instance may have applied it meanwhile
+            if migration.version in await applied_versions(conn):
+                continue
+
+            logger.info(f"[Migrations] applying {migration.name}: {migration.description}")
+            await migration.upgrade(conn)
+            await conn.execute(insert(schema_migrations).values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow(),
+            ))
+        done.append(migration)
+
+    return done
+
+
+# ===== Helpers for migration scripts =====
+
+async def create_table_if_missing(conn: AsyncConnection, table_name: str) -> None:
+    """Create a table (and its indexes) as currently defined in models.py"""
+    table = Base.metadata.tables[table_name]
+    await conn.run_sync(lambda sync_conn: table.create(sync_conn, checkfirst=True))
+
+
+async def create_index_if_missing(conn: AsyncConnection, table_name: str, index_name: str) -> None:
+    """Create one index defined on a model; create_all skips indexes of existing tables"""
+    index = next(i for i in Base.metadata.tables[table_name].indexes if i.name == index_name)
+    await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+
+
+async def add_column_if_missing(
+    conn: AsyncConnection,
+    table_name: str,
+    column_name: str,
+    server_default: str = None,
+) -> bool:
+    """
+    Add a column defined on a model to an existing table
+
+    server_default is a SQL literal used for existing rows (required for
+    NOT NULL columns). Returns True if the column was added.
+    """
+    columns = await conn.run_sync(
+        lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns(table_name)}
+    )
+    if column_name in columns:
+        return False
+
+    column = Base.metadata.tables[table_name].c[column_name]
+    if hasattr(column.type, "create"):
+        # Named types such as PostgreSQL ENUMs must exist before the column
+        await conn.run_sync(lambda sync_conn: column.type.create(sync_conn, checkfirst=True))
+
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=conn.dialect)}"
+    if server_default is not None:
+        ddl += f" DEFAULT {server_default}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    await conn.execute(text(ddl))
+    return True
@@ -0,0 +1,366 @@
+"""
+Push Notification Outbox
+
+Notifications are written to the notification_outbox table (in the same
+transaction as whatever triggered them) and delivered by a background
+dispatcher started in the FastAPI lifespan:
+
+- claim: up to OUTBOX_BATCH_SIZE due rows are marked "sending" with a lease
+  (SKIP LOCKED on PostgreSQL), so several workers never send the same row;
+  rows whose lease ran out (crashed worker) become claimable again
+- send: the messages of the whole batch go out together, up to
+  FCM_MULTICAST_CHUNK_SIZE per FCM request (FCMService.deliver_each)
+- retry: tokens that failed transiently are kept on the row and retried
+  with exponential backoff (plus jitter) up to OUTBOX_MAX_ATTEMPTS times
+- dead tokens: every token FCM reports unregistered in a batch is
+  deactivated with one UPDATE; delivered tokens get last_used_at the same way
+
+The dispatcher wakes up when notified (wake()) or every OUTBOX_POLL_SECONDS.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, insert, update, delete, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db import AsyncSessionLocal
+from models import NotificationOutbox, PushToken
+from services.fcm_service import fcm_service
+from services.push_delivery import PushMessage
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("sent", "skipped", "failed")
+
+
+def outbox_values(
+    user_id: int,
+    message: PushMessage,
+    kind: str = "generic",
+    tokens: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Column values of one outbox row (for bulk inserts)"""
+    now = datetime.utcnow()
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "title": message.title,
+        "body": message.body,
+        "data": json.dumps(message.data) if message.data else None,
+        "priority": message.priority,
+        "tokens": json.dumps(tokens) if tokens is not None else None,
+        "status": "pending",
+        "attempts": 0,
+        "delivered": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+
+def enqueue_notification(
+    db: AsyncSession,
+    user_id: int,
+    message: PushMessage,
+    kind: str = "generic",
+    tokens: Optional[List[str]] = None,
+) -> NotificationOutbox:
+    """
+    Add a notification for all active devices of a user (or only `tokens`)
+
+    The caller commits, then calls outbox_dispatcher.wake() to send right away.
+    """
+    row = NotificationOutbox(**outbox_values(user_id, message, kind, tokens))
+    db.add(row)
+    return row
+
+
+async def enqueue_notifications(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert many outbox_values() rows with one executemany (the caller commits)"""
+    if rows:
+        await db.execute(insert(NotificationOutbox), rows)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts` (1-based), +-20% jitter"""
+    delay = min(
+        settings.OUTBOX_BACKOFF_MAX_SECONDS,
+        settings.OUTBOX_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1))
+    )
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def outbox_backlog(db: AsyncSession) -> Dict[str, Any]:
+    """Rows waiting for delivery and the age of the oldest one"""
+    result = await db.execute(
+        select(func.count(NotificationOutbox.id), func.min(NotificationOutbox.created_at))
+        .where(NotificationOutbox.status.in_(("pending", "sending")))
+    )
+    depth, oldest = result.one()
+    return {
+        "depth": depth,
+        "oldest_pending_seconds": round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else 0.0,
+    }
+
+
+class NotificationDispatcher:
+    """Background loop delivering the notification outbox"""
+
+    def __init__(self, fcm, session_factory=None):
+        self.fcm = fcm
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = settings.OUTBOX_BATCH_SIZE
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._last_cleanup = 0.0
+
+        # Metrics
+        self.batches = 0
+        self.claimed = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.skipped = 0
+        self.devices_reached = 0
+        self.tokens_deactivated = 0
+        self.last_batch_seconds = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="notification-outbox")
+        logger.info("[Outbox] dispatcher started")
+
+    def wake(self) -> None:
+        """Check for due notifications now instead of at the next poll"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("[Outbox] dispatcher stopped")
+
+    async def _run(self) -> None:
+        if not self.fcm.is_available():
+            logger.warning("[Outbox] FCM not available; notifications stay queued")
+
+        while True:
+            self._wake.clear()
+            handled = 0
+            try:
+                handled = await self.dispatch_once()
+                await self._cleanup_if_due()
+            except Exception as e:
+                logger.error(f"[Outbox] dispatch failed: {e}")
+
+            if handled >= self.batch_size:
+                continue  # More rows are probably due
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, db: AsyncSession, now: datetime) -> List[NotificationOutbox]:
+        claimable = or_(
+            and_(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= now),
+            and_(NotificationOutbox.status == "sending", NotificationOutbox.locked_until < now),
+        )
+        ids_query = (
+            select(NotificationOutbox.id)
+            .where(claimable)
+            .order_by(NotificationOutbox.next_attempt_at)
+            .limit(self.batch_size)
+        )
+        if db.get_bind().dialect.name == "postgresql":
+            ids_query = ids_query.with_for_update(skip_locked=True)
+
+        ids = (await db.execute(ids_query)).scalars().all()
+        if not ids:
+            return []
+
+        # Re-check the condition: another worker may have claimed some rows meanwhile
+        result = await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(ids), claimable)
+            .values(
+                status="sending",
+                locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            )
+            .returning(NotificationOutbox.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed_ids = result.scalars().all()
+        await db.commit()
+        if not claimed_ids:
+            return []
+
+        result = await db.execute(
+            select(NotificationOutbox).where(NotificationOutbox.id.in_(claimed_ids))
+        )
+        return result.scalars().all()
+
+    async def dispatch_once(self) -> int:
+        """Claim and send one batch of due notifications; returns the number of rows handled"""
+        if not self.fcm.is_available():
+            return 0
+
+        started = time.perf_counter()
+        async with self.session_factory() as db:
+            now = datetime.utcnow()
+            rows = await self._claim(db, now)
+            if not rows:
+                return 0
+
+            # Rows without an explicit token list go to every active device of the user
+            user_ids = {row.user_id for row in rows if row.tokens is None}
+            tokens_by_user: Dict[int, List[str]] = {}
+            if user_ids:
+                result = await db.execute(
+                    select(PushToken.user_id, PushToken.token).where(
+                        PushToken.user_id.in_(user_ids),
+                        PushToken.is_active == True
+                    )
+                )
+                for user_id, token in result:
+                    tokens_by_user.setdefault(user_id, []).append(token)
+
+            targets = {
+                row.id: json.loads(row.tokens) if row.tokens is not None else tokens_by_user.get(row.user_id, [])
+                for row in rows
+            }
+
+            # Every (token, message) pair of the batch goes out in as few FCM requests as possible
+            messages = {
+                row.id: PushMessage(
+                    title=row.title, body=row.body,
+                    data=json.loads(row.data) if row.data else {}, priority=row.priority
+                )
+                for row in rows
+            }
+            items = [(token, messages[row.id]) for row in rows for token in targets[row.id]]
+            results = (await self.fcm.deliver_each(items)).results if items else []
+
+            now = datetime.utcnow()
+            delivered_tokens, invalid_tokens = set(), set()
+            offset = 0
+            for row in rows:
+                count = len(targets[row.id])
+                self._record_attempt(row, results[offset:offset + count], now, delivered_tokens, invalid_tokens)
+                offset += count
+
+            if invalid_tokens:
+                await db.execute(
+                    update(PushToken)
+                    .where(PushToken.token.in_(invalid_tokens))
+                    .values(is_active=False, updated_at=now)
+                )
+                self.tokens_deactivated += len(invalid_tokens)
+            if delivered_tokens:
+                await db.execute(
+                    update(PushToken)
+                    .where(PushToken.token.in_(delivered_tokens))
+                    .values(last_used_at=now)
+                )
+            await db.commit()
+
+        self.batches += 1
+        self.claimed += len(rows)
+        self.last_batch_seconds = time.perf_counter() - started
+        return len(rows)
+
+    def _record_attempt(self, row, results, now, delivered_tokens, invalid_tokens) -> None:
+        """Update one outbox row from the outcome of its tokens"""
+        row.attempts += 1
+        row.locked_until = None
+
+        if not results:
+            row.status = "skipped"
+            row.last_error = "No active push tokens"
+            self.skipped += 1
+            return
+
+        ok = [r.token for r in results if r.success]
+        retry = [r.token for r in results if not r.success and r.retryable]
+        errors = [r.error for r in results if not r.success]
+
+        delivered_tokens.update(ok)
+        invalid_tokens.update(r.token for r in results if r.invalid)
+        row.delivered += len(ok)
+        self.devices_reached += len(ok)
+        row.last_error = errors[0] if errors else None
+
+        if retry and row.attempts < settings.OUTBOX_MAX_ATTEMPTS:
+            row.status = "pending"
+            row.tokens = json.dumps(retry)
+            row.next_attempt_at = now + timedelta(seconds=backoff_seconds(row.attempts))
+            self.retried += 1
+            return
+
+        if row.delivered:
+            row.status = "sent"
+            row.sent_at = now
+            self.sent += 1
+            lag = (now - row.created_at).total_seconds()
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._lag_total += lag
+        else:
+            row.status = "failed"
+            self.failed += 1
+
+    async def _cleanup_if_due(self) -> None:
+        """Drop finished rows past OUTBOX_RETENTION_DAYS (at most hourly)"""
+        if time.monotonic() - self._last_cleanup < 3600:
+            return
+        self._last_cleanup = time.monotonic()
+
+        cutoff = datetime.utcnow() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+        async with self.session_factory() as db:
+            await db.execute(
+                delete(NotificationOutbox).where(
+                    NotificationOutbox.status.in_(FINISHED_STATUSES),
+                    NotificationOutbox.created_at < cutoff
+                )
+            )
+            await db.commit()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Throughput counters and delivery lag (seconds from enqueue to sent)"""
+        return {
+            "running": self.running,
+            "fcm_available": self.fcm.is_available(),
+            "batches": self.batches,
+            "claimed": self.claimed,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "devices_reached": self.devices_reached,
+            "tokens_deactivated": self.tokens_deactivated,
+            "last_batch_seconds": round(self.last_batch_seconds, 3),
+            "last_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "avg_lag_seconds": round(self._lag_total / self.sent, 3) if self.sent else 0.0,
+        }
+
+
+# Global dispatcher (started/stopped in main.py lifespan)
+outbox_dispatcher = NotificationDispatcher(fcm_service)
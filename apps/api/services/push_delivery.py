@@ -0,0 +1,285 @@
+"""
+Push Delivery
+
+Sends FCM messages without blocking the event loop. The firebase-admin
+calls are synchronous HTTP requests, so they run in a dedicated thread pool
+(FCM_DELIVERY_THREADS). A fan-out is split into multicast chunks of at most
+FCM_MULTICAST_CHUNK_SIZE tokens (the provider limit is 500); chunks are sent
+concurrently, at most FCM_MAX_CONCURRENT_CHUNKS at a time per fan-out, and
+the per-token outcomes are merged into one DeliveryResult.
+
+deliver_each() sends a different message per token (e.g. one per due
+reminder), again up to FCM_MULTICAST_CHUNK_SIZE messages per request.
+
+The provider is behind a small transport interface (send_each for one
+message to many tokens, send_batch for distinct messages), so the subsystem
+runs the same against FakeFCMTransport in tests and benchmarks.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+FCM_MULTICAST_LIMIT = 500
+
+
+@dataclass
+class PushMessage:
+    title: str
+    body: str
+    data: Dict[str, str] = field(default_factory=dict)
+    image_url: Optional[str] = None
+    sound: str = "default"
+    badge: Optional[int] = None
+    priority: str = "high"
+
+
+@dataclass
+class TokenResult:
+    token: str
+    success: bool
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+    invalid: bool = False  # Token is unregistered/foreign - deactivate it
+    retryable: bool = False  # Transient failure (quota, unavailable, network)
+
+
+@dataclass
+class DeliveryResult:
+    success_count: int = 0
+    failure_count: int = 0
+    invalid_tokens: List[str] = field(default_factory=list)
+    retryable_tokens: List[str] = field(default_factory=list)
+    chunks: int = 0
+    results: List[TokenResult] = field(default_factory=list)
+
+    def add(self, result: TokenResult) -> None:
+        self.results.append(result)
+        if result.success:
+            self.success_count += 1
+            return
+        self.failure_count += 1
+        if result.invalid:
+            self.invalid_tokens.append(result.token)
+        elif result.retryable:
+            self.retryable_tokens.append(result.token)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The shape FCMService.send_multicast has always returned"""
+        return {
+            "success_count": self.success_count,
+            "failure_count": self.failure_count,
+            "invalid_tokens": self.invalid_tokens,
+        }
+
+
+# ===== Transports (blocking; called from the delivery thread pool) =====
+
+class FirebaseTransport:
+    """firebase-admin messaging, one HTTP call per multicast chunk"""
+
+    def __init__(self, app=None):
+        from firebase_admin import exceptions, messaging
+        self.messaging = messaging
+        self.exceptions = exceptions
+        self.app = app
+
+    def _payload(self, message: PushMessage) -> Dict[str, Any]:
+        """Message fields shared by single and multicast messages"""
+        messaging = self.messaging
+        return dict(
+            notification=messaging.Notification(
+                title=message.title,
+                body=message.body,
+                image=message.image_url
+            ),
+            data=message.data or {},
+            android=messaging.AndroidConfig(
+                priority=message.priority,
+                notification=messaging.AndroidNotification(
+                    sound=message.sound,
+                    channel_id="default",
+                    color="#FF6B6B",  # ACT brand color
+                    icon="notification_icon",
+                )
+            ),
+            apns=messaging.APNSConfig(
+                payload=messaging.APNSPayload(
+                    aps=messaging.Aps(
+                        sound=message.sound,
+                        badge=message.badge,
+                        content_available=True,
+                    )
+                )
+            ),
+        )
+
+    def _classify(self, token: str, exception: Exception) -> TokenResult:
+        messaging, errors = self.messaging, self.exceptions
+        invalid = isinstance(exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError))
+        retryable = not invalid and isinstance(exception, (
+            errors.UnavailableError, errors.InternalError,
+            errors.DeadlineExceededError, errors.ResourceExhaustedError,  # incl. QuotaExceededError
+        ))
+        return TokenResult(token, False, error=str(exception), invalid=invalid, retryable=retryable)
+
+    def send_each(self, tokens: List[str], message: PushMessage) -> List[TokenResult]:
+        multicast = self.messaging.MulticastMessage(tokens=tokens, **self._payload(message))
+        # send_multicast (legacy batch endpoint) is gone from recent firebase-admin releases
+        send = getattr(self.messaging, "send_each_for_multicast", None) or self.messaging.send_multicast
+        response = send(multicast, app=self.app)
+        return self._results(tokens, response)
+
+    def _results(self, tokens: List[str], response) -> List[TokenResult]:
+        results = []
+        for token, resp in zip(tokens, response.responses):
+            if resp.success:
+                results.append(TokenResult(token, True, message_id=resp.message_id))
+            else:
+                results.append(self._classify(token, resp.exception))
+        return results
+
+    def send_batch(self, items: List[Tuple[str, PushMessage]]) -> List[TokenResult]:
+        """Distinct messages (one per token) in one send_each call"""
+        messages = [self.messaging.Message(token=token, **self._payload(message)) for token, message in items]
+        response = self.messaging.send_each(messages, app=self.app)
+        return self._results([token for token, _ in items], response)
+
+
+class FakeFCMTransport:
+    """
+    Local stand-in for FCM
+
+    Sleeps `latency` seconds per call (a blocking round trip), reports
+    `invalid_tokens` as unregistered and `failing_tokens` as transient errors,
+    and records every call for assertions.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        invalid_tokens: Optional[Set[str]] = None,
+        failing_tokens: Optional[Set[str]] = None,
+    ):
+        self.latency = latency
+        self.invalid_tokens = set(invalid_tokens or ())
+        self.failing_tokens = set(failing_tokens or ())
+        self.calls: List[List[str]] = []
+        self.sent: List[tuple] = []
+
+    def send_each(self, tokens: List[str], message: PushMessage) -> List[TokenResult]:
+        return self.send_batch([(token, message) for token in tokens])
+
+    def send_batch(self, items: List[Tuple[str, PushMessage]]) -> List[TokenResult]:
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls.append([token for token, _ in items])
+
+        results = []
+        for token, message in items:
+            if token in self.invalid_tokens:
+                results.append(TokenResult(token, False, error="unregistered", invalid=True))
+            elif token in self.failing_tokens:
+                results.append(TokenResult(token, False, error="unavailable", retryable=True))
+            else:
+                self.sent.append((token, message))
+                results.append(TokenResult(token, True, message_id=f"fake-{len(self.sent)}"))
+        return results
+
+
+# ===== Delivery =====
+
+class PushDeliveryService:
+    """Chunked, concurrent multicast over a blocking transport"""
+
+    def __init__(
+        self,
+        transport,
+        max_threads: int = 8,
+        chunk_size: int = FCM_MULTICAST_LIMIT,
+        max_concurrent_chunks: int = 4,
+    ):
+        self.transport = transport
+        self.chunk_size = max(1, min(chunk_size, FCM_MULTICAST_LIMIT))
+        self.max_concurrent_chunks = max(1, max_concurrent_chunks)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_threads), thread_name_prefix="fcm")
+
+        # Metrics
+        self.sent_chunks = 0
+        self.delivered = 0
+        self.failed = 0
+        self.invalid = 0
+
+    async def _send_chunk(self, send, chunk: List, tokens: List[str]) -> List[TokenResult]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, send, *chunk)
+        except Exception as e:
+            # The whole request failed (network, auth...): every token may be retried
+            logger.error(f"[Push] chunk of {len(tokens)} failed: {e}")
+            return [TokenResult(token, False, error=str(e), retryable=True) for token in tokens]
+
+    async def _fan_out(self, send, chunks: List[tuple], chunk_tokens: List[List[str]]) -> DeliveryResult:
+        """Run the chunks in the pool (at most max_concurrent_chunks at once) and merge the outcomes"""
+        result = DeliveryResult()
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+
+        async def run(chunk, tokens) -> List[TokenResult]:
+            async with semaphore:
+                return await self._send_chunk(send, chunk, tokens)
+
+        for chunk_results in await asyncio.gather(*(run(c, t) for c, t in zip(chunks, chunk_tokens))):
+            for token_result in chunk_results:
+                result.add(token_result)
+        result.chunks = len(chunks)
+
+        self.sent_chunks += len(chunks)
+        self.delivered += result.success_count
+        self.failed += result.failure_count
+        self.invalid += len(result.invalid_tokens)
+        return result
+
+    async def deliver(self, tokens: List[str], message: PushMessage) -> DeliveryResult:
+        """Send one message to every token; returns the merged per-token outcome"""
+        tokens = list(dict.fromkeys(tokens))  # FCM would deliver duplicates twice
+        if not tokens:
+            return DeliveryResult()
+
+        token_chunks = [tokens[i:i + self.chunk_size] for i in range(0, len(tokens), self.chunk_size)]
+        return await self._fan_out(
+            self.transport.send_each,
+            [(chunk, message) for chunk in token_chunks],
+            token_chunks
+        )
+
+    async def deliver_each(self, items: List[Tuple[str, PushMessage]]) -> DeliveryResult:
+        """
+        Send a different message to each token, up to chunk_size per request
+
+        Results keep the order of `items`.
+        """
+        if not items:
+            return DeliveryResult()
+
+        item_chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        return await self._fan_out(
+            self.transport.send_batch,
+            [(chunk,) for chunk in item_chunks],
+            [[token for token, _ in chunk] for chunk in item_chunks]
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.sent_chunks,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "invalid_tokens": self.invalid,
+        }
@@ -0,0 +1,356 @@
+"""
+Reminder Push Scheduler
+
+Fires a push notification when a reminder falls due, so reminders no longer
+depend on device-local notifications only.
+
+The scheduler keeps a min-heap of (push time, id) for the open reminders
+due within the next REMINDER_HORIZON_MINUTES. The push time is reminder_date
+until the reminder was pushed; a pushed recurring reminder is due again at
+next_push_at, its next occurrence. It is loaded once at startup;
+afterwards every REMINDER_REFRESH_SECONDS only reminders whose updated_at
+moved are re-read (ix_reminders_updated_at), and the window is extended as
+time passes. Heap entries are invalidated lazily: an entry only fires if it
+still matches the reminder's current date in `_scheduled`.
+
+Due reminders are handed over in batches of REMINDER_BATCH_SIZE. One
+transaction marks them notified (UPDATE ... WHERE notified_at IS NULL
+RETURNING) and queues their pushes in the notification outbox, which sends
+them through FCMService with retries. The guarded UPDATE makes the handoff
+exactly-once across restarts and across several workers running their own
+scheduler: whoever marks a reminder first queues its push, the others get no
+row back. Rescheduling a reminder clears notified_at.
+
+When a recurring reminder is pushed, the same transaction sets next_push_at.
+Pushing that occurrence makes it the open one (reminder_date) whether or not
+the previous one was completed, so every occurrence is pushed.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, func, case, and_, or_, bindparam
+
+from config import settings
+from db import AsyncSessionLocal
+from models import Reminder
+from services.fcm_service import reminder_message
+from services.notification_outbox import outbox_values, enqueue_notifications, outbox_dispatcher
+from services.reminder_service import next_occurrence
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows updated slightly before the watermark (commits are not ordered by updated_at)
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+# When a reminder is next due (next_push_at is only set while notified_at is)
+PUSH_AT = func.coalesce(Reminder.next_push_at, Reminder.reminder_date)
+
+
+class ReminderScheduler:
+    """In-memory min-heap of upcoming reminders that queues their pushes when due"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        on_enqueued: Optional[Callable[[], None]] = None,
+        horizon: timedelta = None,
+        refresh_seconds: float = None,
+        batch_size: int = None,
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.on_enqueued = on_enqueued or outbox_dispatcher.wake
+        self.horizon = horizon or timedelta(minutes=settings.REMINDER_HORIZON_MINUTES)
+        self.refresh_seconds = refresh_seconds or settings.REMINDER_REFRESH_SECONDS
+        self.batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Dict[int, datetime] = {}  # reminder id -> date of its live heap entry
+        self._window_end: Optional[datetime] = None
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        # Metrics
+        self.loaded = 0
+        self.refreshes = 0
+        self.fired = 0
+        self.lost_races = 0  # Due reminders another worker (or a completion) got to first
+        self.skipped_late = 0  # Recurring occurrences claimed too late to push
+        self.batches = 0
+        self.last_refresh_seconds = 0.0
+        self.last_fire_lag = 0.0
+        self.max_fire_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(hours=settings.REMINDER_MAX_LATENESS_HOURS)
+
+    def _due_within(self, after: Optional[datetime], until: datetime):
+        """(id, push time) of the open reminders due in (after, until]"""
+        first_push = [
+            Reminder.notified_at.is_(None),
+            Reminder.reminder_date >= self._cutoff(),
+            Reminder.reminder_date <= until,
+        ]
+        # No lateness cutoff: a late occurrence is claimed (not pushed) so the series moves on
+        next_push = [
+            Reminder.notified_at.isnot(None),
+            Reminder.next_push_at <= until,
+        ]
+        if after is not None:
+            first_push.append(Reminder.reminder_date > after)
+            next_push.append(Reminder.next_push_at > after)
+        return select(Reminder.id, PUSH_AT).where(
+            Reminder.is_completed == False,
+            or_(and_(*first_push), and_(*next_push))
+        )
+
+    def _push(self, reminder_id: int, reminder_date: datetime) -> None:
+        if self._scheduled.get(reminder_id) == reminder_date:
+            return
+        self._scheduled[reminder_id] = reminder_date
+        heapq.heappush(self._heap, (reminder_date, reminder_id))
+
+    # ===== Loading =====
+
+    async def load(self) -> int:
+        """(Re)build the heap from every open reminder due within the horizon"""
+        now = datetime.utcnow()
+        window_end = now + self.horizon
+        async with self.session_factory() as db:
+            result = await db.execute(self._due_within(None, window_end))
+            rows = result.all()
+            watermark = (await db.execute(select(func.max(Reminder.updated_at)))).scalar()
+
+        self._scheduled = {reminder_id: reminder_date for reminder_id, reminder_date in rows}
+        self._heap = [(reminder_date, reminder_id) for reminder_id, reminder_date in rows]
+        heapq.heapify(self._heap)
+        self._window_end = window_end
+        self._watermark = watermark or now
+        self.loaded = len(rows)
+        return len(rows)
+
+    async def refresh(self) -> int:
+        """Apply reminders changed since the last refresh and extend the window; returns rows read"""
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        new_window_end = now + self.horizon
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(
+                    Reminder.id, Reminder.reminder_date, Reminder.is_completed,
+                    Reminder.notified_at, Reminder.next_push_at, Reminder.updated_at
+                ).where(Reminder.updated_at >= self._watermark - REFRESH_OVERLAP)
+            )
+            changed = result.all()
+
+            # Reminders that slid into the window since the last refresh
+            extended = []
+            if new_window_end > self._window_end:
+                result = await db.execute(self._due_within(self._window_end, new_window_end))
+                extended = result.all()
+
+        for reminder_id, reminder_date, is_completed, notified_at, next_push_at, updated_at in changed:
+            self._watermark = max(self._watermark, updated_at)
+            push_at = reminder_date if notified_at is None else next_push_at
+            if is_completed or push_at is None or push_at > new_window_end:
+                self._scheduled.pop(reminder_id, None)  # Its heap entry is now stale
+            else:
+                self._push(reminder_id, push_at)
+
+        for reminder_id, reminder_date in extended:
+            self._push(reminder_id, reminder_date)
+        self._window_end = new_window_end
+
+        # Stale entries pile up when many reminders move; rebuild once they dominate
+        if len(self._heap) > 2 * len(self._scheduled) + 1024:
+            self._heap = [(date, rid) for rid, date in self._scheduled.items()]
+            heapq.heapify(self._heap)
+
+        self.refreshes += 1
+        self.last_refresh_seconds = time.perf_counter() - started
+        return len(changed) + len(extended)
+
+    def schedule(self, reminder_id: int, reminder_date: datetime) -> None:
+        """Pick up a reminder created/rescheduled in this worker without waiting for refresh"""
+        if self._window_end is None or reminder_date > self._window_end:
+            return
+        self._push(reminder_id, reminder_date)
+        if self._wake is not None:
+            self._wake.set()
+
+    # ===== Firing =====
+
+    def pop_due(self, now: datetime) -> List[int]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            reminder_date, reminder_id = heapq.heappop(self._heap)
+            if self._scheduled.get(reminder_id) == reminder_date:
+                del self._scheduled[reminder_id]
+                due.append(reminder_id)
+        return due
+
+    async def fire(self, reminder_ids: List[int]) -> int:
+        """Mark one batch notified and queue its pushes in one transaction; returns reminders queued"""
+        now = datetime.utcnow()
+        cutoff = self._cutoff()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Reminder)
+                .where(
+                    Reminder.id.in_(reminder_ids),
+                    Reminder.is_completed == False,
+                    or_(
+                        and_(Reminder.notified_at.is_(None), Reminder.reminder_date <= now),
+                        and_(Reminder.notified_at.isnot(None), Reminder.next_push_at <= now),
+                    )
+                )
+                # The pushed occurrence becomes the open one; the previous one lapses uncompleted.
+                # A first push keeps updated_at (being notified is not an edit); moving the open
+                # occurrence is one, so clients' reminder ETags change
+                .values(
+                    reminder_date=case(
+                        (Reminder.notified_at.is_(None), Reminder.reminder_date),
+                        else_=Reminder.next_push_at
+                    ),
+                    notified_at=now,
+                    next_push_at=None,
+                    updated_at=case(
+                        (Reminder.notified_at.is_(None), Reminder.updated_at),
+                        else_=now
+                    )
+                )
+                .returning(
+                    Reminder.id, Reminder.user_id, Reminder.title, Reminder.amount,
+                    Reminder.currency, Reminder.reminder_date, Reminder.recurrence,
+                    Reminder.recurrence_interval, Reminder.recurrence_start, Reminder.recurrence_until
+                )
+                .execution_options(synchronize_session=False)
+            )
+            claimed = result.all()
+
+            # Recurring reminders are due again at their next (future) occurrence
+            next_pushes = {}
+            for row in claimed:
+                when = next_occurrence(row, after=now)
+                if when is not None:
+                    next_pushes[row.id] = when
+            if next_pushes:
+                reminders = Reminder.__table__
+                await db.execute(
+                    reminders.update()
+                    .where(reminders.c.id == bindparam("reminder_id"))
+                    .values(next_push_at=bindparam("push_at"), updated_at=reminders.c.updated_at),
+                    [{"reminder_id": rid, "push_at": when} for rid, when in next_pushes.items()]
+                )
+
+            # Occurrences missed while no scheduler ran are not pushed that late
+            pushed = [row for row in claimed if row.reminder_date >= cutoff]
+            await enqueue_notifications(db, [
+                outbox_values(
+                    row.user_id,
+                    reminder_message(row.title, row.amount, row.id, row.currency),
+                    kind="reminder"
+                )
+                for row in pushed
+            ])
+            await db.commit()
+
+        for reminder_id, when in next_pushes.items():
+            if self._window_end is not None and when <= self._window_end:
+                self._push(reminder_id, when)
+
+        self.batches += 1
+        self.fired += len(pushed)
+        self.skipped_late += len(claimed) - len(pushed)
+        self.lost_races += len(reminder_ids) - len(claimed)
+        if pushed:
+            lag = max((now - row.reminder_date).total_seconds() for row in pushed)
+            self.last_fire_lag = lag
+            self.max_fire_lag = max(self.max_fire_lag, lag)
+            self.on_enqueued()
+        return len(pushed)
+
+    async def fire_due(self) -> int:
+        """Queue pushes for everything due now, batch by batch"""
+        due = self.pop_due(datetime.utcnow())
+        queued = 0
+        for start in range(0, len(due), self.batch_size):
+            queued += await self.fire(due[start:start + self.batch_size])
+        return queued
+
+    # ===== Background loop =====
+
+    def start(self) -> None:
+        if self._task:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="reminder-scheduler")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.load()
+                logger.info(f"[Reminders] scheduler loaded {self.loaded} upcoming reminder(s)")
+                break
+            except Exception as e:
+                logger.error(f"[Reminders] initial load failed: {e}")
+                await asyncio.sleep(self.refresh_seconds)
+
+        next_refresh = time.monotonic() + self.refresh_seconds
+        while True:
+            self._wake.clear()
+            try:
+                if time.monotonic() >= next_refresh:
+                    await self.refresh()
+                    next_refresh = time.monotonic() + self.refresh_seconds
+                await self.fire_due()
+            except Exception as e:
+                logger.error(f"[Reminders] scheduler error: {e}")
+
+            timeout = max(0.0, next_refresh - time.monotonic())
+            if self._heap:
+                until_due = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                timeout = min(timeout, max(0.0, until_due))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "scheduled": len(self._scheduled),
+            "heap_size": len(self._heap),
+            "next_due": self._heap[0][0].isoformat() if self._heap else None,
+            "window_end": self._window_end.isoformat() if self._window_end else None,
+            "loaded": self.loaded,
+            "refreshes": self.refreshes,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 3),
+            "batches": self.batches,
+            "fired": self.fired,
+            "lost_races": self.lost_races,
+            "skipped_late": self.skipped_late,
+            "last_fire_lag_seconds": round(self.last_fire_lag, 3),
+            "max_fire_lag_seconds": round(self.max_fire_lag, 3),
+        }
+
+
+# Global scheduler (started/stopped in main.py lifespan)
+reminder_scheduler = ReminderScheduler()
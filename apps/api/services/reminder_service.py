@@ -0,0 +1,187 @@
+"""
+Reminder Queries and Recurrence
+
+Reminders are returned with their category's name, icon and color, read
+with one LEFT JOIN instead of one categories lookup per reminder. The list
+summary (total / upcoming / completed) is one conditional-aggregate query.
+
+A recurring reminder is one row holding its rule (daily / weekly / monthly,
+every recurrence_interval units, optionally until recurrence_until).
+reminder_date is the open occurrence: the one pushed by the scheduler and
+completed by the user, after which the row moves on to the next occurrence
+(advance_recurrence). Once the open occurrence is pushed, next_push_at holds
+the following one; when that comes due the scheduler pushes it and makes it
+the open occurrence, so a series keeps being pushed even if one occurrence
+is never completed. Later occurrences are never stored; they are computed
+for the window being read (occurrences_between), so storage and read cost
+stay constant per rule however long the series runs.
+"""
+
+from calendar import monthrange
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select, func, case, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Reminder, Category
+
+
+def reminder_query(user_id: int):
+    """Reminders of a user joined with the category fields shown next to them"""
+    return select(
+        Reminder,
+        Category.name.label("category_name"),
+        Category.icon.label("category_icon"),
+        Category.color.label("category_color"),
+    ).outerjoin(
+        Category, Reminder.category_id == Category.id
+    ).where(Reminder.user_id == user_id)
+
+
+async def list_reminders(
+    db: AsyncSession,
+    user_id: int,
+    include_completed: bool = False,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Sequence:
+    """Rows of (Reminder, category_name, category_icon, category_color) by reminder date"""
+    query = reminder_query(user_id)
+
+    if not include_completed:
+        query = query.where(Reminder.is_completed == False)
+    if start_date:
+        query = query.where(Reminder.reminder_date >= start_date)
+    if end_date:
+        query = query.where(Reminder.reminder_date <= end_date)
+
+    result = await db.execute(query.order_by(Reminder.reminder_date.asc()))
+    return result.all()
+
+
+async def get_reminder_row(db: AsyncSession, user_id: int, reminder_id: int):
+    """One reminder with its category fields, or None"""
+    result = await db.execute(reminder_query(user_id).where(Reminder.id == reminder_id))
+    return result.one_or_none()
+
+
+async def calendar_rows(db: AsyncSession, user_id: int, start_date: datetime, end_date: datetime) -> Sequence:
+    """Reminders dated in the window plus open recurring reminders with occurrences that may fall in it"""
+    recurring = and_(
+        Reminder.recurrence.isnot(None),
+        Reminder.is_completed == False,
+        Reminder.reminder_date <= end_date,
+        or_(Reminder.recurrence_until.is_(None), Reminder.recurrence_until >= start_date)
+    )
+    result = await db.execute(
+        reminder_query(user_id).where(
+            or_(Reminder.reminder_date.between(start_date, end_date), recurring)
+        ).order_by(Reminder.reminder_date.asc())
+    )
+    return result.all()
+
+
+async def reminder_counts(db: AsyncSession, user_id: int, now: Optional[datetime] = None) -> Dict[str, int]:
+    """total / upcoming / completed counts in one scan of the user's reminders"""
+    now = now or datetime.utcnow()
+    upcoming = and_(Reminder.is_completed == False, Reminder.reminder_date >= now)
+
+    result = await db.execute(
+        select(
+            func.count(Reminder.id),
+            func.sum(case((upcoming, 1), else_=0)),
+            func.sum(case((Reminder.is_completed == True, 1), else_=0)),
+        ).where(Reminder.user_id == user_id)
+    )
+    total, upcoming_count, completed_count = result.one()
+    return {
+        "total": total or 0,
+        "upcoming_count": int(upcoming_count or 0),
+        "completed_count": int(completed_count or 0),
+    }
+
+
+# ===== Recurrence =====
+
+RECURRENCE_FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def occurrence(reminder: Reminder, index: int) -> datetime:
+    """Occurrence number `index` of a recurring reminder (0 = recurrence_start)"""
+    start = reminder.recurrence_start or reminder.reminder_date
+    step = reminder.recurrence_interval or 1
+
+    if reminder.recurrence == "monthly":
+        # Counted from the start so Jan 31 -> Feb 28 -> Mar 31 does not drift to the 28th
+        months = start.month - 1 + index * step
+        year, month = start.year + months // 12, months % 12 + 1
+        return start.replace(year=year, month=month, day=min(start.day, monthrange(year, month)[1]))
+
+    days = step * 7 if reminder.recurrence == "weekly" else step
+    return start + timedelta(days=index * days)
+
+
+def _first_index(reminder: Reminder, moment: datetime, inclusive: bool = True) -> int:
+    """Index of the first occurrence at (or strictly after) `moment`, without walking the series"""
+    start = reminder.recurrence_start or reminder.reminder_date
+    step = reminder.recurrence_interval or 1
+
+    if moment < start:
+        return 0
+    if reminder.recurrence == "monthly":
+        index = ((moment.year - start.year) * 12 + moment.month - start.month) // step
+    else:
+        period = timedelta(days=step * 7 if reminder.recurrence == "weekly" else step)
+        index = (moment - start) // period
+
+    # The estimate is at most a couple of occurrences short
+    while occurrence(reminder, index) < moment or (not inclusive and occurrence(reminder, index) == moment):
+        index += 1
+    return index
+
+
+def occurrences_between(reminder: Reminder, start_date: datetime, end_date: datetime) -> List[datetime]:
+    """Occurrences of a reminder in [start_date, end_date], from its open occurrence on"""
+    if not reminder.recurrence:
+        return [reminder.reminder_date] if start_date <= reminder.reminder_date <= end_date else []
+
+    lower = max(start_date, reminder.reminder_date)
+    upper = min(end_date, reminder.recurrence_until) if reminder.recurrence_until else end_date
+
+    dates = []
+    index = _first_index(reminder, lower)
+    while (when := occurrence(reminder, index)) <= upper:
+        dates.append(when)
+        index += 1
+    return dates
+
+
+def next_occurrence(reminder: Reminder, after: Optional[datetime] = None) -> Optional[datetime]:
+    """The occurrence after the open one (and after `after`), or None when the series has ended"""
+    if not reminder.recurrence:
+        return None
+    moment = max(reminder.reminder_date, after) if after else reminder.reminder_date
+    when = occurrence(reminder, _first_index(reminder, moment, inclusive=False))
+    if reminder.recurrence_until and when > reminder.recurrence_until:
+        return None
+    return when
+
+
+def advance_recurrence(reminder: Reminder) -> bool:
+    """Move a recurring reminder on to its next occurrence; False when there is none"""
+    when = next_occurrence(reminder)
+    if when is None:
+        return False
+    reminder.reminder_date = when
+    reminder.notified_at = None  # Push again for the new occurrence
+    reminder.next_push_at = None
+    return True
+
+
+def complete_occurrence(reminder: Reminder) -> None:
+    """Complete the open occurrence: recurring reminders move on, the last one completes the reminder"""
+    if advance_recurrence(reminder):
+        return
+    reminder.is_completed = True
+    reminder.completed_at = datetime.utcnow()  # Only set once nothing is left open
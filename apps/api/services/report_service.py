@@ -0,0 +1,67 @@
+"""
+Report Engine
+
+Builds the financial summary behind /reports/summary from one grouped scan of
+entries LEFT JOIN categories: income and expense totals, the split by
+expense type (mandatory/neutral/excess) and the ranked category totals all
+come out of the same result set.
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import EntryType, ExpenseType
+from services.aggregation_service import aggregate_entries, summarize_window, category_totals
+
+
+REPORT_WINDOW = "report"
+
+
+async def compute_report_summary(
+    db: AsyncSession,
+    user_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    top_n: int = 5,
+) -> Dict[str, Any]:
+    """
+    Compute report totals for a user and date range in a single round trip
+
+    Returns:
+        dict: income_total, expense_total, expense_by_type and top_categories
+        (expense categories only, ranked by total, at most top_n)
+    """
+    groups = await aggregate_entries(db, user_id, {REPORT_WINDOW: start_date}, end_date)
+
+    totals = summarize_window(groups, REPORT_WINDOW)
+
+    expense_by_type = {exp_type.value: 0.0 for exp_type in ExpenseType}
+    top_categories = []
+
+    for t in category_totals(groups, REPORT_WINDOW, EntryType.expense):
+        # Uncategorized expenses count towards the expense total only
+        if t["category_id"] is None:
+            continue
+
+        if t["expense_type"] is not None:
+            expense_by_type[t["expense_type"].value] += t["amount"]
+
+        if len(top_categories) < top_n:
+            top_categories.append({
+                "category_id": t["category_id"],
+                "category_name": t["category_name"],
+                "category_icon": t["category_icon"],
+                "category_color": t["category_color"],
+                "expense_type": t["expense_type"].value if t["expense_type"] else None,
+                "total": round(t["amount"], 2),
+                "count": t["count"]
+            })
+
+    return {
+        "income_total": totals["total_income"],
+        "expense_total": totals["total_expenses"],
+        "expense_by_type": expense_by_type,
+        "top_categories": top_categories,
+    }
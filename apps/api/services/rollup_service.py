@@ -0,0 +1,154 @@
+"""
+Daily Rollup Service
+
+Maintains the daily_rollups table: one row per (user, day, type, category)
+holding the sum and count of that day's entries. Entry writes apply their
+delta inside the same transaction, so analytics can read O(days) rollup rows
+instead of O(entries) raw rows. The key is a unique index, and new entries
+are added with INSERT ... ON CONFLICT DO UPDATE, so concurrent writers of the
+same day add to one row.
+
+Backfill / repair:
+
+    python rebuild_rollups.py [--user-id N]
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import DailyRollup, DAILY_ROLLUP_KEY, Entry, EntryType
+
+
+def _key_filter(user_id: int, day, entry_type: EntryType, category_id: Optional[int]):
+    category_match = (
+        DailyRollup.category_id.is_(None) if category_id is None
+        else DailyRollup.category_id == category_id
+    )
+    return (
+        DailyRollup.user_id == user_id,
+        DailyRollup.day == day,
+        DailyRollup.type == entry_type,
+        category_match,
+    )
+
+
+async def apply_rollup_delta(
+    db: AsyncSession,
+    user_id: int,
+    booked_at: datetime,
+    entry_type: EntryType,
+    category_id: Optional[int],
+    amount: float,
+    count: int,
+) -> None:
+    """
+    Add amount/count to the rollup row of the entry's day, creating it if needed
+
+    Does not commit; call it before the commit that persists the entry change.
+    """
+    key = _key_filter(user_id, booked_at.date(), entry_type, category_id)
+    dialect = db.get_bind().dialect.name
+
+    # Entries added: single INSERT ... ON CONFLICT (key) DO UPDATE
+    if count > 0 and dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(DailyRollup).values(
+            user_id=user_id,
+            day=booked_at.date(),
+            type=entry_type,
+            category_id=category_id,
+            total=amount,
+            count=count,
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=list(DAILY_ROLLUP_KEY),
+            set_={
+                "total": DailyRollup.total + stmt.excluded.total,
+                "count": DailyRollup.count + stmt.excluded.count,
+            }
+        ))
+        return
+
+    result = await db.execute(
+        update(DailyRollup)
+        .where(*key)
+        .values(total=DailyRollup.total + amount, count=DailyRollup.count + count)
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+        if count > 0:
+            await db.execute(insert(DailyRollup).values(
+                user_id=user_id,
+                day=booked_at.date(),
+                type=entry_type,
+                category_id=category_id,
+                total=amount,
+                count=count,
+            ))
+        return
+
+    if count < 0:
+        await db.execute(
+            delete(DailyRollup)
+            .where(*key, DailyRollup.count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def add_entry_to_rollups(db: AsyncSession, entry: Entry) -> None:
+    """Count a new entry in its day's rollup"""
+    await apply_rollup_delta(
+        db, entry.user_id, entry.booked_at, entry.type, entry.category_id, entry.amount, 1
+    )
+
+
+async def remove_entry_from_rollups(db: AsyncSession, entry: Entry) -> None:
+    """Remove a deleted entry from its day's rollup"""
+    await apply_rollup_delta(
+        db, entry.user_id, entry.booked_at, entry.type, entry.category_id, -entry.amount, -1
+    )
+
+
+def rollup_rebuild_statements(user_id: Optional[int] = None):
+    """DELETE + INSERT .. SELECT that recompute rollups from the entries table"""
+    day = func.date(Entry.booked_at)
+    source = select(
+        Entry.user_id,
+        day,
+        Entry.type,
+        Entry.category_id,
+        func.sum(Entry.amount),
+        func.count(Entry.id),
+    ).group_by(Entry.user_id, day, Entry.type, Entry.category_id)
+
+    clear = delete(DailyRollup)
+    if user_id is not None:
+        source = source.where(Entry.user_id == user_id)
+        clear = clear.where(DailyRollup.user_id == user_id)
+
+    fill = insert(DailyRollup).from_select(
+        ["user_id", "day", "type", "category_id", "total", "count"], source
+    )
+    return clear, fill
+
+
+async def rebuild_rollups(db: AsyncSession, user_id: Optional[int] = None) -> int:
+    """
+    Recompute rollups from the entries table (all users, or a single user)
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    for statement in rollup_rebuild_statements(user_id):
+        await db.execute(statement)
+    await db.commit()
+
+    count_query = select(func.count(DailyRollup.id))
+    if user_id is not None:
+        count_query = count_query.where(DailyRollup.user_id == user_id)
+    return (await db.execute(count_query)).scalar() or 0
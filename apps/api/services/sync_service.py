@@ -0,0 +1,134 @@
+"""
+Entry Delta Sync Service
+
+Backs GET /entries/changes for offline-first clients. A sync token is an
+opaque (updated_at, id) watermark plus the time it was issued: a client
+sends the token it was last given and receives only entries changed after
+it, plus the ids of entries deleted since then (from the entry_tombstones
+table). Expiry goes by the issue time - the watermark of a page boundary
+may be an entry last touched years ago.
+
+Changes are read in (updated_at, id) order, so a large backlog is paged with
+has_more and each page's token resumes exactly after its last entry. The
+final page's token is rewound by SYNC_GRACE_SECONDS, so writes that were
+still in flight when the page was read are picked up next time. Clients
+therefore upsert entries and ignore unknown deleted ids (both idempotent).
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+import base64
+import json
+
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from config import settings
+from models import Entry, EntryTombstone
+
+
+SYNC_GRACE_SECONDS = 5
+
+
+class SyncTokenError(ValueError):
+    """Sync token is malformed"""
+
+
+class SyncTokenExpired(Exception):
+    """Sync token was issued before the tombstone retention window"""
+
+
+def encode_sync_token(updated_at: datetime, entry_id: int, issued_at: datetime) -> str:
+    raw = json.dumps({"t": updated_at.isoformat(), "i": entry_id, "s": issued_at.isoformat()})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Tuple[datetime, int, datetime]:
+    """(updated_at, id) paging position and issue time of a token"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        updated_at = datetime.fromisoformat(data["t"])
+        # Tokens issued before the issue time was recorded expire by their watermark
+        issued_at = datetime.fromisoformat(data["s"]) if "s" in data else updated_at
+        return updated_at, int(data["i"]), issued_at
+    except (ValueError, KeyError, TypeError):
+        raise SyncTokenError("Invalid sync token")
+
+
+async def record_entry_tombstone(db: AsyncSession, entry: Entry) -> None:
+    """
+    Remember that an entry was deleted; also drops the user's tombstones that
+    fell out of the retention window. Does not commit.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    await db.execute(
+        delete(EntryTombstone).where(
+            EntryTombstone.user_id == entry.user_id,
+            EntryTombstone.deleted_at < cutoff
+        )
+    )
+    db.add(EntryTombstone(user_id=entry.user_id, entry_id=entry.id))
+
+
+async def fetch_entry_changes(
+    db: AsyncSession,
+    user_id: int,
+    since: Optional[str],
+    limit: int,
+) -> Dict[str, Any]:
+    """
+    Entries changed and deleted since a sync token
+
+    Without a token, returns the user's full entry set (paged) - the initial
+    download of a new device.
+
+    Raises:
+        SyncTokenError: token cannot be decoded
+        SyncTokenExpired: token was issued before the tombstone retention window
+
+    Returns:
+        dict: changed (Entry objects), deleted (entry ids), next_token, has_more
+    """
+    now = datetime.utcnow()
+    watermark = None
+    if since:
+        updated_at, entry_id, issued_at = decode_sync_token(since)
+        watermark = (updated_at, entry_id)
+        if issued_at < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            raise SyncTokenExpired()
+
+    query = select(Entry).where(Entry.user_id == user_id)
+    if watermark:
+        query = query.where(tuple_(Entry.updated_at, Entry.id) > tuple_(*watermark))
+    query = query.order_by(Entry.updated_at, Entry.id).limit(limit + 1).options(
+        selectinload(Entry.category)
+    )
+    entries = (await db.execute(query)).scalars().all()
+
+    has_more = len(entries) > limit
+    if has_more:
+        entries = entries[:limit]
+        next_watermark = (entries[-1].updated_at, entries[-1].id)
+    else:
+        next_watermark = (now - timedelta(seconds=SYNC_GRACE_SECONDS), 0)
+
+    # A fresh device has nothing to delete
+    deleted = []
+    if watermark:
+        tombstones = select(EntryTombstone.entry_id).where(
+            EntryTombstone.user_id == user_id,
+            EntryTombstone.deleted_at > watermark[0]
+        )
+        if has_more:
+            tombstones = tombstones.where(EntryTombstone.deleted_at <= next_watermark[0])
+        result = await db.execute(tombstones.order_by(EntryTombstone.deleted_at, EntryTombstone.id))
+        deleted = [row[0] for row in result]
+
+    return {
+        "changed": entries,
+        "deleted": deleted,
+        "next_token": encode_sync_token(*next_watermark, issued_at=now),
+        "has_more": has_more,
+    }
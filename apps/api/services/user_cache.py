@@ -0,0 +1,109 @@
+"""
+Authenticated User Cache
+
+Lets get_current_user skip the `SELECT users WHERE id = ?` round trip on
+most requests. Holds a snapshot of the user's profile columns (never the
+password hash or recovery keyword) in a size-bounded LRU with a short TTL.
+
+Each uvicorn worker has its own cache. A worker that changes a user drops
+the entry right away (invalidate()); other workers serve the old snapshot
+for at most AUTH_USER_CACHE_TTL_SECONDS. Entries are also stamped with the
+row's updated_at, so put() never replaces a newer snapshot with an older one.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import settings
+from models import User
+
+
+CACHED_FIELDS = (
+    "id", "email", "is_admin", "name", "language", "theme", "currency", "created_at", "updated_at",
+)
+
+
+class UserCache:
+    """LRU + TTL cache of user snapshots keyed by user id"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        """
+        Cached user as a detached User object, or None on a miss
+
+        A new object is built on every hit, so a route modifying it can't
+        change what other requests see.
+        """
+        if not self.enabled:
+            return None
+
+        cached = self._entries.get(user_id)
+        if cached is None or cached[0] < time.monotonic():
+            if cached is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return User(**cached[1])
+
+    def put(self, user: User) -> None:
+        """Cache a snapshot of a user freshly loaded from the database"""
+        if not self.enabled:
+            return
+
+        snapshot = {field: getattr(user, field) for field in CACHED_FIELDS}
+        cached = self._entries.get(user.id)
+        if cached is not None and cached[1]["updated_at"] > snapshot["updated_at"]:
+            return
+
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user after their row changed"""
+        if self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global instance used by security.get_current_user
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
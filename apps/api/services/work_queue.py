@@ -0,0 +1,213 @@
+"""
+In-process Background Work Queue
+
+Runs async jobs off the request path with per-key coalescing: items submitted
+for the same key (e.g. a user id) while a job for that key is still waiting
+are merged into a single handler call. A key is never processed by two
+workers at once, and at most `concurrency` jobs run in parallel. Callers that
+need the result can submit_and_wait() for the job handling their item.
+
+A failed job is retried up to max_retries times, the delay doubling from
+retry_delay (the key stays busy meanwhile; new items wait for the next job).
+When it still fails, `fallback` may turn its items into one replacement item
+that is queued again; otherwise the items are dropped.
+
+The queue is started and flushed from the FastAPI lifespan in main.py.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingWorkQueue:
+    """Bounded-concurrency async job queue that coalesces work per key"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Hashable, List[Any]], Awaitable[None]],
+        concurrency: int = 4,
+        max_retries: int = 0,
+        retry_delay: float = 1.0,
+        fallback: Optional[Callable[[Hashable, List[Any]], Optional[Any]]] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self.fallback = fallback
+
+        self._pending: Dict[Hashable, List[Any]] = {}
+        self._enqueued_at: Dict[Hashable, float] = {}
+        self._active: set = set()
+        self._waiters: Dict[Hashable, List[asyncio.Future]] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+        # Metrics
+        self.submitted = 0
+        self.processed_jobs = 0
+        self.processed_items = 0
+        self.failed_jobs = 0
+        self.retried_jobs = 0
+        self.fallback_jobs = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """Spawn the worker tasks (needs a running event loop)"""
+        if self._workers:
+            return
+
+        self._ready = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{idx}")
+            for idx in range(self.concurrency)
+        ]
+
+        # Work submitted before a restart is picked up again
+        for key in self._pending:
+            self._ready.put_nowait(key)
+
+        logger.info(f"[{self.name}] queue started with {self.concurrency} workers")
+
+    def submit(self, key: Hashable, item: Any) -> None:
+        """Queue an item; merges with any not-yet-started job for the same key"""
+        if not self._workers:
+            self.start()
+
+        self.submitted += 1
+        items = self._pending.get(key)
+        if items is not None:
+            items.append(item)
+            return
+
+        self._pending[key] = [item]
+        self._enqueued_at[key] = time.monotonic()
+        if key not in self._active:
+            self._ready.put_nowait(key)
+
+    async def submit_and_wait(self, key: Hashable, item: Any) -> None:
+        """Queue an item and wait until the job handling it is done (re-raises the job's error)"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(future)
+        self.submit(key, item)
+        await future
+
+    async def flush(self) -> None:
+        """Wait until every submitted item has been handled"""
+        if self._ready is not None:
+            await self._ready.join()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush outstanding work (up to timeout seconds) and stop the workers"""
+        if not self._workers:
+            return
+
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"[{self.name}] shutdown flush timed out; "
+                f"{len(self._pending)} job(s) not processed"
+            )
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for waiters in self._waiters.values():
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"{self.name} queue stopped"))
+        self._waiters.clear()
+        logger.info(f"[{self.name}] queue stopped")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput and lag (seconds from first submit to job start)"""
+        now = time.monotonic()
+        oldest = min(self._enqueued_at.values()) if self._enqueued_at else None
+        return {
+            "name": self.name,
+            "running": self.running,
+            "workers": self.concurrency,
+            "depth": len(self._pending),
+            "pending_items": sum(len(items) for items in self._pending.values()),
+            "in_progress": len(self._active),
+            "submitted": self.submitted,
+            "processed_jobs": self.processed_jobs,
+            "processed_items": self.processed_items,
+            "coalesced_items": self.processed_items - self.processed_jobs,
+            "failed_jobs": self.failed_jobs,
+            "retried_jobs": self.retried_jobs,
+            "fallback_jobs": self.fallback_jobs,
+            "oldest_pending_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+            "last_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "avg_lag_seconds": round(self._lag_total / self.processed_jobs, 3) if self.processed_jobs else 0.0,
+        }
+
+    async def _run_job(self, key: Hashable, items: List[Any]) -> None:
+        """Call the handler, retrying with exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.handler(key, items)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_delay * 2 ** attempt
+                self.retried_jobs += 1
+                logger.warning(f"[{self.name}] job for {key!r} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            try:
+                items = self._pending.pop(key, None)
+                enqueued_at = self._enqueued_at.pop(key, None)
+                waiters = self._waiters.pop(key, [])
+                if not items:
+                    continue
+
+                lag = time.monotonic() - enqueued_at
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+
+                self._active.add(key)
+                try:
+                    await self._run_job(key, items)
+                    self.processed_jobs += 1
+                    self.processed_items += len(items)
+                    self._lag_total += lag
+                    for future in waiters:
+                        if not future.done():
+                            future.set_result(None)
+                except Exception as e:
+                    self.failed_jobs += 1
+                    logger.error(f"[{self.name}] job for {key!r} failed: {e}")
+                    for future in waiters:
+                        if not future.done():
+                            future.set_exception(e)
+                    replacement = self.fallback(key, items) if self.fallback else None
+                    if replacement is not None:
+                        self.fallback_jobs += 1
+                        self.submit(key, replacement)
+                finally:
+                    self._active.discard(key)
+                    # Items that arrived while this key was running
+                    if key in self._pending:
+                        self._ready.put_nowait(key)
+            finally:
+                self._ready.task_done()
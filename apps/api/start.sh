@@ -1,2 +1,2 @@
 #!/bin/bash
-uvicorn main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file
+python migrate.py && uvicorn main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file